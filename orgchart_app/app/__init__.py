@@ -1,27 +1,17 @@
+import time
+_IMPORT_STARTED = time.perf_counter()
 import os
-from flask import Flask, render_template, send_from_directory, jsonify
+from flask import Flask, render_template, jsonify
 from .config import Config
 from .database import db
+from .dbprofile import configure_database, init_engines
+from .metrics import init_metrics
+from .startup import StartupTimer
+from .static_assets import FrontendManifest, send_asset
+_IMPORT_SECONDS = time.perf_counter() - _IMPORT_STARTED
 
 
-def create_app() -> Flask:
-    # Move Flask's own static to a non-conflicting URL so CRA assets can use /static
-    app = Flask(
-        __name__,
-        static_folder="static",
-        static_url_path="/flask-static",
-        template_folder="templates",
-    )
-    app.config.from_object(Config)
-
-    db.init_app(app)
-
-    # Create tables on startup (simple dev setup)
-    with app.app_context():
-        from . import models  # noqa: F401 - ensure models are imported
-        db.create_all()
-
-    # Register blueprints
+def _register_blueprints(app: Flask) -> None:
     from .api.organizations import bp as org_bp
     from .api.people import bp as people_bp
     from .api.imports import bp as import_bp
@@ -30,6 +20,8 @@ def create_app() -> Flask:
     from .api.departments import bp as departments_bp
     from .api.enrich import bp as enrich_bp
     from .api.scraper import scraper_bp
+    from .api.jobs import bp as jobs_bp
+    from .api.crawl import bp as crawl_bp
 
     app.register_blueprint(org_bp)
     app.register_blueprint(people_bp)
@@ -39,29 +31,76 @@ def create_app() -> Flask:
     app.register_blueprint(departments_bp)
     app.register_blueprint(enrich_bp)
     app.register_blueprint(scraper_bp, url_prefix='/api/scraper')
+    app.register_blueprint(jobs_bp)
+    app.register_blueprint(crawl_bp)
 
-    # --- Frontend (React) static serving ---
-    # In Docker, the React build is copied to /app/frontend (relative to this module's root)
-    frontend_dir = os.path.abspath(os.path.join(app.root_path, "..", "frontend"))
 
-    def _has_frontend_build() -> bool:
-        return os.path.exists(os.path.join(frontend_dir, "index.html"))
+def create_app() -> Flask:
+    timer = StartupTimer()
+    timer.record("import", _IMPORT_SECONDS)
+
+    with timer.phase("config"):
+        # Move Flask's own static to a non-conflicting URL so CRA assets can use /static
+        app = Flask(
+            __name__,
+            static_folder="static",
+            static_url_path="/flask-static",
+            template_folder="templates",
+        )
+        app.config.from_object(Config)
+
+    with timer.phase("database"):
+        configure_database(app)
+        db.init_app(app)
+        init_engines(app)
+
+    # Create tables on startup (simple dev setup); skipped when the schema fingerprint matches
+    with app.app_context():
+        with timer.phase("models"):
+            from . import models, versions  # noqa: F401 - ensure models and version listeners are registered
+            from .schema import sync_schema
+        with timer.phase("schema"):
+            schema_synced = sync_schema(app.config["SCHEMA_SYNC"])
+
+    with timer.phase("blueprints"):
+        _register_blueprints(app)
+
+    with timer.phase("metrics"):
+        init_metrics(app)
+
+    if app.config["CRAWL_JOB_AUTO_RESUME"]:
+        from .crawl_jobs import start_stale_job_sweeper
+        start_stale_job_sweeper(app)
+
+    # --- Frontend (React) static serving ---
+    # In Docker, the React build is copied to /app/frontend (relative to this module's root).
+    # Scanned once here; replacing the build needs a restart
+    with timer.phase("frontend"):
+        frontend_dir = os.path.abspath(os.path.join(app.root_path, "..", "frontend"))
+        manifest = FrontendManifest.scan(frontend_dir)
+    max_age = app.config["FRONTEND_MAX_AGE"]
 
     @app.route("/", defaults={"path": ""})
     @app.route("/<path:path>")
     def serve_frontend(path: str):
         # If a React build exists, serve static assets or index.html as SPA fallback.
-        if _has_frontend_build():
+        if manifest is not None:
             # Never intercept unknown API routes; return a JSON 404 so axios rejects
             if path.startswith("api/"):
                 return jsonify({"error": "not_found"}), 404
-            candidate = os.path.join(frontend_dir, path)
-            if path and os.path.exists(candidate) and os.path.isfile(candidate):
-                return send_from_directory(frontend_dir, path)
-            return send_from_directory(frontend_dir, "index.html")
+            asset = manifest.get(path)
+            if asset is not None:
+                return send_asset(asset, max_age)
+            # A missing build file (e.g. a chunk from a previous deploy) must not get HTML back
+            if path.startswith("static/"):
+                return jsonify({"error": "not_found"}), 404
+            return send_asset(manifest.index, max_age)
 
         # Fallback for local/dev when the React build isn't present
         # Serve the legacy Flask template instead so the app remains usable
         return render_template("index.html")
 
+    startup = timer.summary(schema_synced=schema_synced)
+    app.extensions["startup_timing"] = startup
+    timer.log(startup)
     return app
@@ -0,0 +1,131 @@
+from __future__ import annotations
+from flask import Blueprint, request, jsonify, current_app
+from sqlalchemy import select
+from ..contact_ingest import ingest_contacts
+from ..crawl_jobs import JOB_KIND, is_resumable, job_contacts, normalize_url, run_crawl_job, serialize_crawl_url
+from ..database import db
+from ..jobs import create_job, serialize_job, start_job, update_job
+from ..models import BackgroundJob, CrawlUrl, Department, Organization
+from ..site_fetch import check_robots_txt, is_allowed_domain
+
+
+bp = Blueprint("crawl", __name__, url_prefix="/api/scraper/crawl-jobs")
+
+
+def _get_crawl_job(job_id: int):
+    job = db.session.get(BackgroundJob, job_id)
+    if not job or job.kind != JOB_KIND:
+        return None
+    return job
+
+
+@bp.post("")
+def create_crawl_job():
+    """
+    Crawl a company site for contact pages in the background.
+
+    Expected request body:
+    {
+        "url": "https://company.com",
+        "max_depth": 2,          # link hops from the start page (sitemap pages count as 1)
+        "max_pages": 500,        # frontier size cap
+        "use_sitemap": true,     # seed contact-like URLs from sitemap.xml
+        "organization_id": 1     # optional, to find the job again per org
+    }
+    """
+    cfg = current_app.config
+    data = request.get_json(force=True)
+    url = (data.get("url") or "").strip()
+    if not url:
+        return jsonify({"error": "url_required"}), 400
+    if not url.startswith(("http://", "https://")):
+        url = "https://" + url
+    if not is_allowed_domain(url):
+        return jsonify({"error": "prohibited_domain"}), 403
+    limits = {}
+    for field, default, low, high in (
+        ("max_depth", cfg["CRAWL_JOB_MAX_DEPTH"], 0, 5),
+        ("max_pages", cfg["CRAWL_JOB_MAX_PAGES"], 1, 5000),
+    ):
+        try:
+            value = int(data.get(field, default))
+        except (TypeError, ValueError):
+            return jsonify({"error": "invalid_" + field}), 400
+        limits[field] = max(low, min(value, high))
+    if not check_robots_txt(url):
+        return jsonify({"error": "robots_disallowed"}), 403
+    job = create_job(JOB_KIND, data.get("organization_id"), detail={
+        "start_url": normalize_url(url),
+        **limits,
+        "use_sitemap": bool(data.get("use_sitemap", True)),
+    })
+    start_job(job, run_crawl_job)
+    return jsonify(serialize_job(job)), 202, {"Location": f"/api/scraper/crawl-jobs/{job.id}"}
+
+
+@bp.get("/<int:job_id>")
+def get_crawl_job(job_id: int):
+    job = _get_crawl_job(job_id)
+    if not job:
+        return jsonify({"error": "not_found"}), 404
+    return jsonify(serialize_job(job))
+
+
+@bp.post("/<int:job_id>/resume")
+def resume_crawl_job(job_id: int):
+    """Continue a failed or interrupted crawl; pages already fetched are not fetched again."""
+    job = _get_crawl_job(job_id)
+    if not job:
+        return jsonify({"error": "not_found"}), 404
+    if not is_resumable(job):
+        return jsonify({"error": "not_resumable", "status": job.status}), 409
+    job = update_job(job.id, status="queued", error=None)
+    start_job(job, run_crawl_job)
+    return jsonify(serialize_job(job)), 202
+
+
+@bp.get("/<int:job_id>/pages")
+def list_crawl_pages(job_id: int):
+    if not _get_crawl_job(job_id):
+        return jsonify({"error": "not_found"}), 404
+    status = request.args.get("status")
+    limit = min(request.args.get("limit", default=100, type=int), 1000)
+    after_id = request.args.get("after_id", default=0, type=int)
+    query = select(CrawlUrl).where(CrawlUrl.job_id == job_id, CrawlUrl.id > after_id)
+    if status:
+        query = query.where(CrawlUrl.status == status)
+    pages = db.session.scalars(query.order_by(CrawlUrl.id).limit(limit)).all()
+    return jsonify([serialize_crawl_url(p) for p in pages])
+
+
+@bp.get("/<int:job_id>/contacts")
+def list_crawl_contacts(job_id: int):
+    job = _get_crawl_job(job_id)
+    if not job:
+        return jsonify({"error": "not_found"}), 404
+    contacts = job_contacts(job_id)
+    return jsonify({"job": serialize_job(job), "contacts": contacts, "total_found": len(contacts)})
+
+
+@bp.post("/<int:job_id>/ingest")
+def ingest_crawl_contacts(job_id: int):
+    """
+    Save the job's contacts as people, skipping ones already in the organization.
+
+    Expected request body (optional when the job was started with an organization_id):
+    {"organization_id": 1, "department_id": null}
+    """
+    job = _get_crawl_job(job_id)
+    if not job:
+        return jsonify({"error": "not_found"}), 404
+    data = request.get_json(silent=True) or {}
+    org_id = data.get("organization_id") or job.organization_id
+    if not org_id or not db.session.get(Organization, org_id):
+        return jsonify({"error": "organization_required"}), 400
+    department_id = data.get("department_id")
+    if department_id:
+        department = db.session.get(Department, department_id)
+        if not department or department.organization_id != org_id:
+            return jsonify({"error": "invalid_department"}), 400
+    result = ingest_contacts(org_id, job_contacts(job_id), department_id=department_id)
+    return jsonify({"job": serialize_job(job), **result.to_dict()})
@@ -1,12 +1,18 @@
 from __future__ import annotations
 from flask import Blueprint, request, jsonify
-from sqlalchemy import select
+from sqlalchemy import case, func, select
+from sqlalchemy.orm import aliased
+from ..cache import LRUCache
 from ..database import db
-from ..models import Department, Organization
+from ..models import Department, Organization, Person, Project, ProjectAssignment
+from ..versions import get_org_version
 
 
 bp = Blueprint("departments", __name__, url_prefix="/api/departments")
 
+# Keyed by (org_id, org_version, by_location); a version bump makes old entries unreachable
+_rollup_cache = LRUCache(max_entries=256)
+
 
 @bp.get("")
 def list_departments():
@@ -18,3 +24,90 @@ def list_departments():
         return jsonify({"error": "org_not_found"}), 404
     depts = db.session.scalars(select(Department).where(Department.organization_id == org_id).order_by(Department.name)).all()
     return jsonify([{ "id": d.id, "name": d.name } for d in depts])
+
+
+@bp.get("/rollup")
+def department_rollup():
+    """Per-department (optionally per-location) headcount, EPC, manager and active-project counts."""
+    org_id = request.args.get("organization_id", type=int)
+    if not org_id:
+        return jsonify({"error": "organization_id_required"}), 400
+    org = db.session.get(Organization, org_id)
+    if not org:
+        return jsonify({"error": "org_not_found"}), 404
+    by_location = request.args.get("by_location", "").lower() in {"1", "true", "yes"}
+
+    version = get_org_version(org_id)
+    key = (org_id, version, by_location)
+    payload = _rollup_cache.get(key)
+    if payload is None:
+        payload = {
+            "organization_id": org_id,
+            "version": version,
+            "group_by": ["department", "location"] if by_location else ["department"],
+            "rollup": compute_rollup(org_id, by_location),
+        }
+        _rollup_cache.set(key, payload)
+    return jsonify(payload)
+
+
+def compute_rollup(org_id: int, by_location: bool = False) -> list[dict]:
+    def group_cols(p):
+        return (p.department_id, p.location) if by_location else (p.department_id,)
+
+    rows: dict[tuple, dict] = {}
+
+    def row_for(key: tuple) -> dict:
+        if key not in rows:
+            rows[key] = {
+                "department_id": key[0],
+                "headcount": 0,
+                "epc_contacts": 0,
+                "managers": 0,
+                "active_project_staff": 0,
+                "active_projects": 0,
+            }
+            if by_location:
+                rows[key]["location"] = key[1]
+        return rows[key]
+
+    cols = group_cols(Person)
+    for *key, headcount, epc in db.session.execute(
+        select(*cols, func.count(Person.id), func.sum(case((Person.is_epc_contact.is_(True), 1), else_=0)))
+        .where(Person.organization_id == org_id)
+        .group_by(*cols)
+    ):
+        row = row_for(tuple(key))
+        row["headcount"] = headcount
+        row["epc_contacts"] = int(epc or 0)
+
+    report = aliased(Person)
+    for *key, managers in db.session.execute(
+        select(*cols, func.count(func.distinct(Person.id)))
+        .join(report, report.reports_to_id == Person.id)
+        .where(Person.organization_id == org_id)
+        .group_by(*cols)
+    ):
+        row_for(tuple(key))["managers"] = managers
+
+    for *key, staff, projects in db.session.execute(
+        select(*cols, func.count(func.distinct(Person.id)), func.count(func.distinct(Project.id)))
+        .join(ProjectAssignment, ProjectAssignment.person_id == Person.id)
+        .join(Project, Project.id == ProjectAssignment.project_id)
+        .where(Person.organization_id == org_id, Project.status == "active")
+        .group_by(*cols)
+    ):
+        row = row_for(tuple(key))
+        row["active_project_staff"] = staff
+        row["active_projects"] = projects
+
+    names = dict(db.session.execute(select(Department.id, Department.name).where(Department.organization_id == org_id)).all())
+    for dept_id in names:
+        if not by_location:
+            row_for((dept_id,))
+    result = []
+    for row in rows.values():
+        row["department_name"] = names.get(row["department_id"])
+        result.append(row)
+    result.sort(key=lambda r: (r["department_name"] is None, r["department_name"] or "", r.get("location") or ""))
+    return result
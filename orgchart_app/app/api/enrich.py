@@ -1,8 +1,24 @@
 from __future__ import annotations
+import json
 import os
 import requests
 from typing import Optional
-from flask import Blueprint, request, jsonify, current_app
+from flask import Blueprint, Response, request, jsonify, current_app, stream_with_context
+from sqlalchemy import select
+from ..database import db
+from ..enrichment import JOB_KIND, is_resumable, run_enrichment_job, serialize_result
+from ..jobs import create_job, find_active_job, serialize_job, start_job, update_job
+from ..models import BackgroundJob, EnrichmentResult, Organization
+from ..providers import (
+    ProviderUnavailable,
+    call_provider,
+    get_response_cache,
+    get_runtime,
+    get_usage_recorder,
+    resilience_stats,
+    usage_summary,
+)
+from ..writeback import apply_records
 
 
 bp = Blueprint("enrich", __name__, url_prefix="/api/enrich")
@@ -11,15 +27,37 @@ bp = Blueprint("enrich", __name__, url_prefix="/api/enrich")
 @bp.get("/providers")
 def list_providers():
     cfg = current_app.config
+    cache = get_response_cache()
+    usage = get_usage_recorder()
     return jsonify({
         "clearbit": bool(cfg.get("CLEARBIT_API_KEY")),
         "pdl": bool(cfg.get("PDL_API_KEY")),
         # Non-secret hint to help diagnose which var name was used
         "pdl_source": cfg.get("PDL_API_KEY_SOURCE"),
         "crunchbase": bool(cfg.get("CRUNCHBASE_API_KEY")),
+        "cache": cache.stats() if cache else None,
+        "limits": get_runtime().stats(),
+        "resilience": resilience_stats(),
+        "usage": usage.stats() if usage else None,
     })
 
 
+@bp.get("/usage")
+def provider_usage():
+    """Calls, credits, result counts and latency percentiles per provider endpoint and user."""
+    return _usage_response(request.args.get("provider") or None)
+
+
+@bp.get("/pdl/usage")
+def pdl_usage():
+    return _usage_response("pdl")
+
+
+def _usage_response(provider: Optional[str]):
+    days = max(1, min(request.args.get("days", default=30, type=int), 365))
+    return jsonify(usage_summary(provider=provider, days=days, user=request.args.get("user") or None))
+
+
 @bp.post("/note")
 def enrichment_note():
     data = request.get_json(force=True)
@@ -58,38 +96,8 @@ def pdl_search():
     
     data = request.get_json(force=True)
     company = data.get("company", "")
-    company_domain = data.get("company_domain", "")
-    title = data.get("title", "")
-    seniority = data.get("seniority", "")
-    location = data.get("location", "")
-    name = data.get("name", "")
-    first_name = data.get("first_name", "")
-    last_name = data.get("last_name", "")
     limit = data.get("limit", 50)
-    
-    # Build PDL search parameters (not SQL)
-    search_params = {}
-    
-    if company_domain:
-        search_params["company_domain"] = company_domain
-    elif company:
-        search_params["company_name"] = company
-    
-    if title:
-        search_params["job_title"] = title
-    
-    if seniority:
-        search_params["job_title_levels"] = seniority
-    
-    if location:
-        search_params["location_name"] = location
-
-    if name:
-        search_params["full_name"] = name
-    if first_name:
-        search_params["first_name"] = first_name
-    if last_name:
-        search_params["last_name"] = last_name
+    search_params = build_search_params(data)
     
     if not search_params:
         return jsonify({
@@ -102,14 +110,8 @@ def pdl_search():
     search_params["size"] = limit
     
     # Call PDL Person Search API
-    pdl_url = "https://api.peopledatalabs.com/v5/person/search"
-    
     try:
-        response = requests.get(
-            pdl_url,
-            params=search_params,
-            timeout=30
-        )
+        response = call_provider("pdl", "/person/search", params=search_params)
         
         if response.status_code != 200:
             return jsonify({
@@ -121,24 +123,10 @@ def pdl_search():
         result = response.json()
         
         # Transform PDL response to our format
-        transformed_results = []
-        pdl_data = result.get("data", [])
-        
-        for idx, person in enumerate(pdl_data):
-            transformed_results.append({
-                "id": person.get("id", str(idx + 1)),
-                "full_name": person.get("full_name", "Unknown"),
-                "first_name": person.get("first_name", ""),
-                "last_name": person.get("last_name", ""),
-                "title": person.get("job_title", ""),
-                "company": person.get("job_company_name", company),
-                "email": (person.get("emails") or [{}])[0].get("address") if person.get("emails") else person.get("work_email", ""),
-                "phone": (person.get("phone_numbers") or [""])[0] if person.get("phone_numbers") else "",
-                "location": person.get("location_name", ""),
-                "department": person.get("job_title_sub_role", ""),
-                "seniority": (person.get("job_title_levels") or [""])[0] if person.get("job_title_levels") else "",
-                "linkedin_url": person.get("linkedin_url", ""),
-            })
+        transformed_results = [
+            transform_pdl_person(person, idx, company)
+            for idx, person in enumerate(result.get("data", []))
+        ]
         
         return jsonify({
             "success": True,
@@ -146,6 +134,11 @@ def pdl_search():
             "results": transformed_results
         })
         
+    except ProviderUnavailable:
+        return jsonify({
+            "error": "PDL API temporarily unavailable",
+            "results": []
+        }), 503
     except requests.exceptions.Timeout:
         return jsonify({
             "error": "PDL API request timeout",
@@ -163,6 +156,140 @@ def pdl_search():
         }), 500
 
 
+def build_search_params(data: dict) -> dict:
+    """Map our search body onto PDL search parameters (not SQL); excludes api_key/size."""
+    company = data.get("company", "")
+    company_domain = data.get("company_domain", "")
+    title = data.get("title", "")
+    seniority = data.get("seniority", "")
+    location = data.get("location", "")
+    name = data.get("name", "")
+    first_name = data.get("first_name", "")
+    last_name = data.get("last_name", "")
+
+    search_params = {}
+    
+    if company_domain:
+        search_params["company_domain"] = company_domain
+    elif company:
+        search_params["company_name"] = company
+    
+    if title:
+        search_params["job_title"] = title
+    
+    if seniority:
+        search_params["job_title_levels"] = seniority
+    
+    if location:
+        search_params["location_name"] = location
+
+    if name:
+        search_params["full_name"] = name
+    if first_name:
+        search_params["first_name"] = first_name
+    if last_name:
+        search_params["last_name"] = last_name
+    return search_params
+
+
+def transform_pdl_person(person: dict, idx: int, company: str = "") -> dict:
+    return {
+        "id": person.get("id", str(idx + 1)),
+        "full_name": person.get("full_name", "Unknown"),
+        "first_name": person.get("first_name", ""),
+        "last_name": person.get("last_name", ""),
+        "title": person.get("job_title", ""),
+        "company": person.get("job_company_name", company),
+        "email": (person.get("emails") or [{}])[0].get("address") if person.get("emails") else person.get("work_email", ""),
+        "phone": (person.get("phone_numbers") or [""])[0] if person.get("phone_numbers") else "",
+        "location": person.get("location_name", ""),
+        "department": person.get("job_title_sub_role", ""),
+        "seniority": (person.get("job_title_levels") or [""])[0] if person.get("job_title_levels") else "",
+        "linkedin_url": person.get("linkedin_url", ""),
+    }
+
+
+@bp.post("/pdl/search/stream")
+def pdl_search_stream():
+    """
+    Scroll through a PDL person search, streaming results as NDJSON as each page arrives.
+
+    Expected request body: same filters as /pdl/search, plus
+    {
+        "page_size": 100,        # per upstream request (PDL max 100)
+        "max_results": 1000,     # stop after this many results; omit for all
+        "cursor": "<token>"      # resume from a "cursor" returned by a previous stream
+    }
+
+    Each line is one JSON object: {"type": "result", "result": {...}} per person,
+    {"type": "page", "cursor": ..., "total": ...} after each page, and a final
+    {"type": "done", "cursor": ..., "count": ...} or {"type": "error", ...}.
+    A null cursor in "done" means the search is exhausted.
+    """
+    cfg = current_app.config
+    pdl_api_key = cfg.get("PDL_API_KEY")
+    if not pdl_api_key:
+        return jsonify({"error": "PDL_API_KEY not configured"}), 400
+
+    data = request.get_json(force=True)
+    search_params = build_search_params(data)
+    if not search_params:
+        return jsonify({"error": "At least one search parameter required"}), 400
+    company = data.get("company", "")
+    try:
+        page_size = max(1, min(int(data.get("page_size") or 100), 100))
+        max_results = None if data.get("max_results") is None else int(data["max_results"])
+    except (TypeError, ValueError):
+        return jsonify({"error": "page_size and max_results must be integers"}), 400
+    if max_results is not None and max_results < 1:
+        return jsonify({"error": "max_results must be at least 1"}), 400
+    cursor = data.get("cursor")
+
+    def line(obj: dict) -> str:
+        return json.dumps(obj, separators=(",", ":")) + "\n"
+
+    def generate():
+        nonlocal cursor
+        count = 0
+        while True:
+            size = page_size if max_results is None else min(page_size, max_results - count)
+            if size <= 0:
+                break
+            params = {**search_params, "api_key": pdl_api_key, "size": size}
+            if cursor:
+                params["scroll_token"] = cursor
+            try:
+                # Never cached: a scroll page is tied to its token, and a cached first page would
+                # hand back a scroll token that has since expired
+                response = call_provider("pdl", "/person/search", params=params, use_cache=False)
+            except requests.exceptions.RequestException as e:
+                yield line({"type": "error", "error": f"PDL API request failed: {str(e)}", "cursor": cursor})
+                return
+            if response.status_code != 200:
+                # 404 from PDL search means no (more) matches
+                if response.status_code == 404:
+                    cursor = None
+                    break
+                yield line({"type": "error", "error": f"PDL API error: {response.status_code}", "status": response.status_code, "cursor": cursor})
+                return
+            result = response.json()
+            page = result.get("data", [])
+            for person in page:
+                yield line({"type": "result", "result": transform_pdl_person(person, count, company)})
+                count += 1
+            cursor = result.get("scroll_token") if page else None
+            yield line({"type": "page", "cursor": cursor, "total": result.get("total", 0), "count": count})
+            if not cursor:
+                break
+        yield line({"type": "done", "cursor": cursor, "count": count})
+
+    return Response(
+        stream_with_context(generate()),
+        mimetype="application/x-ndjson",
+        headers={"Cache-Control": "no-store", "X-Accel-Buffering": "no"},
+    )
+
+
 @bp.post("/pdl/identify")
 def pdl_identify():
     """
@@ -204,14 +331,8 @@ def pdl_identify():
         params["region"] = region
     
     # Call PDL Person Identify API
-    pdl_url = "https://api.peopledatalabs.com/v5/person/identify"
-    
     try:
-        response = requests.get(
-            pdl_url,
-            params=params,
-            timeout=30
-        )
+        response = call_provider("pdl", "/person/identify", params=params)
         
         if response.status_code != 200:
             return jsonify({
@@ -237,6 +358,10 @@ def pdl_identify():
                 "details": result
             }), 400
         
+    except ProviderUnavailable:
+        return jsonify({
+            "error": "PDL API temporarily unavailable"
+        }), 503
     except requests.exceptions.Timeout:
         return jsonify({
             "error": "PDL API request timeout"
@@ -286,16 +411,14 @@ def pdl_enrich():
     if data.get("linkedin_url"):
         params["linkedin_url"] = data["linkedin_url"]
     
-    pdl_url = "https://api.peopledatalabs.com/v5/person/enrich"
-    
     try:
-        response = requests.get(
-            pdl_url,
+        response = call_provider(
+            "pdl",
+            "/person/enrich",
             params=params,
             headers={
                 "X-Api-Key": pdl_api_key
             },
-            timeout=30
         )
         
         if response.status_code != 200:
@@ -309,7 +432,139 @@ def pdl_enrich():
             "data": response.json()
         })
         
+    except ProviderUnavailable:
+        return jsonify({
+            "error": "PDL API temporarily unavailable"
+        }), 503
     except Exception as e:
         return jsonify({
             "error": f"Request failed: {str(e)}"
         }), 500
+
+
+@bp.post("/jobs")
+def create_enrichment_job():
+    """
+    Enrich every person in an organization in the background.
+
+    Expected request body:
+    {
+        "organization_id": 1,
+        "only_missing": true,     # only people missing email, title or location
+        "budget": 500,            # max credits (matched records) to spend; omit for no cap
+        "batch_size": 100,
+        "apply": true,            # write matches back onto people as each batch finishes
+        "overwrite": false,       # replace non-empty fields previously written by PDL
+        "skip_fresh_days": 30     # skip people checked against PDL this recently
+    }
+    """
+    if not current_app.config.get("PDL_API_KEY"):
+        return jsonify({"error": "PDL_API_KEY not configured"}), 400
+    data = request.get_json(force=True)
+    org = db.session.get(Organization, data.get("organization_id"))
+    if not org:
+        return jsonify({"error": "org_not_found"}), 404
+    job = find_active_job(JOB_KIND, org.id)
+    if job:
+        return jsonify(serialize_job(job)), 202
+    job = create_job(JOB_KIND, org.id, detail={
+        "only_missing": bool(data.get("only_missing", True)),
+        "budget": data.get("budget"),
+        "batch_size": data.get("batch_size"),
+        "apply": bool(data.get("apply", False)),
+        "overwrite": bool(data.get("overwrite", False)),
+        "skip_fresh_days": data.get("skip_fresh_days", current_app.config["ENRICH_FRESH_DAYS"]),
+    })
+    start_job(job, run_enrichment_job)
+    return jsonify(serialize_job(job)), 202, {"Location": f"/api/enrich/jobs/{job.id}"}
+
+
+@bp.get("/jobs/<int:job_id>")
+def get_enrichment_job(job_id: int):
+    job = db.session.get(BackgroundJob, job_id)
+    if not job or job.kind != JOB_KIND:
+        return jsonify({"error": "not_found"}), 404
+    return jsonify(serialize_job(job))
+
+
+@bp.post("/jobs/<int:job_id>/resume")
+def resume_enrichment_job(job_id: int):
+    """Continue a failed, interrupted or budget-exhausted job from its last checkpoint."""
+    job = db.session.get(BackgroundJob, job_id)
+    if not job or job.kind != JOB_KIND:
+        return jsonify({"error": "not_found"}), 404
+    if not is_resumable(job):
+        return jsonify({"error": "not_resumable", "status": job.status}), 409
+    data = request.get_json(silent=True) or {}
+    detail = {"budget": data["budget"]} if "budget" in data else {}
+    job = update_job(job.id, status="queued", error=None, detail=detail)
+    start_job(job, run_enrichment_job)
+    return jsonify(serialize_job(job)), 202
+
+
+@bp.get("/jobs/<int:job_id>/results")
+def list_enrichment_results(job_id: int):
+    status = request.args.get("status", type=int)
+    limit = min(request.args.get("limit", default=100, type=int), 1000)
+    after_id = request.args.get("after_id", default=0, type=int)
+    query = select(EnrichmentResult).where(EnrichmentResult.job_id == job_id, EnrichmentResult.id > after_id)
+    if status:
+        query = query.where(EnrichmentResult.status == status)
+    results = db.session.scalars(query.order_by(EnrichmentResult.id).limit(limit)).all()
+    return jsonify([serialize_result(r) for r in results])
+
+
+@bp.post("/jobs/<int:job_id>/apply")
+def apply_enrichment_job(job_id: int):
+    """Write a finished job's matched results back onto people, in id-ordered chunks."""
+    job = db.session.get(BackgroundJob, job_id)
+    if not job or job.kind != JOB_KIND:
+        return jsonify({"error": "not_found"}), 404
+    data = request.get_json(silent=True) or {}
+    overwrite = bool(data.get("overwrite", False))
+    totals = {"matched": 0, "updated_people": 0, "fields_updated": 0}
+    after_id = 0
+    while True:
+        rows = db.session.scalars(
+            select(EnrichmentResult)
+            .where(EnrichmentResult.job_id == job_id, EnrichmentResult.status == 200, EnrichmentResult.id > after_id)
+            .order_by(EnrichmentResult.id)
+            .limit(500)
+        ).all()
+        if not rows:
+            break
+        after_id = rows[-1].id
+        result = apply_records(job.organization_id, [(r.person_id, r.data or {}) for r in rows], source=rows[0].provider, overwrite=overwrite)
+        for key in totals:
+            totals[key] += getattr(result, key)
+    return jsonify(totals)
+
+
+@bp.post("/writeback")
+def enrichment_writeback():
+    """
+    Match provider records to existing people and write their fields back.
+
+    Expected request body:
+    {
+        "organization_id": 1,
+        "source": "pdl",
+        "overwrite": false,
+        "records": [ {...PDL person or /pdl/search result...}, ... ]
+    }
+    Records match by email, then LinkedIn URL, then unique full name within the org.
+    """
+    data = request.get_json(force=True)
+    org = db.session.get(Organization, data.get("organization_id"))
+    if not org:
+        return jsonify({"error": "org_not_found"}), 404
+    records = data.get("records") or []
+    if not isinstance(records, list):
+        return jsonify({"error": "records_must_be_list"}), 400
+    result = apply_records(
+        org.id,
+        [(None, r) for r in records if isinstance(r, dict)],
+        source=data.get("source", "pdl"),
+        overwrite=bool(data.get("overwrite", False)),
+    )
+    return jsonify(result.to_dict())
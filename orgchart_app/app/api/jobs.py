@@ -0,0 +1,30 @@
+from __future__ import annotations
+from flask import Blueprint, request, jsonify
+from sqlalchemy import select
+from ..database import db
+from ..jobs import serialize_job
+from ..models import BackgroundJob
+
+
+bp = Blueprint("jobs", __name__, url_prefix="/api/jobs")
+
+
+@bp.get("")
+def list_jobs():
+    kind = request.args.get("kind")
+    org_id = request.args.get("organization_id", type=int)
+    query = select(BackgroundJob)
+    if kind:
+        query = query.where(BackgroundJob.kind == kind)
+    if org_id:
+        query = query.where(BackgroundJob.organization_id == org_id)
+    jobs = db.session.scalars(query.order_by(BackgroundJob.id.desc()).limit(100)).all()
+    return jsonify([serialize_job(j) for j in jobs])
+
+
+@bp.get("/<int:job_id>")
+def get_job(job_id: int):
+    job = db.session.get(BackgroundJob, job_id)
+    if not job:
+        return jsonify({"error": "not_found"}), 404
+    return jsonify(serialize_job(job))
@@ -2,7 +2,9 @@ from __future__ import annotations
 from flask import Blueprint, request, jsonify
 from sqlalchemy import select
 from ..database import db
+from ..jobs import create_job, find_active_job, serialize_job, start_job
 from ..models import Organization, Department
+from ..purge import purge_organization
 
 
 bp = Blueprint("organizations", __name__, url_prefix="/api/organizations")
@@ -61,6 +63,19 @@ def delete_organization(org_id: int):
     return ("", 204)
 
 
+@bp.post("/<int:org_id>/purge")
+def purge_organization_async(org_id: int):
+    """Start (or return the already running) chunked background delete of an org."""
+    org = db.session.get(Organization, org_id)
+    if not org:
+        return jsonify({"error": "not_found"}), 404
+    job = find_active_job("org_purge", org.id)
+    if not job:
+        job = create_job("org_purge", org.id, detail={"organization_name": org.name})
+        start_job(job, purge_organization)
+    return jsonify(serialize_job(job)), 202, {"Location": f"/api/jobs/{job.id}"}
+
+
 @bp.post("/<int:org_id>/departments")
 def create_department(org_id: int):
     org = db.session.get(Organization, org_id)
@@ -2,7 +2,9 @@ from __future__ import annotations
 from flask import Blueprint, request, jsonify
 from sqlalchemy import select
 from ..database import db
-from ..models import Person, Organization, Department
+from ..dedupe import MergeError, find_duplicates, merge_people
+from ..models import Person, PersonFieldSource, Organization, Department
+from ..writeback import normalize_linkedin, record_manual_edit, serialize_field_source, WRITABLE_FIELDS
 
 
 bp = Blueprint("people", __name__, url_prefix="/api/people")
@@ -48,15 +50,51 @@ def create_person():
         email=data.get("email"),
         phone=data.get("phone"),
         location=data.get("location"),
+        linkedin_url=normalize_linkedin(data.get("linkedin_url")),
         is_epc_contact=bool(data.get("is_epc_contact", False)),
         source=data.get("source", "manual"),
         reports_to_id=manager_id,
     )
     db.session.add(person)
+    db.session.flush()
+    record_manual_edit(person.id, [f for f in WRITABLE_FIELDS if data.get(f)], source=person.source or "manual")
     db.session.commit()
     return jsonify(serialize_person(person)), 201
 
 
+@bp.get("/duplicates")
+def list_duplicates():
+    org_id = request.args.get("organization_id", type=int)
+    if not org_id:
+        return jsonify({"error": "organization_id_required"}), 400
+    min_score = request.args.get("min_score", default=0.6, type=float)
+    limit = request.args.get("limit", default=500, type=int)
+    scan = find_duplicates(org_id, min_score=min_score, limit=limit)
+    response = jsonify(scan.candidates)
+    if scan.skipped_blocks:
+        # Groups of near-identical names too large to compare pairwise; their pairs are missing above
+        response.headers["X-Duplicates-Skipped-Blocks"] = str(scan.skipped_blocks)
+        response.headers["X-Duplicates-Skipped-People"] = str(scan.skipped_people)
+    return response
+
+
+@bp.post("/merge")
+def merge_duplicates():
+    """Body: {"keep_id": 1, "merge_ids": [2, 3]}"""
+    data = request.get_json(force=True)
+    try:
+        keep_id = int(data["keep_id"])
+        merge_ids = [int(i) for i in data.get("merge_ids") or []]
+    except (KeyError, TypeError, ValueError):
+        return jsonify({"error": "keep_id_and_merge_ids_required"}), 400
+    try:
+        keeper = merge_people(keep_id, merge_ids)
+    except MergeError as exc:
+        db.session.rollback()
+        return jsonify({"error": str(exc)}), 400
+    return jsonify(serialize_person(keeper))
+
+
 @bp.get("/<int:person_id>")
 def get_person(person_id: int):
     person = db.session.get(Person, person_id)
@@ -71,6 +109,8 @@ def update_person(person_id: int):
     if not person:
         return jsonify({"error": "not_found"}), 404
     data = request.get_json(force=True)
+    if "linkedin_url" in data:
+        data["linkedin_url"] = normalize_linkedin(data["linkedin_url"])
 
     if "department_id" in data and data["department_id"] is not None:
         dept = db.session.get(Department, data["department_id"])
@@ -89,6 +129,7 @@ def update_person(person_id: int):
         "email",
         "phone",
         "location",
+        "linkedin_url",
         "is_epc_contact",
         "source",
         "reports_to_id",
@@ -96,10 +137,22 @@ def update_person(person_id: int):
         if field in data:
             setattr(person, field, data[field])
 
+    record_manual_edit(person.id, [f for f in WRITABLE_FIELDS if f in data], source=data.get("source", "manual"))
     db.session.commit()
     return jsonify(serialize_person(person))
 
 
+@bp.get("/<int:person_id>/sources")
+def list_person_sources(person_id: int):
+    """Per-field provenance: which source last wrote each field and when."""
+    if not db.session.get(Person, person_id):
+        return jsonify({"error": "not_found"}), 404
+    sources = db.session.scalars(
+        select(PersonFieldSource).where(PersonFieldSource.person_id == person_id).order_by(PersonFieldSource.field)
+    ).all()
+    return jsonify([serialize_field_source(s) for s in sources])
+
+
 @bp.delete("/<int:person_id>")
 def delete_person(person_id: int):
     person = db.session.get(Person, person_id)
@@ -120,6 +173,7 @@ def serialize_person(p: Person) -> dict:
         "email": p.email,
         "phone": p.phone,
         "location": p.location,
+        "linkedin_url": p.linkedin_url,
         "is_epc_contact": p.is_epc_contact,
         "source": p.source,
         "reports_to_id": p.reports_to_id,
@@ -1,12 +1,36 @@
 from __future__ import annotations
+from collections import defaultdict
+from datetime import date
+from typing import Optional
 from flask import Blueprint, request, jsonify
-from sqlalchemy import select
+from sqlalchemy import and_, or_, select
 from ..database import db
 from ..models import Project, ProjectAssignment, Person, Organization
 
 
 bp = Blueprint("projects", __name__, url_prefix="/api/projects")
 
+DEFAULT_WINDOW_STATUSES = ("active", "planned")
+
+
+def _parse_date(value) -> Optional[date]:
+    if value in (None, ""):
+        return None
+    if isinstance(value, date):
+        return value
+    return date.fromisoformat(str(value)[:10])
+
+
+def _parse_date_fields(data: dict):
+    """Parse start_date/end_date in ``data`` in place; returns an error response for a bad value."""
+    for field in ("start_date", "end_date"):
+        if field in data:
+            try:
+                data[field] = _parse_date(data[field])
+            except ValueError:
+                return jsonify({"error": "invalid_date", "field": field, "message": "expected YYYY-MM-DD"}), 400
+    return None
+
 
 @bp.get("")
 def list_projects():
@@ -24,6 +48,9 @@ def create_project():
     org = db.session.get(Organization, data["organization_id"])
     if not org:
         return jsonify({"error": "org_not_found"}), 404
+    error = _parse_date_fields(data)
+    if error:
+        return error
     project = Project(
         organization_id=org.id,
         name=data["name"],
@@ -46,6 +73,9 @@ def update_project(project_id: int):
     if not project:
         return jsonify({"error": "not_found"}), 404
     data = request.get_json(force=True)
+    error = _parse_date_fields(data)
+    if error:
+        return error
     for field in [
         "name",
         "project_type",
@@ -72,6 +102,140 @@ def delete_project(project_id: int):
     return ("", 204)
 
 
+def _window_args():
+    """Parse organization_id/start/end/site/status query args shared by the time-window endpoints."""
+    org_id = request.args.get("organization_id", type=int)
+    if not org_id:
+        return None, (jsonify({"error": "organization_id_required"}), 400)
+    try:
+        start = _parse_date(request.args.get("start"))
+        end = _parse_date(request.args.get("end"))
+    except ValueError:
+        return None, (jsonify({"error": "invalid_date"}), 400)
+    if start and end and start > end:
+        return None, (jsonify({"error": "invalid_window"}), 400)
+    statuses = request.args.get("status")
+    return {
+        "org_id": org_id,
+        "start": start,
+        "end": end,
+        "site": request.args.get("site"),
+        "statuses": [s.strip() for s in statuses.split(",") if s.strip()] if statuses else list(DEFAULT_WINDOW_STATUSES),
+    }, None
+
+
+def window_assignments(org_id: int, start: Optional[date], end: Optional[date], site: Optional[str] = None, statuses=DEFAULT_WINDOW_STATUSES):
+    """Assignment rows on projects overlapping [start, end]; missing project dates are open-ended.
+
+    Served by the (organization_id, start_date, end_date) / (organization_id, end_date) indexes,
+    then joined to assignments and people via their person_id/project_id indexes.
+    """
+    conditions = [Project.organization_id == org_id]
+    if end:
+        conditions.append(or_(Project.start_date.is_(None), Project.start_date <= end))
+    if start:
+        conditions.append(or_(Project.end_date.is_(None), Project.end_date >= start))
+    if site:
+        conditions.append(Project.site == site)
+    if statuses:
+        conditions.append(Project.status.in_(list(statuses)))
+    return db.session.execute(
+        select(
+            Person.id, Person.full_name, Person.title, Person.location, Person.department_id,
+            Project.id, Project.name, Project.status, Project.site, Project.start_date, Project.end_date,
+            ProjectAssignment.role,
+        )
+        .join(ProjectAssignment, ProjectAssignment.project_id == Project.id)
+        .join(Person, Person.id == ProjectAssignment.person_id)
+        .where(and_(*conditions))
+        .order_by(Person.full_name, Person.id, Project.start_date)
+    ).all()
+
+
+@bp.get("/staffing")
+def staffing_window():
+    """Who is staffed on (by default) active or planned projects overlapping a date window."""
+    args, error = _window_args()
+    if error:
+        return error
+    people: dict[int, dict] = {}
+    for (person_id, full_name, title, location, department_id,
+         project_id, project_name, status, site, start_date, end_date, role) in window_assignments(
+            args["org_id"], args["start"], args["end"], args["site"], args["statuses"]):
+        entry = people.get(person_id)
+        if entry is None:
+            entry = people[person_id] = {
+                "person_id": person_id,
+                "full_name": full_name,
+                "title": title,
+                "location": location,
+                "department_id": department_id,
+                "assignments": [],
+            }
+        entry["assignments"].append({
+            "project_id": project_id,
+            "project_name": project_name,
+            "status": status,
+            "site": site,
+            "role": role,
+            "start_date": start_date.isoformat() if start_date else None,
+            "end_date": end_date.isoformat() if end_date else None,
+        })
+    return jsonify({
+        "organization_id": args["org_id"],
+        "start": args["start"].isoformat() if args["start"] else None,
+        "end": args["end"].isoformat() if args["end"] else None,
+        "people": list(people.values()),
+    })
+
+
+@bp.get("/overlaps")
+def calendar_overlaps():
+    """People double-booked across projects whose date ranges overlap within the window.
+
+    Projects with neither a start nor an end date are unscheduled and ignored.
+    """
+    args, error = _window_args()
+    if error:
+        return error
+    by_person: dict[int, list] = defaultdict(list)
+    names: dict[int, str] = {}
+    for (person_id, full_name, _title, _location, _dept,
+         project_id, project_name, _status, _site, start_date, end_date, _role) in window_assignments(
+            args["org_id"], args["start"], args["end"], args["site"], args["statuses"]):
+        if start_date is None and end_date is None:
+            continue
+        names[person_id] = full_name
+        by_person[person_id].append((start_date or date.min, end_date or date.max, project_id, project_name))
+
+    results = []
+    for person_id, intervals in by_person.items():
+        conflicts = find_overlaps(intervals)
+        if conflicts:
+            results.append({"person_id": person_id, "full_name": names[person_id], "conflicts": conflicts})
+    return jsonify({"organization_id": args["org_id"], "people": results})
+
+
+def find_overlaps(intervals: list[tuple]) -> list[dict]:
+    """Sweep (start, end, project_id, project_name) intervals sorted by start; O(n log n + k)."""
+    conflicts = []
+    active: list[tuple] = []
+    for current in sorted(intervals, key=lambda i: (i[0], i[1])):
+        active = [a for a in active if a[1] >= current[0]]
+        for other in active:
+            if other[2] == current[2]:
+                continue
+            overlap_end = min(other[1], current[1])
+            conflicts.append({
+                "project_ids": [other[2], current[2]],
+                "project_names": [other[3], current[3]],
+                "overlap_start": current[0].isoformat() if current[0] != date.min else None,
+                "overlap_end": overlap_end.isoformat() if overlap_end != date.max else None,
+            })
+        active.append(current)
+    return conflicts
+
+
 @bp.get("/<int:project_id>/assignments")
 def list_assignments(project_id: int):
     project = db.session.get(Project, project_id)
@@ -3,165 +3,116 @@ Ethical Web Scraper for Contact Discovery
 Respects robots.txt and rate limits
 DOES NOT scrape LinkedIn or other prohibited platforms
 """
+import concurrent.futures
+import json
 import requests
-import time
-import re
-from bs4 import BeautifulSoup
-from urllib.parse import urljoin, urlparse
-from urllib.robotparser import RobotFileParser
-from flask import Blueprint, request, jsonify
-from requests_cache import CachedSession
+from flask import Blueprint, Response, request, jsonify, current_app, stream_with_context
 import logging
+from ..contact_ingest import ingest_contacts
+from ..crawler import get_crawler
+from ..database import db
+from ..extraction import extract_contacts, extract_contacts_from_html, find_contact_links, parse_html
+from ..models import Department, Organization
+from ..robots import get_robots_cache
+from ..scraper_cache import get_scraper_cache
+from ..site_fetch import CONTACT_USER_AGENT, check_robots_txt, fetch_page, is_allowed_domain
 
 # Create blueprint
 scraper_bp = Blueprint('scraper', __name__)
 
-# Setup caching to avoid repeated requests
-session = CachedSession('contact_scraper_cache', expire_after=3600)
-
-# Rate limiting
-RATE_LIMIT_DELAY = 2  # seconds between requests
-last_request_time = {}
-
-# Prohibited domains (LinkedIn and similar)
-PROHIBITED_DOMAINS = [
-    'linkedin.com',
-    'facebook.com', 
-    'twitter.com',
-    'instagram.com',
-    'tiktok.com'
-]
-
 logger = logging.getLogger(__name__)
 
 
-def is_allowed_domain(url):
-    """Check if domain is allowed to be scraped"""
-    domain = urlparse(url).netloc.lower()
-    for prohibited in PROHIBITED_DOMAINS:
-        if prohibited in domain:
-            return False
-    return True
+def extract_contacts_from_page(html, base_url):
+    """Extract potential contacts from HTML content"""
+    return extract_contacts_from_html(html, base_url)
 
 
-def check_robots_txt(url):
-    """Check if robots.txt allows scraping this URL"""
-    try:
-        parsed = urlparse(url)
-        robots_url = f"{parsed.scheme}://{parsed.netloc}/robots.txt"
-        
-        rp = RobotFileParser()
-        rp.set_url(robots_url)
-        rp.read()
-        
-        return rp.can_fetch("*", url)
-    except:
-        # If we can't read robots.txt, be conservative and allow
-        return True
+def normalize_target_url(url):
+    """Default bare hostnames to https"""
+    if not url.startswith(('http://', 'https://')):
+        url = 'https://' + url
+    return url
 
 
-def rate_limit(domain):
-    """Enforce rate limiting per domain"""
-    global last_request_time
-    
-    now = time.time()
-    if domain in last_request_time:
-        elapsed = now - last_request_time[domain]
-        if elapsed < RATE_LIMIT_DELAY:
-            time.sleep(RATE_LIMIT_DELAY - elapsed)
-    
-    last_request_time[domain] = time.time()
+def scrape_refusal(target_url):
+    """Return an error body if this site may not be scraped, else None"""
+    if not is_allowed_domain(target_url):
+        return {
+            'error': 'This domain is prohibited. We do not scrape social media or LinkedIn.',
+            'prohibited': True
+        }
+    if not check_robots_txt(target_url):
+        return {
+            'error': 'robots.txt prohibits scraping this URL',
+            'allowed': False
+        }
+    return None
 
 
-def extract_contacts_from_page(html, base_url):
-    """Extract potential contacts from HTML content"""
-    soup = BeautifulSoup(html, 'lxml')
-    contacts = []
+def scrape_site(target_url, max_pages=3):
+    """
+    Scrape one site: the main page plus up to max_pages contact-looking pages.
+    Raises requests exceptions if the main page cannot be fetched.
+    """
+    all_contacts = []
+    urls_to_check = [target_url]
+    checked_urls = set()
     
-    # Find all text that might contain contact information
-    text_content = soup.get_text()
+    # Check main page
+    response = fetch_page(target_url, {
+        'User-Agent': 'Industrial-OrgChart-Bot/1.0 (Contact Discovery; +info@example.com)'
+    }).result()
+    response.raise_for_status()
     
-    # Email regex
-    email_pattern = r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b'
-    emails = re.findall(email_pattern, text_content)
+    # Parsed once for both link discovery and extraction
+    main_doc = parse_html(response.content)
     
-    # Phone regex (various formats)
-    phone_pattern = r'(\+?\d{1,3}[-.\s]?)?\(?\d{3}\)?[-.\s]?\d{3}[-.\s]?\d{4}'
-    phones = re.findall(phone_pattern, text_content)
+    # Find contact pages
+    contact_pages = find_contact_links(main_doc, target_url)
+    urls_to_check.extend(contact_pages)
     
-    # Look for common contact page patterns
-    contact_sections = soup.find_all(['div', 'section', 'article'], class_=re.compile(r'contact|team|people|staff|leadership|executive', re.I))
+    # Queue up to max_pages at once; the crawler spaces them out per domain
+    pending = []
+    for url in urls_to_check[:max_pages]:
+        if url in checked_urls or not check_robots_txt(url):
+            continue
+        checked_urls.add(url)
+        if url == target_url:
+            pending.append((url, None))
+            continue
+        pending.append((url, fetch_page(url, {'User-Agent': CONTACT_USER_AGENT})))
     
-    # Extract structured contact info
-    for section in contact_sections:
-        # Look for name + title + email patterns
-        potential_names = section.find_all(['h2', 'h3', 'h4', 'strong', 'b'])
-        for name_elem in potential_names:
-            name_text = name_elem.get_text(strip=True)
+    for url, future in pending:
+        try:
+            if future is None:
+                contacts = extract_contacts(main_doc, url)
+            else:
+                resp = future.result()
+                resp.raise_for_status()
+                contacts = extract_contacts_from_page(resp.content, url)
+            all_contacts.extend(contacts)
             
-            # Look for associated email and title nearby
-            parent = name_elem.find_parent(['div', 'li', 'article'])
-            if parent:
-                parent_text = parent.get_text()
-                
-                # Find emails in this context
-                context_emails = re.findall(email_pattern, parent_text)
-                context_phones = re.findall(phone_pattern, parent_text)
-                
-                # Try to find title
-                title = None
-                title_patterns = ['CEO', 'CTO', 'VP', 'President', 'Director', 'Manager', 'Engineer', 'Lead']
-                for pattern in title_patterns:
-                    if pattern.lower() in parent_text.lower():
-                        # Extract sentence containing the title
-                        sentences = parent_text.split('.')
-                        for sent in sentences:
-                            if pattern.lower() in sent.lower():
-                                title = sent.strip()[:100]
-                                break
-                        if title:
-                            break
-                
-                if context_emails:
-                    contacts.append({
-                        'name': name_text[:100],
-                        'email': context_emails[0] if context_emails else None,
-                        'phone': context_phones[0] if context_phones else None,
-                        'title': title,
-                        'source_url': base_url
-                    })
+        except Exception as e:
+            logger.warning(f"Error scraping {url}: {e}")
+            continue
     
-    # If no structured contacts found, return raw emails/phones
-    if not contacts and emails:
-        for email in set(emails[:10]):  # Limit to 10
-            contacts.append({
-                'name': None,
-                'email': email,
-                'phone': None,
-                'title': None,
-                'source_url': base_url
-            })
-    
-    return contacts
-
-
-def find_contact_pages(base_url, soup):
-    """Find links to potential contact/team pages"""
-    contact_keywords = ['contact', 'about', 'team', 'people', 'staff', 'leadership', 'management', 'executive']
-    contact_urls = []
-    
-    links = soup.find_all('a', href=True)
-    for link in links:
-        href = link['href']
-        text = link.get_text().lower()
-        
-        # Check if link text or URL contains contact keywords
-        if any(keyword in text or keyword in href.lower() for keyword in contact_keywords):
-            full_url = urljoin(base_url, href)
-            if urlparse(full_url).netloc == urlparse(base_url).netloc:  # Same domain only
-                contact_urls.append(full_url)
+    # Remove duplicates based on email
+    unique_contacts = []
+    seen_emails = set()
+    for contact in all_contacts:
+        email = contact.get('email')
+        if email and email not in seen_emails:
+            seen_emails.add(email)
+            unique_contacts.append(contact)
+        elif not email:
+            unique_contacts.append(contact)
     
-    return list(set(contact_urls))[:5]  # Limit to 5 pages
+    return {
+        'contacts': unique_contacts,
+        'pages_checked': len(checked_urls),
+        'total_found': len(unique_contacts)
+    }
 
 
 @scraper_bp.route('/search-contacts', methods=['POST'])
@@ -178,81 +129,15 @@ def search_contacts():
         return jsonify({'error': 'URL is required'}), 400
     
     # Validate URL
-    if not target_url.startswith(('http://', 'https://')):
-        target_url = 'https://' + target_url
-    
-    # Check if domain is allowed
-    if not is_allowed_domain(target_url):
-        return jsonify({
-            'error': 'This domain is prohibited. We do not scrape social media or LinkedIn.',
-            'prohibited': True
-        }), 403
-    
-    # Check robots.txt
-    if not check_robots_txt(target_url):
-        return jsonify({
-            'error': 'robots.txt prohibits scraping this URL',
-            'allowed': False
-        }), 403
+    target_url = normalize_target_url(target_url)
     
-    all_contacts = []
-    urls_to_check = [target_url]
-    checked_urls = set()
+    # Check the domain is allowed and robots.txt permits it
+    refusal = scrape_refusal(target_url)
+    if refusal:
+        return jsonify(refusal), 403
     
     try:
-        # Check main page
-        domain = urlparse(target_url).netloc
-        rate_limit(domain)
-        
-        response = session.get(target_url, timeout=10, headers={
-            'User-Agent': 'Industrial-OrgChart-Bot/1.0 (Contact Discovery; +info@example.com)'
-        })
-        response.raise_for_status()
-        
-        soup = BeautifulSoup(response.content, 'lxml')
-        
-        # Find contact pages
-        contact_pages = find_contact_pages(target_url, soup)
-        urls_to_check.extend(contact_pages)
-        
-        # Scrape up to max_pages
-        for url in urls_to_check[:max_pages]:
-            if url in checked_urls:
-                continue
-            
-            checked_urls.add(url)
-            rate_limit(domain)
-            
-            try:
-                resp = session.get(url, timeout=10, headers={
-                    'User-Agent': 'Industrial-OrgChart-Bot/1.0 (Contact Discovery)'
-                })
-                resp.raise_for_status()
-                
-                contacts = extract_contacts_from_page(resp.content, url)
-                all_contacts.extend(contacts)
-                
-            except Exception as e:
-                logger.warning(f"Error scraping {url}: {e}")
-                continue
-        
-        # Remove duplicates based on email
-        unique_contacts = []
-        seen_emails = set()
-        for contact in all_contacts:
-            email = contact.get('email')
-            if email and email not in seen_emails:
-                seen_emails.add(email)
-                unique_contacts.append(contact)
-            elif not email:
-                unique_contacts.append(contact)
-        
-        return jsonify({
-            'success': True,
-            'contacts': unique_contacts,
-            'pages_checked': len(checked_urls),
-            'total_found': len(unique_contacts)
-        }), 200
+        return jsonify({'success': True, **scrape_site(target_url, max_pages)}), 200
         
     except requests.exceptions.RequestException as e:
         logger.error(f"Request error: {e}")
@@ -268,6 +153,86 @@ def search_contacts():
         }), 500
 
 
+def _scrape_site_line(app, target_url, max_pages):
+    """One NDJSON record for a site in a batch; never raises"""
+    with app.app_context():
+        refusal = scrape_refusal(target_url)
+        if refusal:
+            return {'type': 'error', 'url': target_url, **refusal}
+        try:
+            return {'type': 'site', 'url': target_url, 'success': True, **scrape_site(target_url, max_pages)}
+        except requests.exceptions.RequestException as e:
+            logger.warning(f"Request error for {target_url}: {e}")
+            return {'type': 'error', 'url': target_url, 'error': f'Failed to fetch URL: {str(e)}'}
+        except Exception as e:
+            logger.error(f"Unexpected error for {target_url}: {e}")
+            return {'type': 'error', 'url': target_url, 'error': f'Error processing page: {str(e)}'}
+
+
+@scraper_bp.route('/search-contacts/batch', methods=['POST'])
+def search_contacts_batch():
+    """
+    Search many company websites at once, streaming results as NDJSON
+    POST body: { "urls": ["https://a.com", "b.com", ...], "max_pages": 3 }
+    
+    Sites are scraped concurrently; every fetch still goes through the crawler, so
+    each domain keeps its rate limit while different domains proceed in parallel.
+    Each line is {"type": "site", "url", "contacts", "pages_checked", "total_found"}
+    or {"type": "error", "url", "error"} in the order sites finish, then a final
+    {"type": "done", "sites", "succeeded", "failed", "total_found"}.
+    """
+    data = request.get_json() or {}
+    urls = data.get('urls')
+    max_pages = data.get('max_pages', 3)
+    
+    if not urls or not isinstance(urls, list):
+        return jsonify({'error': 'urls must be a non-empty list'}), 400
+    
+    max_urls = current_app.config['SCRAPER_BATCH_MAX_URLS']
+    targets = list(dict.fromkeys(normalize_target_url(str(u).strip()) for u in urls if u and str(u).strip()))
+    if not targets:
+        return jsonify({'error': 'urls must be a non-empty list'}), 400
+    if len(targets) > max_urls:
+        return jsonify({'error': f'At most {max_urls} URLs per batch'}), 400
+    
+    app = current_app._get_current_object()
+    # Site workers mostly wait on crawler futures; the crawler itself caps real fetches
+    workers = min(len(targets), current_app.config['SCRAPER_BATCH_CONCURRENCY'])
+    
+    def line(obj):
+        return json.dumps(obj, separators=(',', ':')) + '\n'
+    
+    def generate():
+        executor = concurrent.futures.ThreadPoolExecutor(max_workers=workers, thread_name_prefix='scrape-batch')
+        try:
+            futures = [executor.submit(_scrape_site_line, app, url, max_pages) for url in targets]
+            succeeded = failed = total_found = 0
+            for future in concurrent.futures.as_completed(futures):
+                result = future.result()
+                if result['type'] == 'site':
+                    succeeded += 1
+                    total_found += result['total_found']
+                else:
+                    failed += 1
+                yield line(result)
+            yield line({
+                'type': 'done',
+                'sites': len(targets),
+                'succeeded': succeeded,
+                'failed': failed,
+                'total_found': total_found
+            })
+        finally:
+            # Client went away: drop sites that have not started yet
+            executor.shutdown(wait=False, cancel_futures=True)
+    
+    return Response(
+        stream_with_context(generate()),
+        mimetype='application/x-ndjson',
+        headers={'Cache-Control': 'no-store', 'X-Accel-Buffering': 'no'}
+    )
+
+
 @scraper_bp.route('/search-company', methods=['POST'])
 def search_company_info():
     """
@@ -280,21 +245,19 @@ def search_company_info():
     if not target_url:
         return jsonify({'error': 'URL is required'}), 400
     
-    if not target_url.startswith(('http://', 'https://')):
-        target_url = 'https://' + target_url
+    target_url = normalize_target_url(target_url)
     
     if not is_allowed_domain(target_url):
         return jsonify({'error': 'Domain is prohibited'}), 403
     
     try:
-        domain = urlparse(target_url).netloc
-        rate_limit(domain)
-        
-        response = session.get(target_url, timeout=10, headers={
+        response = fetch_page(target_url, {
             'User-Agent': 'Industrial-OrgChart-Bot/1.0'
-        })
+        }).result()
         response.raise_for_status()
         
+        # Imported here so app startup doesn't pay for bs4
+        from bs4 import BeautifulSoup
         soup = BeautifulSoup(response.content, 'lxml')
         
         # Extract company info
@@ -317,3 +280,39 @@ def search_company_info():
             'error': str(e),
             'success': False
         }), 400
+
+
+@scraper_bp.route('/ingest', methods=['POST'])
+def ingest_scraped_contacts():
+    """
+    Save scraped contacts as people of an organization, skipping ones already there
+    POST body: { "organization_id": 1, "contacts": [...], "department_id": null }
+    Contacts use the search-contacts shape (name, email, phone, title, source_url).
+    """
+    data = request.get_json() or {}
+    org = db.session.get(Organization, data.get('organization_id') or 0)
+    if not org:
+        return jsonify({'error': 'organization_id is required'}), 400
+    
+    contacts = data.get('contacts')
+    if not isinstance(contacts, list):
+        return jsonify({'error': 'contacts must be a list'}), 400
+    
+    department_id = data.get('department_id')
+    if department_id:
+        department = db.session.get(Department, department_id)
+        if not department or department.organization_id != org.id:
+            return jsonify({'error': 'Invalid department'}), 400
+    
+    result = ingest_contacts(org.id, [c for c in contacts if isinstance(c, dict)], department_id=department_id)
+    return jsonify({'success': True, **result.to_dict()}), 200
+
+
+@scraper_bp.route('/stats', methods=['GET'])
+def scraper_stats():
+    """Crawler queue and robots.txt cache counters"""
+    return jsonify({
+        'crawler': get_crawler().stats(),
+        'robots': get_robots_cache().stats(),
+        'cache': get_scraper_cache().stats()
+    }), 200
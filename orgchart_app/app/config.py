@@ -22,6 +22,16 @@ for _env_path in _dotenv_candidates:
         pass
 
 
+def _parse_ttls(value: str) -> dict[str, int]:
+    """Parse "search=86400,enrich=604800" into {"search": 86400, "enrich": 604800}."""
+    ttls = {}
+    for item in value.split(","):
+        name, _, seconds = item.partition("=")
+        if name.strip() and seconds.strip():
+            ttls[name.strip()] = int(seconds)
+    return ttls
+
+
 class Config:
     SECRET_KEY = os.environ.get("SECRET_KEY", "dev-secret-key")
     SQLALCHEMY_DATABASE_URI = os.environ.get(
@@ -29,6 +39,35 @@ class Config:
     )
     SQLALCHEMY_TRACK_MODIFICATIONS = False
     SQLALCHEMY_ECHO = os.environ.get("SQLALCHEMY_ECHO", "0") == "1"
+    # Optional read replica: SELECTs during GET requests go here, everything else to DATABASE_URL
+    DATABASE_REPLICA_URL = os.environ.get("DATABASE_REPLICA_URL")
+
+    # SQLite profile, applied as PRAGMAs on every new connection. WAL lets readers run during
+    # long imports; cache_size < 0 is in KiB; an empty value leaves SQLite's default
+    SQLITE_JOURNAL_MODE = os.environ.get("SQLITE_JOURNAL_MODE", "WAL")
+    SQLITE_SYNCHRONOUS = os.environ.get("SQLITE_SYNCHRONOUS", "NORMAL")
+    SQLITE_BUSY_TIMEOUT_MS = int(os.environ.get("SQLITE_BUSY_TIMEOUT_MS", "5000"))
+    SQLITE_CACHE_SIZE = int(os.environ.get("SQLITE_CACHE_SIZE", str(-64 * 1024)))
+    SQLITE_MMAP_SIZE = int(os.environ.get("SQLITE_MMAP_SIZE", str(256 * 1024 * 1024)))
+
+    # Server database (Postgres) profile: connection pool per worker and a per-statement timeout (0 = none)
+    DB_POOL_SIZE = int(os.environ.get("DB_POOL_SIZE", "5"))
+    DB_MAX_OVERFLOW = int(os.environ.get("DB_MAX_OVERFLOW", "10"))
+    DB_POOL_TIMEOUT = float(os.environ.get("DB_POOL_TIMEOUT", "30"))
+    DB_POOL_RECYCLE = int(os.environ.get("DB_POOL_RECYCLE", "1800"))
+    DB_POOL_PRE_PING = os.environ.get("DB_POOL_PRE_PING", "1") == "1"
+    DB_STATEMENT_TIMEOUT_MS = int(os.environ.get("DB_STATEMENT_TIMEOUT_MS", "30000"))
+    # Startup schema sync: auto skips create_all/column/index checks when the stored schema fingerprint
+    # matches the models; always runs them on every start; never leaves the schema alone
+    SCHEMA_SYNC = os.environ.get("SCHEMA_SYNC", "auto")
+
+    # Per-route latency, SQL statement and response size histograms, served at /metrics (Prometheus text)
+    METRICS_ENABLED = os.environ.get("METRICS_ENABLED", "1") == "1"
+    # Log requests slower than this many ms with their heaviest SQL statements (0 = off)
+    METRICS_SLOW_REQUEST_MS = float(os.environ.get("METRICS_SLOW_REQUEST_MS", "0"))
+
+    # Rows per bulk DELETE when purging an organization in the background
+    PURGE_CHUNK_SIZE = int(os.environ.get("PURGE_CHUNK_SIZE", "1000"))
 
     # Optional enrichment provider API keys
     CLEARBIT_API_KEY = os.environ.get("CLEARBIT_API_KEY")
@@ -59,3 +98,84 @@ class Config:
     PDL_API_KEY_SOURCE = _pdl_key_source
 
     CRUNCHBASE_API_KEY = os.environ.get("CRUNCHBASE_API_KEY")
+
+    # Provider HTTP clients (one keep-alive pool per provider per worker process).
+    # Base URLs are overridable so a local stub server can stand in for the real API.
+    PDL_BASE_URL = os.environ.get("PDL_BASE_URL", "https://api.peopledatalabs.com/v5")
+    CLEARBIT_BASE_URL = os.environ.get("CLEARBIT_BASE_URL", "https://person.clearbit.com/v2")
+    CRUNCHBASE_BASE_URL = os.environ.get("CRUNCHBASE_BASE_URL", "https://api.crunchbase.com/api/v4")
+    PROVIDER_POOL_SIZE = int(os.environ.get("PROVIDER_POOL_SIZE", "10"))
+    PROVIDER_CONNECT_TIMEOUT = float(os.environ.get("PROVIDER_CONNECT_TIMEOUT", "5"))
+    PROVIDER_READ_TIMEOUT = float(os.environ.get("PROVIDER_READ_TIMEOUT", "20"))
+    PROVIDER_MAX_RETRIES = int(os.environ.get("PROVIDER_MAX_RETRIES", "3"))
+    PROVIDER_BACKOFF_FACTOR = float(os.environ.get("PROVIDER_BACKOFF_FACTOR", "0.5"))
+    PROVIDER_BACKOFF_JITTER = float(os.environ.get("PROVIDER_BACKOFF_JITTER", "0.5"))
+
+    # Per-process provider event loop: token-bucket rate limits and concurrency caps.
+    # PROVIDER_* are defaults; override per provider with PDL_/CLEARBIT_/CRUNCHBASE_ prefixes.
+    PROVIDER_IO_THREADS = int(os.environ.get("PROVIDER_IO_THREADS", "16"))
+    # Caller-side deadline per call; above PROVIDER_CONNECT_TIMEOUT + PROVIDER_READ_TIMEOUT (25 s)
+    PROVIDER_CALL_DEADLINE = float(os.environ.get("PROVIDER_CALL_DEADLINE", "30"))
+    PROVIDER_RATE_LIMIT = float(os.environ.get("PROVIDER_RATE_LIMIT", "5"))
+    PROVIDER_RATE_BURST = int(os.environ.get("PROVIDER_RATE_BURST", "10"))
+    PROVIDER_MAX_CONCURRENCY = int(os.environ.get("PROVIDER_MAX_CONCURRENCY", "8"))
+    PDL_RATE_LIMIT = os.environ.get("PDL_RATE_LIMIT")
+    PDL_RATE_BURST = os.environ.get("PDL_RATE_BURST")
+    PDL_MAX_CONCURRENCY = os.environ.get("PDL_MAX_CONCURRENCY")
+    CLEARBIT_RATE_LIMIT = os.environ.get("CLEARBIT_RATE_LIMIT")
+    CLEARBIT_MAX_CONCURRENCY = os.environ.get("CLEARBIT_MAX_CONCURRENCY")
+    CRUNCHBASE_RATE_LIMIT = os.environ.get("CRUNCHBASE_RATE_LIMIT")
+    CRUNCHBASE_MAX_CONCURRENCY = os.environ.get("CRUNCHBASE_MAX_CONCURRENCY")
+    # Circuit breaker: open after N consecutive failures, retry one call after RESET seconds
+    PROVIDER_BREAKER_FAILURES = int(os.environ.get("PROVIDER_BREAKER_FAILURES", "5"))
+    PROVIDER_BREAKER_RESET = float(os.environ.get("PROVIDER_BREAKER_RESET", "30"))
+
+    # Provider usage accounting: in-memory counters flushed to provider_usage at most this often
+    PROVIDER_USAGE_ENABLED = os.environ.get("PROVIDER_USAGE_ENABLED", "1") == "1"
+    PROVIDER_USAGE_FLUSH_SECONDS = float(os.environ.get("PROVIDER_USAGE_FLUSH_SECONDS", "30"))
+
+    # Contact scraper crawl engine: global fetch concurrency and minimum seconds between fetches to one domain
+    SCRAPER_MAX_CONCURRENCY = int(os.environ.get("SCRAPER_MAX_CONCURRENCY", "8"))
+    SCRAPER_RATE_LIMIT_DELAY = float(os.environ.get("SCRAPER_RATE_LIMIT_DELAY", "2"))
+    # SQLite file holding per-domain fetch slots shared by all worker processes (empty = per-process only)
+    SCRAPER_RATE_LIMIT_PATH = os.environ.get("SCRAPER_RATE_LIMIT_PATH", str(BASE_DIR / "scraper_slots.sqlite"))
+    # Batch contact search: sites scraped at once per request, and the most URLs one request may list
+    SCRAPER_BATCH_CONCURRENCY = int(os.environ.get("SCRAPER_BATCH_CONCURRENCY", "32"))
+    SCRAPER_BATCH_MAX_URLS = int(os.environ.get("SCRAPER_BATCH_MAX_URLS", "500"))
+
+    # Scraper HTTP cache (requests-cache): backend is sqlite, filesystem or memory; bodies are zlib-compressed.
+    # Expired pages are revalidated with ETag/Last-Modified; the SQLite store is trimmed past MAX_BYTES
+    SCRAPER_CACHE_BACKEND = os.environ.get("SCRAPER_CACHE_BACKEND", "sqlite")
+    SCRAPER_CACHE_PATH = os.environ.get("SCRAPER_CACHE_PATH", str(BASE_DIR / "contact_scraper_cache"))
+    SCRAPER_CACHE_EXPIRE = int(os.environ.get("SCRAPER_CACHE_EXPIRE", "3600"))
+    SCRAPER_CACHE_MAX_BYTES = int(os.environ.get("SCRAPER_CACHE_MAX_BYTES", str(200 * 1024 * 1024)))
+
+    # robots.txt rules cached per scheme+host; 404s and fetch failures are cached for the shorter negative TTL
+    ROBOTS_CACHE_TTL = int(os.environ.get("ROBOTS_CACHE_TTL", "86400"))
+    ROBOTS_CACHE_NEGATIVE_TTL = int(os.environ.get("ROBOTS_CACHE_NEGATIVE_TTL", "3600"))
+    ROBOTS_CACHE_MAX_ENTRIES = int(os.environ.get("ROBOTS_CACHE_MAX_ENTRIES", "1024"))
+
+    # Background site crawls: frontier rows fetched per batch/checkpoint, and per-job defaults
+    CRAWL_JOB_BATCH_SIZE = int(os.environ.get("CRAWL_JOB_BATCH_SIZE", "20"))
+    CRAWL_JOB_MAX_PAGES = int(os.environ.get("CRAWL_JOB_MAX_PAGES", "500"))
+    CRAWL_JOB_MAX_DEPTH = int(os.environ.get("CRAWL_JOB_MAX_DEPTH", "2"))
+    # Restart crawls whose worker died (no heartbeat for STALE_JOB_SECONDS), at startup and periodically
+    CRAWL_JOB_AUTO_RESUME = os.environ.get("CRAWL_JOB_AUTO_RESUME", "1") == "1"
+
+    # Persistent provider response cache (separate SQLite file, LRU-bounded)
+    ENRICH_CACHE_ENABLED = os.environ.get("ENRICH_CACHE_ENABLED", "1") == "1"
+    ENRICH_CACHE_PATH = os.environ.get("ENRICH_CACHE_PATH", str(BASE_DIR / "enrich_cache.sqlite"))
+    ENRICH_CACHE_MAX_ENTRIES = int(os.environ.get("ENRICH_CACHE_MAX_ENTRIES", "10000"))
+    ENRICH_CACHE_DEFAULT_TTL = int(os.environ.get("ENRICH_CACHE_DEFAULT_TTL", "86400"))
+    # Per-endpoint TTLs in seconds, keyed by the last path segment (search, enrich, identify, ...)
+    ENRICH_CACHE_TTLS = _parse_ttls(os.environ.get("ENRICH_CACHE_TTLS", "search=86400,enrich=604800,identify=604800"))
+
+    # Org-wide enrichment jobs: bulk endpoint batches (max 100), else concurrent calls capped by PDL_MAX_CONCURRENCY
+    ENRICH_JOB_BATCH_SIZE = int(os.environ.get("ENRICH_JOB_BATCH_SIZE", "100"))
+    ENRICH_JOB_USE_BULK = os.environ.get("ENRICH_JOB_USE_BULK", "1") == "1"
+    # People checked against a provider within this many days are skipped by later jobs (0 = never skip)
+    ENRICH_FRESH_DAYS = int(os.environ.get("ENRICH_FRESH_DAYS", "30"))
+
+    # Cache lifetime for React build files without a content hash in the name (favicon, manifest.json);
+    # hashed files are served as immutable and index.html is always revalidated by ETag
+    FRONTEND_MAX_AGE = int(os.environ.get("FRONTEND_MAX_AGE", "3600"))
@@ -0,0 +1,183 @@
+from __future__ import annotations
+from collections import defaultdict
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Iterable, Optional
+from sqlalchemy import insert
+from .database import db
+from .extraction import EMAIL_RE
+from .models import Person, PersonFieldSource
+from .versions import bump_org_version
+from .writeback import RECORD_FIELD, apply_records, match_people, people_by_name
+
+
+SOURCE = "scraper"
+INGEST_FIELDS = ("title", "email", "phone")
+INSERT_CHUNK = 500
+
+
+@dataclass
+class IngestResult:
+    received: int = 0
+    skipped: int = 0  # no usable name
+    duplicates: int = 0  # repeated within the batch
+    matched: int = 0
+    updated_people: int = 0
+    inserted: int = 0
+    inserted_ids: list[int] = field(default_factory=list)
+    # Not saved: the name fits several existing people, so it's left for someone to resolve
+    ambiguous: list[dict] = field(default_factory=list)
+
+    def to_dict(self) -> dict:
+        return {
+            "received": self.received,
+            "skipped": self.skipped,
+            "duplicates": self.duplicates,
+            "matched": self.matched,
+            "updated_people": self.updated_people,
+            "inserted": self.inserted,
+            "inserted_ids": self.inserted_ids,
+            "ambiguous": self.ambiguous,
+        }
+
+
+def _clean(value, limit: int) -> Optional[str]:
+    if not isinstance(value, str):
+        return None
+    value = " ".join(value.split())
+    return value[:limit] or None
+
+
+def normalize_contact(contact: dict) -> Optional[dict]:
+    """A scraped contact as Person fields, or None when there is no name to file it under.
+
+    Emails are lowercased so "Jane@Acme.com" and "jane@acme.com" from two pages are one person.
+    """
+    name = _clean(contact.get("name") or contact.get("full_name"), 255)
+    if not name or "@" in name:
+        return None
+    email = _clean(contact.get("email"), 255)
+    email = email.lower() if email and EMAIL_RE.fullmatch(email) else None
+    return {
+        "full_name": name,
+        "title": _clean(contact.get("title"), 255),
+        "email": email,
+        "phone": _clean(contact.get("phone"), 50),
+        "source_url": _clean(contact.get("source_url"), 1000),
+    }
+
+
+def _batch_key(record: dict) -> str:
+    return f"e:{record['email']}" if record["email"] else f"n:{record['full_name'].lower()}"
+
+
+def _merge(into: dict, record: dict) -> None:
+    for f in INGEST_FIELDS:
+        if not into[f] and record[f]:
+            into[f] = record[f]
+
+
+def ingest_contacts(org_id: int, contacts: Iterable[dict], department_id: Optional[int] = None) -> IngestResult:
+    """Add scraped contacts to an org's people, skipping anyone already there.
+
+    Contacts are normalized and deduplicated by email (else name) within the batch, then
+    matched to existing people by email or unique name. Matches only get empty fields
+    filled in; contacts whose name fits several people are reported as ``ambiguous`` and
+    not saved; the rest are bulk-inserted with ``source='scraper'`` and per-field
+    provenance pointing at the page each contact was found on. Everything is committed
+    in one transaction, so a failure leaves the org as it was.
+    """
+    result = IngestResult()
+    records: dict[str, dict] = {}
+    for contact in contacts:
+        result.received += 1
+        record = normalize_contact(contact)
+        if record is None:
+            result.skipped += 1
+            continue
+        key = _batch_key(record)
+        if key in records:
+            result.duplicates += 1
+            _merge(records[key], record)
+            continue
+        records[key] = record
+    # A name seen without an email on one page and with one on another is the same person
+    with_email = {r["full_name"].lower(): r for r in records.values() if r["email"]}
+    for key in [k for k in records if k.startswith("n:") and k[2:] in with_email]:
+        _merge(with_email[key[2:]], records.pop(key))
+        result.duplicates += 1
+    if not records:
+        return result
+
+    try:
+        _save(org_id, list(records.values()), department_id, result)
+    except Exception:
+        db.session.rollback()
+        raise
+    db.session.commit()
+    return result
+
+
+def _save(org_id: int, batch: list[dict], department_id: Optional[int], result: IngestResult) -> None:
+    matches = match_people(org_id, batch)
+    unmatched_names = [r["full_name"] for r, person_id in zip(batch, matches) if person_id is None]
+    same_name = people_by_name(org_id, unmatched_names) if unmatched_names else {}
+
+    # Existing people: fill empty fields, one write-back per page so provenance keeps its URL
+    by_page: dict[Optional[str], list[tuple[int, dict]]] = defaultdict(list)
+    new_rows: list[dict] = []
+    for record, person_id in zip(batch, matches):
+        if person_id is not None:
+            result.matched += 1
+            by_page[record["source_url"]].append((person_id, record))
+            continue
+        candidates = same_name.get(record["full_name"].lower(), [])
+        if len(candidates) > 1:
+            result.ambiguous.append({
+                "full_name": record["full_name"],
+                "email": record["email"],
+                "source_url": record["source_url"],
+                "candidate_ids": sorted(candidates),
+            })
+        else:
+            new_rows.append(record)
+    for source_url, items in by_page.items():
+        result.updated_people += apply_records(org_id, items, SOURCE, source_url=source_url, commit=False).updated_people
+
+    if not new_rows:
+        return
+
+    now = datetime.utcnow()
+    for i in range(0, len(new_rows), INSERT_CHUNK):
+        chunk = new_rows[i:i + INSERT_CHUNK]
+        ids = db.session.scalars(
+            insert(Person).returning(Person.id, sort_by_parameter_order=True),
+            [
+                {
+                    "organization_id": org_id,
+                    "department_id": department_id,
+                    "full_name": r["full_name"],
+                    "title": r["title"],
+                    "email": r["email"],
+                    "phone": r["phone"],
+                    "is_epc_contact": False,
+                    "source": SOURCE,
+                }
+                for r in chunk
+            ],
+        ).all()
+        sources = []
+        for person_id, r in zip(ids, chunk):
+            for f in (RECORD_FIELD, *INGEST_FIELDS):
+                if f == RECORD_FIELD or r[f]:
+                    sources.append({
+                        "person_id": person_id,
+                        "field": f,
+                        "source": SOURCE,
+                        "source_url": r["source_url"],
+                        "fetched_at": now,
+                    })
+        db.session.execute(insert(PersonFieldSource), sources)
+        result.inserted_ids.extend(ids)
+    result.inserted = len(result.inserted_ids)
+    bump_org_version([org_id])
@@ -0,0 +1,312 @@
+from __future__ import annotations
+import gzip
+import hashlib
+import logging
+import threading
+import time
+from datetime import datetime, timedelta
+from typing import Callable, Iterable, Optional
+from urllib.parse import urldefrag, urlparse, urlunparse
+from flask import Flask, current_app
+from sqlalchemy import func, select, update
+from .database import db
+from .extraction import CONTACT_LINK_KEYWORDS, extract_contacts, find_contact_links, parse_html
+from .jobs import ACTIVE_STATUSES, start_job, update_job
+from .models import BackgroundJob, CrawlUrl
+from .robots import MAX_CRAWL_DELAY, get_robots_cache
+from .site_fetch import CONTACT_USER_AGENT, FETCH_TIMEOUT, check_robots_txt, fetch_page, is_allowed_domain
+
+
+logger = logging.getLogger(__name__)
+
+JOB_KIND = "site_crawl"
+# A job left queued/running without a heartbeat for this long is assumed dead (e.g. worker restart).
+# Running jobs beat after every page, and consecutive pages of a site are at most one Crawl-delay plus
+# one fetch timeout apart, so this leaves room for several slow pages (or a busy shared crawler)
+STALE_JOB_SECONDS = 5 * (MAX_CRAWL_DELAY + FETCH_TIMEOUT)
+MAX_SITEMAP_FILES = 10
+MAX_LINKS_PER_PAGE = 500
+IN_CHUNK = 500
+TERMINAL_STATUSES = ("done", "failed", "skipped")
+
+
+def normalize_url(url: str) -> str:
+    """Drop the fragment and lowercase scheme and host, so trivially different links dedupe."""
+    url, _ = urldefrag(url.strip())
+    parsed = urlparse(url)
+    return urlunparse(parsed._replace(scheme=parsed.scheme.lower(), netloc=parsed.netloc.lower(), path=parsed.path or "/"))
+
+
+def url_hash(url: str) -> str:
+    return hashlib.sha1(url.encode("utf-8")).hexdigest()
+
+
+def is_resumable(job: BackgroundJob) -> bool:
+    if job.status == "failed":
+        return True
+    if job.status in ("queued", "running") and job.updated_at:
+        return (datetime.utcnow() - job.updated_at).total_seconds() > STALE_JOB_SECONDS
+    return False
+
+
+def requeue_stale_jobs() -> list[int]:
+    """Claim crawl jobs whose worker stopped heartbeating and start them again in this process.
+
+    The claim is a conditional UPDATE, so when several workers sweep at once each job is
+    picked up by exactly one of them. Failed jobs are left for ``/resume``.
+    """
+    cutoff = datetime.utcnow() - timedelta(seconds=STALE_JOB_SECONDS)
+    stale = (
+        BackgroundJob.kind == JOB_KIND,
+        BackgroundJob.status.in_(ACTIVE_STATUSES),
+        BackgroundJob.updated_at < cutoff,
+    )
+    claimed = []
+    for job_id in db.session.scalars(select(BackgroundJob.id).where(*stale)).all():
+        result = db.session.execute(
+            update(BackgroundJob).where(BackgroundJob.id == job_id, *stale)
+            .values(status="queued", error=None, updated_at=datetime.utcnow())
+        )
+        if result.rowcount == 1:
+            claimed.append(job_id)
+    db.session.commit()
+    for job_id in claimed:
+        logger.info("Resuming stale crawl job %s", job_id)
+        start_job(db.session.get(BackgroundJob, job_id), run_crawl_job)
+    return claimed
+
+
+def start_stale_job_sweeper(app: Flask) -> None:
+    """Requeue stale crawl jobs now (e.g. left running by a restart) and every STALE_JOB_SECONDS after."""
+
+    def run() -> None:
+        while True:
+            with app.app_context():
+                try:
+                    requeue_stale_jobs()
+                except Exception:
+                    logger.exception("Failed to requeue stale crawl jobs; will retry")
+                finally:
+                    db.session.remove()
+            time.sleep(STALE_JOB_SECONDS)
+
+    threading.Thread(target=run, name="crawl-job-sweeper", daemon=True).start()
+
+
+def enqueue_urls(job_id: int, urls: Iterable[str], depth: int, source: str, limit: int) -> int:
+    """Add unseen URLs to the job's frontier, at most ``limit`` of them; returns how many were added."""
+    if limit <= 0:
+        return 0
+    by_hash: dict[str, str] = {}
+    for url in urls:
+        normalized = normalize_url(url)
+        by_hash.setdefault(url_hash(normalized), normalized)
+    hashes = list(by_hash)
+    seen: set[str] = set()
+    for i in range(0, len(hashes), IN_CHUNK):
+        seen.update(db.session.scalars(
+            select(CrawlUrl.url_hash).where(CrawlUrl.job_id == job_id, CrawlUrl.url_hash.in_(hashes[i:i + IN_CHUNK]))
+        ))
+    added = 0
+    for h, url in by_hash.items():
+        if h in seen:
+            continue
+        if added >= limit:
+            break
+        db.session.add(CrawlUrl(job_id=job_id, url=url, url_hash=h, depth=depth, source=source))
+        added += 1
+    return added
+
+
+def _fetch_body(url: str) -> Optional[bytes]:
+    try:
+        resp = fetch_page(url, {"User-Agent": CONTACT_USER_AGENT}).result()
+    except Exception:  # noqa: BLE001 - a missing sitemap just means no seeds
+        return None
+    if resp.status_code != 200:
+        return None
+    content = resp.content
+    if content[:2] == b"\x1f\x8b":
+        try:
+            content = gzip.decompress(content)
+        except OSError:
+            return None
+    return content
+
+
+def sitemap_urls(start_url: str, on_fetch: Optional[Callable[[], None]] = None) -> list[str]:
+    """Page URLs listed in the site's sitemaps (from robots.txt, else /sitemap.xml), following one level of index.
+
+    ``on_fetch`` is called after each sitemap file, e.g. to heartbeat the job.
+    """
+    from lxml import etree  # deferred with the rest of the scraping stack (see extraction.py)
+    parsed = urlparse(start_url)
+    origin = f"{parsed.scheme}://{parsed.netloc}"
+    entry = get_robots_cache().entry(start_url, CONTACT_USER_AGENT)
+    pending = list((entry.parser.site_maps() if entry.parser else None) or [f"{origin}/sitemap.xml"])
+    pages: list[str] = []
+    fetched = 0
+    while pending and fetched < MAX_SITEMAP_FILES:
+        body = _fetch_body(pending.pop(0))
+        fetched += 1
+        if on_fetch is not None:
+            on_fetch()
+        if not body:
+            continue
+        try:
+            root = etree.fromstring(body, parser=etree.XMLParser(resolve_entities=False, no_network=True, recover=True))
+        except etree.XMLSyntaxError:
+            continue
+        if root is None:
+            continue
+        locs = [el.text.strip() for el in root.iter("{*}loc") if el.text]
+        if etree.QName(root).localname == "sitemapindex":
+            pending.extend(locs)
+        else:
+            pages.extend(locs)
+    return pages
+
+
+def _contact_like(url: str, host: str) -> bool:
+    parsed = urlparse(url)
+    return parsed.netloc.lower() == host and any(k in parsed.path.lower() for k in CONTACT_LINK_KEYWORDS)
+
+
+def seed_frontier(job_id: int, detail: dict) -> None:
+    start_url = detail["start_url"]
+    max_pages = detail["max_pages"]
+    added = enqueue_urls(job_id, [start_url], depth=0, source="start", limit=max_pages)
+    if detail.get("use_sitemap", True) and detail["max_depth"] > 0:
+        host = urlparse(start_url).netloc.lower()
+        seeds = [u for u in sitemap_urls(start_url, on_fetch=lambda: update_job(job_id)) if _contact_like(u, host)]
+        added += enqueue_urls(job_id, seeds, depth=1, source="sitemap", limit=max_pages - added)
+    db.session.commit()
+
+
+def _crawl_one(row: CrawlUrl, future, max_depth: int) -> list[str]:
+    """Record one fetched page on its frontier row; returns contact-page links to follow."""
+    row.fetched_at = datetime.utcnow()
+    try:
+        resp = future.result()
+    except Exception as exc:  # noqa: BLE001
+        row.status, row.error = "failed", str(exc)[:500]
+        return []
+    row.http_status = resp.status_code
+    if resp.status_code != 200:
+        row.status, row.error = "failed", f"HTTP {resp.status_code}"
+        return []
+    content_type = resp.headers.get("Content-Type", "")
+    if "html" not in content_type and content_type:
+        row.status, row.error = "skipped", f"not html: {content_type[:100]}"
+        return []
+    doc = parse_html(resp.content)
+    row.contacts = extract_contacts(doc, row.url)
+    row.status = "done"
+    return find_contact_links(doc, row.url, limit=MAX_LINKS_PER_PAGE) if row.depth < max_depth else []
+
+
+def _status_counts(job_id: int) -> dict:
+    return dict(db.session.execute(
+        select(CrawlUrl.status, func.count()).where(CrawlUrl.job_id == job_id).group_by(CrawlUrl.status)
+    ).all())
+
+
+def run_crawl_job(job_id: int) -> None:
+    """Crawl a site breadth-first from the job's frontier, committing after every batch so it can resume."""
+    job = db.session.get(BackgroundJob, job_id)
+    detail = dict(job.detail or {})
+    max_depth = detail["max_depth"]
+    max_pages = detail["max_pages"]
+    batch_size = current_app.config["CRAWL_JOB_BATCH_SIZE"]
+    contacts_found = detail.get("contacts_found", 0)
+
+    # Pages claimed by a crawl that died mid-batch go back in the queue
+    db.session.execute(
+        update(CrawlUrl).where(CrawlUrl.job_id == job_id, CrawlUrl.status == "fetching").values(status="pending")
+    )
+    if not db.session.scalar(select(func.count()).select_from(CrawlUrl).where(CrawlUrl.job_id == job_id)):
+        seed_frontier(job_id, detail)
+    db.session.commit()
+
+    while True:
+        rows = db.session.scalars(
+            select(CrawlUrl)
+            .where(CrawlUrl.job_id == job_id, CrawlUrl.status == "pending")
+            .order_by(CrawlUrl.depth, CrawlUrl.id)
+            .limit(batch_size)
+        ).all()
+        if not rows:
+            break
+        for row in rows:
+            row.status = "fetching"
+        db.session.commit()
+
+        # Queue the whole batch at once; the crawler spaces requests out per domain
+        futures = {}
+        for row in rows:
+            if not is_allowed_domain(row.url) or not check_robots_txt(row.url):
+                row.status, row.error = "skipped", "disallowed"
+                continue
+            futures[row.id] = fetch_page(row.url, {"User-Agent": CONTACT_USER_AGENT})
+
+        frontier_size = db.session.scalar(select(func.count()).select_from(CrawlUrl).where(CrawlUrl.job_id == job_id))
+        for row in rows:
+            if row.id not in futures:
+                continue
+            previous = len(row.contacts or [])  # non-zero only when re-crawling after a crash
+            links = _crawl_one(row, futures[row.id], max_depth)
+            contacts_found += len(row.contacts or []) - previous
+            if links:
+                frontier_size += enqueue_urls(job_id, links, depth=row.depth + 1, source="link", limit=max_pages - frontier_size)
+            # Heartbeat per page (and save it): with long Crawl-delays a batch can outlast STALE_JOB_SECONDS
+            update_job(job_id, detail={"contacts_found": contacts_found})
+
+        db.session.flush()
+        counts = _status_counts(job_id)
+        update_job(
+            job_id,
+            total=sum(counts.values()),
+            completed=sum(counts.get(s, 0) for s in TERMINAL_STATUSES),
+            detail={"pages": counts, "contacts_found": contacts_found},
+        )
+
+    update_job(job_id, status="complete")
+
+
+def job_contacts(job_id: int) -> list[dict]:
+    """Contacts from every crawled page of a job, deduplicated by email in crawl order."""
+    contacts: list[dict] = []
+    seen: set[str] = set()
+    after_id = 0
+    while True:
+        rows = db.session.execute(
+            select(CrawlUrl.id, CrawlUrl.contacts)
+            .where(CrawlUrl.job_id == job_id, CrawlUrl.status == "done", CrawlUrl.id > after_id)
+            .order_by(CrawlUrl.id)
+            .limit(IN_CHUNK)
+        ).all()
+        if not rows:
+            return contacts
+        after_id = rows[-1][0]
+        for _, page_contacts in rows:
+            for contact in page_contacts or []:
+                email = (contact.get("email") or "").lower()
+                if email and email in seen:
+                    continue
+                if email:
+                    seen.add(email)
+                contacts.append(contact)
+
+
+def serialize_crawl_url(u: CrawlUrl) -> dict:
+    return {
+        "id": u.id,
+        "url": u.url,
+        "depth": u.depth,
+        "source": u.source,
+        "status": u.status,
+        "http_status": u.http_status,
+        "error": u.error,
+        "contacts": u.contacts or [],
+        "fetched_at": u.fetched_at.isoformat() if u.fetched_at else None,
+    }
@@ -0,0 +1,172 @@
+from __future__ import annotations
+import concurrent.futures
+import heapq
+import itertools
+import os
+import threading
+import time
+from typing import Any, Callable, Optional, TypeVar
+from urllib.parse import urlparse
+from flask import current_app
+from .ratelimit import LocalSlotStore, SQLiteSlotStore
+from .robots import MAX_CRAWL_DELAY
+
+
+T = TypeVar("T")
+
+
+class Crawler:
+    """Fetches pages on a shared thread pool with per-domain politeness.
+
+    Submitted fetches wait on a timer queue, not in sleeping threads. A single scheduler
+    thread first takes a free worker (at most ``max_workers`` run at once), then pops the
+    next due fetch and claims its domain: if the domain's last fetch started less than its
+    delay ago, the fetch goes back on the queue for the remaining time and the next one is
+    tried. Checking at dispatch rather than at submit keeps the spacing even when fetches
+    queue behind a full pool, and lets many domains crawl in parallel under one global cap.
+    Claims go through ``slots``; a shared store keeps the spacing across worker processes.
+    """
+
+    def __init__(self, max_workers: int = 8, default_delay: float = 2.0, slots=None) -> None:
+        self.max_workers = max_workers
+        self.default_delay = default_delay
+        self.slots = slots if slots is not None else LocalSlotStore()
+        self.executor = concurrent.futures.ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="crawler")
+        self._capacity = threading.Semaphore(max_workers)
+        # (ready, seq, future, fn, domain); domain is None for fetches that skip the delay
+        self._queue: list[tuple[float, int, concurrent.futures.Future, Callable[[], Any], Optional[str]]] = []
+        self._seq = itertools.count()
+        self._cond = threading.Condition()
+        self._delays: dict[str, float] = {}
+        # Monotonic time before which a domain is known to be busy, so queued fetches for it
+        # are pushed back without asking ``slots`` again
+        self._busy_until: dict[str, float] = {}
+        self.scheduled = 0
+        self.dispatched = 0
+        self.in_flight = 0
+        self.delayed_seconds = 0.0
+        self.thread = threading.Thread(target=self._run, name="crawler-scheduler", daemon=True)
+        self.thread.start()
+
+    @staticmethod
+    def domain_of(url: str) -> str:
+        return urlparse(url).netloc.lower()
+
+    def delay_for(self, domain: str) -> float:
+        return self._delays.get(domain, self.default_delay)
+
+    def set_delay(self, domain: str, seconds: Optional[float]) -> None:
+        """Apply a site-requested delay (robots.txt Crawl-delay) to one domain; None restores the default.
+
+        It can only lengthen our own spacing, never shorten it: the effective delay is
+        ``max(default_delay, seconds)``, with ``seconds`` capped at ``MAX_CRAWL_DELAY``.
+        """
+        with self._cond:
+            if seconds is None:
+                self._delays.pop(domain, None)
+            else:
+                self._delays[domain] = max(self.default_delay, min(float(seconds), MAX_CRAWL_DELAY))
+
+    def submit(self, url: str, fn: Callable[[], T], polite: bool = True) -> concurrent.futures.Future:
+        """Schedule ``fn`` (which fetches ``url``); ``polite=False`` skips the domain delay, e.g. for cache hits."""
+        future: concurrent.futures.Future = concurrent.futures.Future()
+        domain = self.domain_of(url) if polite else None
+        with self._cond:
+            self.scheduled += 1
+            heapq.heappush(self._queue, (time.monotonic(), next(self._seq), future, fn, domain))
+            self._cond.notify()
+        return future
+
+    def map(self, urls: list[str], fn: Callable[[str], T], polite: Callable[[str], bool] | bool = True) -> list[concurrent.futures.Future]:
+        return [
+            self.submit(url, (lambda u=url: fn(u)), polite=polite(url) if callable(polite) else polite)
+            for url in urls
+        ]
+
+    def _run(self) -> None:
+        while True:
+            # Take a worker first, so the domain is claimed right before the fetch starts
+            self._capacity.acquire()
+            future, fn = self._next_due()
+            self.in_flight += 1
+            self.dispatched += 1
+            self.executor.submit(self._execute, future, fn)
+
+    def _next_due(self) -> tuple[concurrent.futures.Future, Callable[[], Any]]:
+        """Pop the next due fetch whose domain is free, pushing back the ones whose domain is not."""
+        while True:
+            with self._cond:
+                while not self._queue:
+                    self._cond.wait()
+                ready = self._queue[0][0]
+                wait = ready - time.monotonic()
+                if wait > 0:
+                    # Woken early by a new submission that may be due sooner
+                    self._cond.wait(wait)
+                    continue
+                _, _, future, fn, domain = heapq.heappop(self._queue)
+            if future.cancelled():
+                continue
+            if domain is not None:
+                now = time.monotonic()
+                wait = self._busy_until.get(domain, 0.0) - now
+                if wait <= 0:
+                    try:
+                        wait = self.slots.claim(domain, self.delay_for(domain))
+                    except Exception as exc:  # e.g. the shared slot file stayed locked; fail this fetch, not the scheduler
+                        if future.set_running_or_notify_cancel():
+                            future.set_exception(exc)
+                        continue
+                    if len(self._busy_until) > 1000:
+                        self._busy_until = {d: t for d, t in self._busy_until.items() if t > now}
+                    self._busy_until[domain] = now + (wait or self.delay_for(domain))
+                if wait > 0:
+                    with self._cond:
+                        self.delayed_seconds += wait
+                        heapq.heappush(self._queue, (now + wait, next(self._seq), future, fn, domain))
+                    continue
+            if future.set_running_or_notify_cancel():
+                return future, fn
+
+    def _execute(self, future: concurrent.futures.Future, fn: Callable[[], Any]) -> None:
+        try:
+            future.set_result(fn())
+        except BaseException as exc:
+            future.set_exception(exc)
+        finally:
+            self.in_flight -= 1
+            self._capacity.release()
+
+    def stats(self) -> dict:
+        return {
+            "max_workers": self.max_workers,
+            "default_delay": self.default_delay,
+            "queued": len(self._queue),
+            "in_flight": self.in_flight,
+            "scheduled": self.scheduled,
+            "dispatched": self.dispatched,
+            "delayed_seconds": round(self.delayed_seconds, 3),
+            "slots": self.slots.stats(),
+        }
+
+
+_crawlers: dict[int, Crawler] = {}
+_crawlers_lock = threading.Lock()
+
+
+def get_crawler(config: Optional[dict] = None) -> Crawler:
+    pid = os.getpid()
+    crawler = _crawlers.get(pid)
+    if crawler is None:
+        cfg = config if config is not None else current_app.config
+        with _crawlers_lock:
+            crawler = _crawlers.get(pid)
+            if crawler is None:
+                path = cfg.get("SCRAPER_RATE_LIMIT_PATH")
+                crawler = Crawler(
+                    max_workers=cfg["SCRAPER_MAX_CONCURRENCY"],
+                    default_delay=cfg["SCRAPER_RATE_LIMIT_DELAY"],
+                    slots=SQLiteSlotStore(path) if path else LocalSlotStore(),
+                )
+                _crawlers[pid] = crawler
+    return crawler
@@ -1,4 +1,71 @@
+from flask import g, has_request_context, request
 from flask_sqlalchemy import SQLAlchemy
+from flask_sqlalchemy.session import Session
+from sqlalchemy import inspect, text
+from sqlalchemy.schema import CreateIndex
 
 
-db = SQLAlchemy()
+REPLICA_BIND = "replica"
+READ_METHODS = ("GET", "HEAD")
+
+
+def use_primary() -> None:
+    """Make the rest of this request read from the primary, e.g. to see a write it depends on."""
+    g.db_use_primary = True
+
+
+def _reads_from_replica() -> bool:
+    return has_request_context() and request.method in READ_METHODS and not g.get("db_use_primary")
+
+
+class RoutingSession(Session):
+    """Sends SELECTs made while serving GET requests to the ``replica`` bind, when one is configured.
+
+    Only statements that are explicitly SELECTs are routed; flushes, INSERT/UPDATE/DELETE,
+    textual SQL and bind lookups without a statement (``clause=None``, e.g. ``session.connection()``)
+    go to the primary, as does all work outside a request (background jobs, startup).
+    """
+
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        if bind is None and not self._flushing and getattr(clause, "is_select", False):
+            if _reads_from_replica():
+                replica = self._db.engines.get(REPLICA_BIND)
+                if replica is not None:
+                    return replica
+        return super().get_bind(mapper=mapper, clause=clause, bind=bind, **kwargs)
+
+
+db = SQLAlchemy(session_options={"class_": RoutingSession})
+
+
+def ensure_indexes() -> None:
+    """Create indexes declared on models that are missing from an existing database.
+
+    ``create_all`` only emits indexes for tables it creates, so databases created
+    before an index was added to a model would never get it.
+    """
+    # IF NOT EXISTS rather than checkfirst: reflection can't see expression indexes (e.g. lower(email))
+    with db.engine.begin() as conn:
+        for table in db.metadata.sorted_tables:
+            for index in table.indexes:
+                conn.execute(CreateIndex(index, if_not_exists=True))
+
+
+def ensure_columns() -> None:
+    """Add nullable columns declared on models but missing from existing tables.
+
+    Covers the simple additive changes this app makes; anything else needs a real migration.
+    """
+    engine = db.engine
+    inspector = inspect(engine)
+    existing_tables = set(inspector.get_table_names())
+    with engine.begin() as conn:
+        for table in db.metadata.sorted_tables:
+            if table.name not in existing_tables:
+                continue
+            present = {c["name"] for c in inspector.get_columns(table.name)}
+            for column in table.columns:
+                if column.name in present or not column.nullable:
+                    continue
+                col_type = column.type.compile(dialect=engine.dialect)
+                conn.execute(text(f'ALTER TABLE {table.name} ADD COLUMN {column.name} {col_type}'))
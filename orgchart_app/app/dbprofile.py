@@ -0,0 +1,82 @@
+from __future__ import annotations
+from typing import Optional
+from flask import Flask
+from sqlalchemy import event
+from sqlalchemy.engine import Engine, make_url
+from .database import REPLICA_BIND, db
+
+
+def normalize_database_url(url: str) -> str:
+    """Accept the ``postgres://`` scheme some hosts hand out; SQLAlchemy only knows ``postgresql://``."""
+    if url.startswith("postgres://"):
+        return "postgresql://" + url[len("postgres://"):]
+    return url
+
+
+def engine_options(cfg, url: str) -> dict:
+    """``create_engine`` keyword arguments for ``url`` under the configured profile.
+
+    SQLite is tuned per connection instead (see ``sqlite_pragmas``); server databases get
+    a sized, pre-pinged, recycled pool and a per-statement timeout.
+    """
+    parsed = make_url(url)
+    if parsed.get_backend_name() == "sqlite":
+        return {}
+    options = {
+        "pool_size": cfg["DB_POOL_SIZE"],
+        "max_overflow": cfg["DB_MAX_OVERFLOW"],
+        "pool_timeout": cfg["DB_POOL_TIMEOUT"],
+        "pool_recycle": cfg["DB_POOL_RECYCLE"],
+        "pool_pre_ping": cfg["DB_POOL_PRE_PING"],
+    }
+    timeout_ms = cfg["DB_STATEMENT_TIMEOUT_MS"]
+    if timeout_ms and parsed.get_backend_name() == "postgresql":
+        # libpq startup option, understood by psycopg2 and psycopg 3 alike
+        options["connect_args"] = {"options": f"-c statement_timeout={int(timeout_ms)}"}
+    return options
+
+
+def sqlite_pragmas(cfg) -> list[tuple[str, object]]:
+    pragmas = [
+        ("journal_mode", cfg["SQLITE_JOURNAL_MODE"]),
+        ("synchronous", cfg["SQLITE_SYNCHRONOUS"]),
+        ("busy_timeout", cfg["SQLITE_BUSY_TIMEOUT_MS"]),
+        ("cache_size", cfg["SQLITE_CACHE_SIZE"]),
+        ("mmap_size", cfg["SQLITE_MMAP_SIZE"]),
+    ]
+    return [(name, value) for name, value in pragmas if value not in (None, "")]
+
+
+def _install_sqlite_pragmas(engine: Engine, pragmas: list[tuple[str, object]]) -> None:
+    @event.listens_for(engine, "connect")
+    def _apply_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        try:
+            for name, value in pragmas:
+                cursor.execute(f"PRAGMA {name}={value}")
+        finally:
+            cursor.close()
+
+
+def configure_database(app: Flask) -> None:
+    """Fill in engine options and the optional replica bind; call before ``db.init_app``."""
+    cfg = app.config
+    cfg["SQLALCHEMY_DATABASE_URI"] = normalize_database_url(cfg["SQLALCHEMY_DATABASE_URI"])
+    if not cfg.get("SQLALCHEMY_ENGINE_OPTIONS"):
+        cfg["SQLALCHEMY_ENGINE_OPTIONS"] = engine_options(cfg, cfg["SQLALCHEMY_DATABASE_URI"])
+    replica_url: Optional[str] = cfg.get("DATABASE_REPLICA_URL")
+    if replica_url:
+        replica_url = normalize_database_url(replica_url)
+        cfg["SQLALCHEMY_BINDS"] = {
+            **(cfg.get("SQLALCHEMY_BINDS") or {}),
+            REPLICA_BIND: {"url": replica_url, **engine_options(cfg, replica_url)},
+        }
+
+
+def init_engines(app: Flask) -> None:
+    """Attach per-connection setup to the engines ``db.init_app`` created, before any connects."""
+    pragmas = sqlite_pragmas(app.config)
+    with app.app_context():
+        for engine in db.engines.values():
+            if engine.dialect.name == "sqlite" and pragmas:
+                _install_sqlite_pragmas(engine, pragmas)
@@ -0,0 +1,270 @@
+from __future__ import annotations
+import re
+from collections import defaultdict
+from dataclasses import dataclass, field
+from difflib import SequenceMatcher
+from itertools import combinations
+from typing import Iterable, Optional
+from sqlalchemy import delete, select, update
+from .database import db
+from .models import EnrichmentResult, Person, PersonFieldSource, Project, ProjectAssignment
+from .versions import bump_org_version
+
+
+# Blocks larger than this (a common surname, a shared info@ mailbox) are split by the
+# sound of the first and last name before comparing pairwise; still-larger ones are skipped
+MAX_BLOCK_SIZE = 50
+
+_NAME_NOISE = {"mr", "mrs", "ms", "dr", "jr", "sr", "ii", "iii", "iv", "phd", "pe", "p.e"}
+_NON_ALPHA = re.compile(r"[^a-z\s]")
+_NON_DIGIT = re.compile(r"\D")
+_SOUNDEX_CODES = {
+    **dict.fromkeys("bfpv", "1"),
+    **dict.fromkeys("cgjkqsxz", "2"),
+    **dict.fromkeys("dt", "3"),
+    "l": "4",
+    **dict.fromkeys("mn", "5"),
+    "r": "6",
+}
+
+
+@dataclass
+class PersonRow:
+    id: int
+    organization_id: int
+    full_name: str
+    email: Optional[str]
+    phone: Optional[str]
+    title: Optional[str]
+    department_id: Optional[int]
+    norm_name: str = field(init=False)
+    norm_email: Optional[str] = field(init=False)
+    norm_phone: Optional[str] = field(init=False)
+
+    def __post_init__(self) -> None:
+        self.norm_name = normalize_name(self.full_name)
+        self.norm_email = normalize_email(self.email)
+        self.norm_phone = normalize_phone(self.phone)
+
+
+def normalize_email(email: Optional[str]) -> Optional[str]:
+    if not email or "@" not in email:
+        return None
+    local, _, domain = email.strip().lower().rpartition("@")
+    local = local.split("+", 1)[0]
+    return f"{local}@{domain}" if local and domain else None
+
+
+def normalize_name(name: Optional[str]) -> str:
+    """Lowercase, strip punctuation/honorifics and turn "Last, First" into "first last"."""
+    if not name:
+        return ""
+    name = name.strip().lower()
+    if "," in name:
+        last, _, first = name.partition(",")
+        name = f"{first} {last}"
+    words = [w for w in _NON_ALPHA.sub(" ", name).split() if w not in _NAME_NOISE]
+    return " ".join(words)
+
+
+def normalize_phone(phone: Optional[str]) -> Optional[str]:
+    digits = _NON_DIGIT.sub("", phone or "")
+    return digits[-10:] if len(digits) >= 7 else None
+
+
+def soundex(word: str) -> str:
+    word = "".join(ch for ch in word.lower() if ch.isalpha())
+    if not word:
+        return ""
+    encoded = word[0].upper()
+    last = _SOUNDEX_CODES.get(word[0], "")
+    for ch in word[1:]:
+        code = _SOUNDEX_CODES.get(ch, "")
+        if code and code != last:
+            encoded += code
+        if ch not in "hw":
+            last = code
+    return (encoded + "000")[:4]
+
+
+def blocking_keys(row: PersonRow) -> list[tuple]:
+    keys: list[tuple] = []
+    if row.norm_email:
+        keys.append(("email", row.organization_id, row.norm_email))
+    parts = row.norm_name.split()
+    if parts:
+        keys.append(("name", row.organization_id, soundex(parts[-1]), parts[0][0]))
+    return keys
+
+
+def score_pair(a: PersonRow, b: PersonRow) -> tuple[float, list[str]]:
+    """0..1 likelihood that two people are the same; a matching normalized name alone reaches 0.6."""
+    score = 0.0
+    reasons: list[str] = []
+    if a.norm_email and a.norm_email == b.norm_email:
+        score += 0.6
+        reasons.append("email")
+    elif a.norm_email and b.norm_email:
+        score -= 0.3
+    name_sim = SequenceMatcher(None, a.norm_name, b.norm_name).ratio() if a.norm_name and b.norm_name else 0.0
+    if name_sim >= 0.85:
+        reasons.append("name")
+        score += 0.6 * name_sim
+    else:
+        score += 0.3 * name_sim
+    if a.norm_phone and a.norm_phone == b.norm_phone:
+        score += 0.15
+        reasons.append("phone")
+    if a.title and b.title and a.title.strip().lower() == b.title.strip().lower():
+        score += 0.05
+        reasons.append("title")
+    if a.department_id and a.department_id == b.department_id:
+        score += 0.05
+        reasons.append("department")
+    return max(0.0, min(1.0, round(score, 4))), reasons
+
+
+def _split_block(members: list[PersonRow]) -> list[list[PersonRow]]:
+    """Break an oversized block into sub-blocks keyed by the soundex of first and last name."""
+    sub_blocks: dict[tuple, list[PersonRow]] = defaultdict(list)
+    for row in members:
+        parts = row.norm_name.split()
+        sub_blocks[(soundex(parts[0]), soundex(parts[-1])) if parts else ()].append(row)
+    return list(sub_blocks.values())
+
+
+def load_rows(org_id: int) -> list[PersonRow]:
+    return [
+        PersonRow(*r)
+        for r in db.session.execute(
+            select(
+                Person.id, Person.organization_id, Person.full_name, Person.email,
+                Person.phone, Person.title, Person.department_id,
+            ).where(Person.organization_id == org_id)
+        )
+    ]
+
+
+@dataclass
+class DuplicateScan:
+    candidates: list[dict]
+    # Blocks still over MAX_BLOCK_SIZE after splitting, and the people in them; their pairs were not scored
+    skipped_blocks: int = 0
+    skipped_people: int = 0
+
+
+def find_duplicates(org_id: int, min_score: float = 0.6, limit: int = 500) -> DuplicateScan:
+    """Score only pairs that share a blocking key, so work grows with block sizes, not n^2."""
+    rows = load_rows(org_id)
+    blocks: dict[tuple, list[PersonRow]] = defaultdict(list)
+    for row in rows:
+        for key in blocking_keys(row):
+            blocks[key].append(row)
+
+    scan = DuplicateScan(candidates=[])
+    seen: set[tuple[int, int]] = set()
+    for block in blocks.values():
+        for members in _split_block(block) if len(block) > MAX_BLOCK_SIZE else [block]:
+            if len(members) > MAX_BLOCK_SIZE:
+                scan.skipped_blocks += 1
+                scan.skipped_people += len(members)
+                continue
+            for a, b in combinations(members, 2):
+                pair = (a.id, b.id) if a.id < b.id else (b.id, a.id)
+                if pair in seen:
+                    continue
+                seen.add(pair)
+                score, reasons = score_pair(a, b)
+                if score >= min_score:
+                    scan.candidates.append({"person_ids": list(pair), "score": score, "reasons": reasons})
+    scan.candidates.sort(key=lambda c: (-c["score"], c["person_ids"]))
+    scan.candidates = scan.candidates[:limit]
+    return scan
+
+
+MERGE_FILL_FIELDS = ("title", "email", "phone", "location", "linkedin_url", "department_id")
+
+
+class MergeError(ValueError):
+    pass
+
+
+def merge_people(keep_id: int, merge_ids: Iterable[int]) -> Person:
+    """Fold ``merge_ids`` into ``keep_id`` with bulk re-pointing of every reference, then delete them."""
+    merge_ids = sorted({int(i) for i in merge_ids} - {keep_id})
+    if not merge_ids:
+        raise MergeError("nothing_to_merge")
+    keeper = db.session.get(Person, keep_id)
+    if not keeper:
+        raise MergeError("keep_not_found")
+    dupes = db.session.scalars(select(Person).where(Person.id.in_(merge_ids)).order_by(Person.id)).all()
+    if len(dupes) != len(merge_ids) or any(d.organization_id != keeper.organization_id for d in dupes):
+        raise MergeError("invalid_merge_ids")
+
+    # Fill gaps on the keeper from the duplicates (first non-empty wins)
+    fills = {}
+    for f in MERGE_FILL_FIELDS:
+        if getattr(keeper, f) in (None, ""):
+            value = next((getattr(d, f) for d in dupes if getattr(d, f) not in (None, "")), None)
+            if value is not None:
+                fills[f] = value
+    if keeper.reports_to_id is None or keeper.reports_to_id in merge_ids:
+        # Inherit a manager from the duplicates, never one that is being merged away
+        managers = [d.reports_to_id for d in dupes if d.reports_to_id not in (None, keep_id, *merge_ids)]
+        if managers or keeper.reports_to_id is not None:
+            fills["reports_to_id"] = managers[0] if managers else None
+    is_epc = keeper.is_epc_contact or any(d.is_epc_contact for d in dupes)
+    org_id = keeper.organization_id
+
+    db.session.execute(
+        update(Person)
+        .where(Person.reports_to_id.in_(merge_ids), Person.id != keep_id)
+        .values(reports_to_id=keep_id)
+        .execution_options(synchronize_session=False)
+    )
+    db.session.execute(
+        update(Project)
+        .where(Project.epc_contact_person_id.in_(merge_ids))
+        .values(epc_contact_person_id=keep_id)
+        .execution_options(synchronize_session=False)
+    )
+
+    # Re-point assignments, dropping ones that would duplicate a project the keeper already has
+    staffed = set(db.session.scalars(select(ProjectAssignment.project_id).where(ProjectAssignment.person_id == keep_id)))
+    repoint, drop = [], []
+    for assignment_id, project_id in db.session.execute(
+        select(ProjectAssignment.id, ProjectAssignment.project_id)
+        .where(ProjectAssignment.person_id.in_(merge_ids))
+        .order_by(ProjectAssignment.id)
+    ):
+        if project_id in staffed:
+            drop.append(assignment_id)
+        else:
+            staffed.add(project_id)
+            repoint.append(assignment_id)
+    if drop:
+        db.session.execute(delete(ProjectAssignment).where(ProjectAssignment.id.in_(drop)).execution_options(synchronize_session=False))
+    if repoint:
+        db.session.execute(
+            update(ProjectAssignment)
+            .where(ProjectAssignment.id.in_(repoint))
+            .values(person_id=keep_id)
+            .execution_options(synchronize_session=False)
+        )
+
+    # Delete duplicates before filling the keeper so copied emails don't trip uq_person_org_email
+    for d in dupes:
+        db.session.expunge(d)
+    for model in (PersonFieldSource, EnrichmentResult):
+        db.session.execute(delete(model).where(model.person_id.in_(merge_ids)).execution_options(synchronize_session=False))
+    db.session.execute(delete(Person).where(Person.id.in_(merge_ids)).execution_options(synchronize_session=False))
+    db.session.execute(
+        update(Person)
+        .where(Person.id == keep_id)
+        .values(is_epc_contact=is_epc, **fills)
+        .execution_options(synchronize_session=False)
+    )
+    bump_org_version([org_id])
+    db.session.commit()
+    db.session.refresh(keeper)
+    return keeper
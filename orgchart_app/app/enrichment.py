@@ -0,0 +1,194 @@
+from __future__ import annotations
+from datetime import datetime, timedelta
+from typing import Optional
+from flask import current_app
+from sqlalchemy import func, or_, select
+from .database import db
+from .jobs import update_job
+from .models import BackgroundJob, EnrichmentResult, Organization, Person
+from .providers import call_provider, call_provider_many
+from .writeback import apply_records, fresh_person_ids_query
+
+
+JOB_KIND = "org_enrichment"
+# A job left "running" without a checkpoint for this long is assumed dead (e.g. worker restart)
+STALE_JOB_SECONDS = 300
+
+
+def person_params(person: Person, org: Organization) -> Optional[dict]:
+    """PDL enrichment params for a person, or None if there is too little to match on."""
+    if person.email:
+        return {"email": person.email}
+    if not person.full_name:
+        return None
+    params = {"name": person.full_name, "company": org.domain or org.name}
+    if person.location:
+        params["location"] = person.location
+    return params
+
+
+def pending_people_query(org_id: int, after_id: int, only_missing: bool, fresh_days: Optional[int] = None):
+    query = select(Person).where(Person.organization_id == org_id, Person.id > after_id)
+    if fresh_days:
+        query = query.where(Person.id.not_in(fresh_person_ids_query("pdl", timedelta(days=fresh_days))))
+    if only_missing:
+        query = query.where(or_(
+            Person.email.is_(None), Person.email == "",
+            Person.title.is_(None), Person.title == "",
+            Person.location.is_(None), Person.location == "",
+        ))
+    return query.order_by(Person.id)
+
+
+def is_resumable(job: BackgroundJob) -> bool:
+    if job.status in ("failed", "budget_exhausted"):
+        return True
+    if job.status == "running" and job.updated_at:
+        return (datetime.utcnow() - job.updated_at).total_seconds() > STALE_JOB_SECONDS
+    return False
+
+
+def _bulk_enrich(api_key: str, batch: list[tuple[int, dict]]) -> Optional[list[tuple[int, int, Optional[int], Optional[dict]]]]:
+    """One POST to the bulk endpoint; None if the provider/plan doesn't offer it."""
+    response = call_provider(
+        "pdl",
+        "/person/bulk",
+        method="POST",
+        headers={"X-Api-Key": api_key},
+        json_body={"requests": [{"params": params} for _, params in batch]},
+        use_cache=False,
+    )
+    if response.status_code in (403, 404, 405):
+        return None
+    if response.status_code != 200:
+        raise RuntimeError(f"PDL bulk API error: {response.status_code}")
+    results = []
+    for (person_id, _), item in zip(batch, response.json()):
+        status = item.get("status", 500)
+        results.append((person_id, status, item.get("likelihood"), item.get("data") if status == 200 else None))
+    return results
+
+
+def _concurrent_enrich(api_key: str, batch: list[tuple[int, dict]]) -> list[tuple[int, int, Optional[int], Optional[dict]]]:
+    """Single enrich calls fanned out under the provider runtime's rate limit and concurrency cap."""
+    responses = call_provider_many("pdl", "/person/enrich", [params for _, params in batch], headers={"X-Api-Key": api_key})
+    results = []
+    for (person_id, _), response in zip(batch, responses):
+        if isinstance(response, Exception):
+            results.append((person_id, 500, None, None))
+        elif response.status_code == 200:
+            body = response.json()
+            results.append((person_id, 200, body.get("likelihood"), body.get("data")))
+        else:
+            results.append((person_id, response.status_code, None, None))
+    return results
+
+
+def run_enrichment_job(job_id: int) -> None:
+    """Enrich an org's people in id order, checkpointing after every batch so the job can resume."""
+    cfg = current_app.config
+    api_key = cfg.get("PDL_API_KEY")
+    if not api_key:
+        raise RuntimeError("PDL_API_KEY not configured")
+
+    job = db.session.get(BackgroundJob, job_id)
+    detail = dict(job.detail or {})
+    org = db.session.get(Organization, job.organization_id)
+    if not org:
+        raise RuntimeError("organization not found")
+
+    only_missing = detail.get("only_missing", True)
+    budget = detail.get("budget")
+    batch_size = min(int(detail.get("batch_size") or cfg["ENRICH_JOB_BATCH_SIZE"]), 100)
+    use_bulk = detail.get("use_bulk", cfg["ENRICH_JOB_USE_BULK"])
+    apply = detail.get("apply", False)
+    fresh_days = detail.get("skip_fresh_days", cfg["ENRICH_FRESH_DAYS"])
+    last_person_id = detail.get("last_person_id", 0)
+    credits_used = detail.get("credits_used", 0)
+    counts = {k: detail.get(k, 0) for k in ("matched", "not_found", "errors", "skipped", "people_updated", "fields_updated")}
+
+    if not job.total:
+        pending = pending_people_query(org.id, 0, only_missing, fresh_days).subquery()
+        update_job(job_id, total=db.session.scalar(select(func.count()).select_from(pending)))
+
+    while True:
+        remaining = None if budget is None else budget - credits_used
+        if remaining is not None and remaining <= 0:
+            update_job(job_id, status="budget_exhausted")
+            return
+        limit = batch_size if remaining is None else min(batch_size, remaining)
+        people = db.session.scalars(pending_people_query(org.id, last_person_id, only_missing, fresh_days).limit(limit)).all()
+        if not people:
+            break
+
+        batch: list[tuple[int, dict]] = []
+        for p in people:
+            params = person_params(p, org)
+            if params:
+                batch.append((p.id, params))
+            else:
+                counts["skipped"] += 1
+
+        results = None
+        if batch and use_bulk:
+            results = _bulk_enrich(api_key, batch)
+            if results is None:
+                use_bulk = False
+        if batch and results is None:
+            results = _concurrent_enrich(api_key, batch)
+
+        # Rows exist already only when resuming mid-batch after a crash
+        existing_by_person = {
+            r.person_id: r
+            for r in db.session.scalars(select(EnrichmentResult).where(
+                EnrichmentResult.job_id == job_id,
+                EnrichmentResult.person_id.in_([person_id for person_id, _ in batch]),
+            ))
+        } if batch else {}
+        for person_id, status, likelihood, data in results or []:
+            if status == 200:
+                counts["matched"] += 1
+                credits_used += 1
+            elif status == 404:
+                counts["not_found"] += 1
+            else:
+                counts["errors"] += 1
+            existing = existing_by_person.get(person_id)
+            if existing:
+                existing.status, existing.likelihood, existing.data = status, likelihood, data
+                existing.fetched_at = datetime.utcnow()
+            else:
+                db.session.add(EnrichmentResult(
+                    job_id=job_id, person_id=person_id, provider="pdl",
+                    status=status, likelihood=likelihood, data=data,
+                ))
+
+        db.session.flush()
+        if apply:
+            matched = [(person_id, data) for person_id, status, _, data in results or [] if status == 200 and data]
+            if matched:
+                applied = apply_records(org.id, matched, source="pdl", overwrite=detail.get("overwrite", False))
+                counts["people_updated"] += applied.updated_people
+                counts["fields_updated"] += applied.fields_updated
+
+        last_person_id = people[-1].id
+        job = update_job(
+            job_id,
+            completed=(job.completed or 0) + len(people),
+            detail={"last_person_id": last_person_id, "credits_used": credits_used, "use_bulk": use_bulk, **counts},
+        )
+
+    update_job(job_id, status="complete")
+
+
+def serialize_result(r: EnrichmentResult) -> dict:
+    return {
+        "id": r.id,
+        "job_id": r.job_id,
+        "person_id": r.person_id,
+        "provider": r.provider,
+        "status": r.status,
+        "likelihood": r.likelihood,
+        "data": r.data,
+        "fetched_at": r.fetched_at.isoformat() if r.fetched_at else None,
+    }
@@ -0,0 +1,149 @@
+"""
+Contact extraction engine for scraped pages.
+
+Parses with lxml directly and walks the DOM once, keeping a stack of the enclosing
+div/li/article containers. Each container's text, emails, phones and title are
+computed at most once, however many headings it holds.
+
+lxml is imported on first parse rather than at import time, so the app starts
+without loading it until a page is actually scraped.
+"""
+from __future__ import annotations
+import re
+from typing import Optional, Union
+from urllib.parse import urljoin, urlparse
+
+
+EMAIL_RE = re.compile(r"\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Za-z]{2,}\b")
+PHONE_RE = re.compile(r"(?:\+?\d{1,3}[-.\s]?)?\(?\d{3}\)?[-.\s]?\d{3}[-.\s]?\d{4}")
+SECTION_CLASS_RE = re.compile(r"contact|team|people|staff|leadership|executive", re.I)
+
+SECTION_TAGS = frozenset(("div", "section", "article"))
+CONTAINER_TAGS = frozenset(("div", "li", "article"))
+NAME_TAGS = frozenset(("h2", "h3", "h4", "strong", "b"))
+# Checked in this order; the first one found in a container picks its title sentence
+TITLE_KEYWORDS = ("CEO", "CTO", "VP", "President", "Director", "Manager", "Engineer", "Lead")
+CONTACT_LINK_KEYWORDS = ("contact", "about", "team", "people", "staff", "leadership", "management", "executive")
+
+MAX_FIELD_LENGTH = 100
+MAX_FALLBACK_EMAILS = 10
+MAX_CONTACT_PAGES = 5
+
+
+def parse_html(content: Union[str, bytes]):
+    """Parse a page with lxml; None for empty or unparseable content."""
+    if not content:
+        return None
+    from lxml import etree, html as lxml_html
+    if isinstance(content, str):
+        # lxml rejects str input that carries an XML encoding declaration
+        content = content.encode("utf-8")
+    try:
+        return lxml_html.fromstring(content)
+    except (etree.ParserError, ValueError):
+        return None
+
+
+def _text(el) -> str:
+    return " ".join(" ".join(el.itertext()).split())
+
+
+def _is_section(el) -> bool:
+    if el.tag not in SECTION_TAGS:
+        return False
+    classes = el.get("class")
+    return bool(classes) and any(SECTION_CLASS_RE.search(c) for c in classes.split())
+
+
+def _title(text: str) -> Optional[str]:
+    lowered = text.lower()
+    for keyword in TITLE_KEYWORDS:
+        needle = keyword.lower()
+        if needle in lowered:
+            for sentence in text.split("."):
+                if needle in sentence.lower():
+                    return sentence.strip()[:MAX_FIELD_LENGTH]
+    return None
+
+
+class _Container:
+    __slots__ = ("emails", "phones", "title")
+
+    def __init__(self, el) -> None:
+        text = _text(el)
+        self.emails = EMAIL_RE.findall(text)
+        self.phones = PHONE_RE.findall(text) if self.emails else []
+        self.title = _title(text) if self.emails else None
+
+
+def extract_contacts(doc, base_url: str) -> list[dict]:
+    """Contacts from a parsed page: a name heading inside a contact/team section, plus the
+    email, phone and title found in the heading's nearest div/li/article. Falls back to
+    bare emails from the whole page when no structured contacts are found.
+    """
+    if doc is None:
+        return []
+    from lxml import etree
+    contacts: list[dict] = []
+    containers: dict = {}
+    container_stack: list = []
+    open_sections: list = []
+
+    for event, el in etree.iterwalk(doc, events=("start", "end")):
+        tag = el.tag
+        if not isinstance(tag, str):  # comments, processing instructions
+            continue
+        if event == "end":
+            if container_stack and container_stack[-1] is el:
+                container_stack.pop()
+            if open_sections and open_sections[-1] is el:
+                open_sections.pop()
+            continue
+        if tag in NAME_TAGS and open_sections and container_stack:
+            parent = container_stack[-1]
+            info = containers.get(parent)
+            if info is None:
+                info = containers[parent] = _Container(parent)
+            if info.emails:
+                contacts.append({
+                    "name": _text(el)[:MAX_FIELD_LENGTH],
+                    "email": info.emails[0],
+                    "phone": info.phones[0] if info.phones else None,
+                    "title": info.title,
+                    "source_url": base_url,
+                })
+        if tag in CONTAINER_TAGS:
+            container_stack.append(el)
+        if _is_section(el):
+            open_sections.append(el)
+
+    if not contacts:
+        emails = EMAIL_RE.findall(_text(doc))
+        for email in dict.fromkeys(emails[:MAX_FALLBACK_EMAILS]):
+            contacts.append({"name": None, "email": email, "phone": None, "title": None, "source_url": base_url})
+    return contacts
+
+
+def extract_contacts_from_html(content: Union[str, bytes], base_url: str) -> list[dict]:
+    return extract_contacts(parse_html(content), base_url)
+
+
+def find_contact_links(doc, base_url: str, limit: int = MAX_CONTACT_PAGES) -> list[str]:
+    """Same-site links whose text or URL mentions contact/team/about-style keywords."""
+    if doc is None:
+        return []
+    host = urlparse(base_url).netloc
+    found: dict[str, None] = {}
+    for link in doc.iter("a"):
+        href = link.get("href")
+        if not href:
+            continue
+        text = link.text_content().lower()
+        href_lower = href.lower()
+        if any(keyword in text or keyword in href_lower for keyword in CONTACT_LINK_KEYWORDS):
+            full_url = urljoin(base_url, href)
+            if urlparse(full_url).netloc == host:
+                found.setdefault(full_url)
+                if len(found) >= limit:
+                    break
+    return list(found)
@@ -0,0 +1,88 @@
+from __future__ import annotations
+import logging
+import threading
+from datetime import datetime
+from typing import Any, Callable, Optional
+from flask import current_app
+from sqlalchemy import select
+from .database import db
+from .models import BackgroundJob
+
+
+logger = logging.getLogger(__name__)
+
+ACTIVE_STATUSES = ("queued", "running")
+
+
+def create_job(kind: str, organization_id: Optional[int] = None, detail: Optional[dict] = None) -> BackgroundJob:
+    job = BackgroundJob(kind=kind, organization_id=organization_id, status="queued", detail=detail or {})
+    db.session.add(job)
+    db.session.commit()
+    return job
+
+
+def find_active_job(kind: str, organization_id: Optional[int]) -> Optional[BackgroundJob]:
+    return db.session.scalars(
+        select(BackgroundJob)
+        .where(
+            BackgroundJob.kind == kind,
+            BackgroundJob.organization_id == organization_id,
+            BackgroundJob.status.in_(ACTIVE_STATUSES),
+        )
+        .order_by(BackgroundJob.id.desc())
+    ).first()
+
+
+def update_job(job_id: int, commit: bool = True, **fields: Any) -> Optional[BackgroundJob]:
+    """Set fields on a job; ``detail`` is merged into the existing dict rather than replaced."""
+    job = db.session.get(BackgroundJob, job_id)
+    if not job:
+        return None
+    if "detail" in fields:
+        fields["detail"] = {**(job.detail or {}), **(fields["detail"] or {})}
+    for key, value in fields.items():
+        setattr(job, key, value)
+    job.updated_at = datetime.utcnow()
+    if commit:
+        db.session.commit()
+    return job
+
+
+def start_job(job: BackgroundJob, target: Callable[[int], None]) -> None:
+    """Run ``target(job_id)`` on a daemon thread inside an application context.
+
+    The target is responsible for progress updates; failures are recorded on the job.
+    """
+    app = current_app._get_current_object()
+    job_id = job.id
+
+    def run() -> None:
+        with app.app_context():
+            try:
+                update_job(job_id, status="running")
+                target(job_id)
+            except Exception as exc:  # noqa: BLE001
+                logger.exception("Background job %s failed", job_id)
+                db.session.rollback()
+                update_job(job_id, status="failed", error=str(exc))
+            finally:
+                db.session.remove()
+
+    thread = threading.Thread(target=run, name=f"job-{job.kind}-{job_id}", daemon=True)
+    thread.start()
+
+
+def serialize_job(j: BackgroundJob) -> dict:
+    return {
+        "id": j.id,
+        "kind": j.kind,
+        "organization_id": j.organization_id,
+        "status": j.status,
+        "total": j.total,
+        "completed": j.completed,
+        "progress": round(j.completed / j.total, 4) if j.total else (1.0 if j.status == "complete" else 0.0),
+        "detail": j.detail or {},
+        "error": j.error,
+        "created_at": j.created_at.isoformat() if j.created_at else None,
+        "updated_at": j.updated_at.isoformat() if j.updated_at else None,
+    }
@@ -0,0 +1,258 @@
+from __future__ import annotations
+import json
+import logging
+import threading
+import time
+from bisect import bisect_left
+from typing import Optional
+from flask import Flask, Response, current_app, g, has_request_context, request
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+
+logger = logging.getLogger(__name__)
+
+# Histogram upper bounds; every histogram also has an implicit +Inf bucket
+LATENCY_BUCKETS_S = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+SQL_COUNT_BUCKETS = (0, 1, 2, 5, 10, 25, 50, 100, 250, 1000)
+SIZE_BUCKETS_BYTES = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304, 16777216)
+UNMATCHED_ROUTE = "<unmatched>"  # 404s for unknown URLs share one series instead of one per path
+MAX_SLOW_QUERIES = 10
+MAX_STATEMENT_CHARS = 500
+
+
+class Histogram:
+    __slots__ = ("bounds", "counts", "sum")
+
+    def __init__(self, bounds: tuple) -> None:
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)
+        self.sum = 0.0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect_left(self.bounds, value)] += 1
+        self.sum += value
+
+    def samples(self, name: str, labels: str) -> list[str]:
+        lines = []
+        cumulative = 0
+        for bound, count in zip((*self.bounds, "+Inf"), self.counts):
+            cumulative += count
+            lines.append(f'{name}_bucket{{{labels},le="{bound}"}} {cumulative}')
+        lines.append(f"{name}_sum{{{labels}}} {round(self.sum, 6)}")
+        lines.append(f"{name}_count{{{labels}}} {cumulative}")
+        return lines
+
+
+class _RouteStats:
+    __slots__ = ("statuses", "latency", "sql_statements", "sql_seconds", "response_bytes")
+
+    def __init__(self) -> None:
+        self.statuses: dict[int, int] = {}
+        self.latency = Histogram(LATENCY_BUCKETS_S)
+        self.sql_statements = Histogram(SQL_COUNT_BUCKETS)
+        self.sql_seconds = Histogram(LATENCY_BUCKETS_S)
+        self.response_bytes = Histogram(SIZE_BUCKETS_BYTES)
+
+
+class _RequestState:
+    __slots__ = ("started", "sql_count", "sql_seconds", "statements")
+
+    def __init__(self, keep_statements: bool) -> None:
+        self.started = time.perf_counter()
+        self.sql_count = 0
+        self.sql_seconds = 0.0
+        # statement -> [executions, seconds]; only kept when the slow-request log is on
+        self.statements: Optional[dict[str, list]] = {} if keep_statements else None
+
+
+class RequestMetrics:
+    """Per-route request counters and histograms for this process, rendered in Prometheus text format.
+
+    Series are keyed by blueprint, URL rule (not the concrete path) and method, so the
+    number of series is bounded by the number of routes.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._routes: dict[tuple[str, str, str], _RouteStats] = {}
+        self.background_sql_statements = 0
+        self.background_sql_seconds = 0.0
+        self.slow_requests = 0
+
+    def record(self, key: tuple[str, str, str], status: int, seconds: float, state: _RequestState,
+               size: Optional[int], slow: bool = False) -> None:
+        with self._lock:
+            if slow:
+                self.slow_requests += 1
+            stats = self._routes.get(key)
+            if stats is None:
+                stats = self._routes[key] = _RouteStats()
+            stats.statuses[status] = stats.statuses.get(status, 0) + 1
+            stats.latency.observe(seconds)
+            stats.sql_statements.observe(state.sql_count)
+            stats.sql_seconds.observe(state.sql_seconds)
+            if size is not None:
+                stats.response_bytes.observe(size)
+
+    def record_background_sql(self, seconds: float) -> None:
+        with self._lock:
+            self.background_sql_statements += 1
+            self.background_sql_seconds += seconds
+
+    def render(self, startup: Optional[dict] = None) -> str:
+        out = []
+        with self._lock:
+            routes = sorted(self._routes.items())
+            out += [
+                "# HELP orgchart_http_requests_total HTTP requests by route, method and status.",
+                "# TYPE orgchart_http_requests_total counter",
+            ]
+            for (bp, rule, method), stats in routes:
+                for status, count in sorted(stats.statuses.items()):
+                    out.append(f'orgchart_http_requests_total{{{_labels(bp, rule, method)},status="{status}"}} {count}')
+            for name, attr, help_text in (
+                ("orgchart_http_request_duration_seconds", "latency", "Time to build the response."),
+                ("orgchart_http_request_sql_statements", "sql_statements", "SQL statements executed per request."),
+                ("orgchart_http_request_sql_duration_seconds", "sql_seconds", "Time spent in SQL per request."),
+                ("orgchart_http_response_size_bytes", "response_bytes", "Response body size (streamed responses excluded)."),
+            ):
+                out += [f"# HELP {name} {help_text}", f"# TYPE {name} histogram"]
+                for (bp, rule, method), stats in routes:
+                    out += getattr(stats, attr).samples(name, _labels(bp, rule, method))
+            out += [
+                "# HELP orgchart_background_sql_statements_total SQL statements executed outside a request (jobs, startup).",
+                "# TYPE orgchart_background_sql_statements_total counter",
+                f"orgchart_background_sql_statements_total {self.background_sql_statements}",
+                "# HELP orgchart_background_sql_duration_seconds_total Time spent in SQL outside a request.",
+                "# TYPE orgchart_background_sql_duration_seconds_total counter",
+                f"orgchart_background_sql_duration_seconds_total {round(self.background_sql_seconds, 6)}",
+                "# HELP orgchart_slow_requests_total Requests over METRICS_SLOW_REQUEST_MS.",
+                "# TYPE orgchart_slow_requests_total counter",
+                f"orgchart_slow_requests_total {self.slow_requests}",
+            ]
+        if startup:
+            out += [
+                "# HELP orgchart_startup_phase_seconds Wall time of each create_app phase in this process.",
+                "# TYPE orgchart_startup_phase_seconds gauge",
+            ]
+            for phase, ms in startup["phases_ms"].items():
+                out.append(f'orgchart_startup_phase_seconds{{phase="{phase}"}} {ms / 1000}')
+        return "\n".join(out) + "\n"
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _labels(blueprint: str, route: str, method: str) -> str:
+    return f'blueprint="{_escape(blueprint)}",route="{_escape(route)}",method="{method}"'
+
+
+_metrics = RequestMetrics()
+_listeners_installed = False
+_listeners_lock = threading.Lock()
+
+
+def get_request_metrics() -> RequestMetrics:
+    return _metrics
+
+
+def _state() -> Optional[_RequestState]:
+    return g.get("_request_metrics") if has_request_context() else None
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany) -> None:
+    conn.info.setdefault("metrics_query_start", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany) -> None:
+    starts = conn.info.get("metrics_query_start")
+    if not starts:
+        return
+    seconds = time.perf_counter() - starts.pop()
+    state = _state()
+    if state is None:
+        _metrics.record_background_sql(seconds)
+        return
+    state.sql_count += 1
+    state.sql_seconds += seconds
+    if state.statements is not None:
+        entry = state.statements.setdefault(statement[:MAX_STATEMENT_CHARS], [0, 0.0])
+        entry[0] += 1
+        entry[1] += seconds
+
+
+def _handle_error(exception_context) -> None:
+    # A failed statement never reaches after_cursor_execute; drop its start time
+    conn = exception_context.connection
+    starts = conn.info.get("metrics_query_start") if conn is not None else None
+    if starts:
+        starts.pop()
+
+
+def _install_sql_listeners() -> None:
+    global _listeners_installed
+    with _listeners_lock:
+        if _listeners_installed:
+            return
+        # On the Engine class so every engine (and bind) the app creates is covered
+        event.listen(Engine, "before_cursor_execute", _before_cursor_execute)
+        event.listen(Engine, "after_cursor_execute", _after_cursor_execute)
+        event.listen(Engine, "handle_error", _handle_error)
+        _listeners_installed = True
+
+
+def _log_slow_request(key: tuple[str, str, str], status: int, seconds: float, state: _RequestState) -> None:
+    queries = sorted((state.statements or {}).items(), key=lambda item: item[1][1], reverse=True)
+    logger.warning("slow request %s", json.dumps({
+        "method": request.method,
+        "path": request.full_path.rstrip("?"),
+        "blueprint": key[0],
+        "route": key[1],
+        "status": status,
+        "duration_ms": round(seconds * 1000, 1),
+        "sql_statements": state.sql_count,
+        "sql_ms": round(state.sql_seconds * 1000, 1),
+        # Heaviest statements first; a high count on one statement usually means an N+1 loop
+        "queries": [
+            {"statement": statement, "count": count, "total_ms": round(total * 1000, 2)}
+            for statement, (count, total) in queries[:MAX_SLOW_QUERIES]
+        ],
+    }))
+
+
+def init_metrics(app: Flask) -> None:
+    """Time every request, count its SQL statements and expose the totals at ``/metrics``.
+
+    Streamed responses are timed until the response object is returned, not until the
+    last chunk is sent. Counters are per process; scrape each worker separately.
+    """
+    if not app.config["METRICS_ENABLED"]:
+        return
+    _install_sql_listeners()
+    slow_seconds = app.config["METRICS_SLOW_REQUEST_MS"] / 1000
+
+    @app.before_request
+    def _start_request_metrics():
+        g._request_metrics = _RequestState(keep_statements=slow_seconds > 0)
+
+    @app.after_request
+    def _record_request_metrics(response):
+        state = g.pop("_request_metrics", None)
+        if state is None:
+            return response
+        seconds = time.perf_counter() - state.started
+        rule = request.url_rule.rule if request.url_rule else UNMATCHED_ROUTE
+        key = (request.blueprint or "app", rule, request.method)
+        size = None if response.is_streamed else response.calculate_content_length()
+        slow = bool(slow_seconds) and seconds >= slow_seconds
+        _metrics.record(key, response.status_code, seconds, state, size, slow=slow)
+        if slow:
+            _log_slow_request(key, response.status_code, seconds, state)
+        return response
+
+    def metrics_view():
+        return Response(_metrics.render(startup=current_app.extensions.get("startup_timing")), mimetype="text/plain; version=0.0.4")
+
+    app.add_url_rule("/metrics", "metrics", metrics_view, methods=["GET"])
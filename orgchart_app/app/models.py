@@ -1,7 +1,7 @@
 from __future__ import annotations
-from datetime import date
+from datetime import date, datetime
 from typing import Optional
-from sqlalchemy import UniqueConstraint, String, Boolean, Date, ForeignKey
+from sqlalchemy import Index, UniqueConstraint, func, String, Boolean, Date, DateTime, ForeignKey, Integer, JSON, Text
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 from .database import db
 
@@ -41,36 +41,47 @@ class Person(db.Model):
     __tablename__ = "people"
 
     id: Mapped[int] = mapped_column(primary_key=True, autoincrement=True)
-    organization_id: Mapped[int] = mapped_column(ForeignKey("organizations.id", ondelete="CASCADE"), nullable=False)
-    department_id: Mapped[Optional[int]] = mapped_column(ForeignKey("departments.id", ondelete="SET NULL"))
+    organization_id: Mapped[int] = mapped_column(ForeignKey("organizations.id", ondelete="CASCADE"), nullable=False, index=True)
+    department_id: Mapped[Optional[int]] = mapped_column(ForeignKey("departments.id", ondelete="SET NULL"), index=True)
 
     full_name: Mapped[str] = mapped_column(String(255), nullable=False)
     title: Mapped[Optional[str]] = mapped_column(String(255))
     email: Mapped[Optional[str]] = mapped_column(String(255))
     phone: Mapped[Optional[str]] = mapped_column(String(50))
     location: Mapped[Optional[str]] = mapped_column(String(255))
+    linkedin_url: Mapped[Optional[str]] = mapped_column(String(500), index=True)  # normalized, no scheme
 
     is_epc_contact: Mapped[bool] = mapped_column(Boolean, default=False)
-    source: Mapped[Optional[str]] = mapped_column(String(100))  # e.g., manual, csv, clearbit
+    source: Mapped[Optional[str]] = mapped_column(String(100))  # e.g., manual, csv, clearbit; per-field detail in PersonFieldSource
 
-    reports_to_id: Mapped[Optional[int]] = mapped_column(ForeignKey("people.id", ondelete="SET NULL"))
+    reports_to_id: Mapped[Optional[int]] = mapped_column(ForeignKey("people.id", ondelete="SET NULL"), index=True)
 
     organization: Mapped[Organization] = relationship("Organization", back_populates="people")
     department: Mapped[Optional[Department]] = relationship("Department", back_populates="people")
     manager: Mapped[Optional["Person"]] = relationship("Person", remote_side=[id], backref="direct_reports")
 
     project_assignments: Mapped[list[ProjectAssignment]] = relationship("ProjectAssignment", back_populates="person", cascade="all, delete-orphan")
+    # ORM cascades rather than passive_deletes: SQLite runs without the foreign_keys pragma, so ON DELETE never fires there
+    enrichment_results: Mapped[list[EnrichmentResult]] = relationship("EnrichmentResult", cascade="all, delete-orphan")
+    field_sources: Mapped[list[PersonFieldSource]] = relationship("PersonFieldSource", cascade="all, delete-orphan")
 
     __table_args__ = (
         UniqueConstraint("organization_id", "email", name="uq_person_org_email"),
+        # Covers the department/location GROUP BY rollups
+        Index("ix_people_org_dept_location", "organization_id", "department_id", "location"),
     )
 
 
+# Case-insensitive matching of scraped/enriched records to people (see writeback.match_people)
+Index("ix_people_org_email_lower", Person.organization_id, func.lower(Person.email))
+Index("ix_people_org_name_lower", Person.organization_id, func.lower(Person.full_name))
+
+
 class Project(db.Model):
     __tablename__ = "projects"
 
     id: Mapped[int] = mapped_column(primary_key=True, autoincrement=True)
-    organization_id: Mapped[int] = mapped_column(ForeignKey("organizations.id", ondelete="CASCADE"), nullable=False)
+    organization_id: Mapped[int] = mapped_column(ForeignKey("organizations.id", ondelete="CASCADE"), nullable=False, index=True)
 
     name: Mapped[str] = mapped_column(String(255), nullable=False)
     project_type: Mapped[str] = mapped_column(String(50))  # maintenance | project
@@ -81,22 +92,165 @@ class Project(db.Model):
     end_date: Mapped[Optional[date]] = mapped_column(Date())
 
     epc_company: Mapped[Optional[str]] = mapped_column(String(255))
-    epc_contact_person_id: Mapped[Optional[int]] = mapped_column(ForeignKey("people.id", ondelete="SET NULL"))
+    epc_contact_person_id: Mapped[Optional[int]] = mapped_column(ForeignKey("people.id", ondelete="SET NULL"), index=True)
 
     organization: Mapped[Organization] = relationship("Organization", back_populates="projects")
     epc_contact_person: Mapped[Optional[Person]] = relationship("Person")
 
     assignments: Mapped[list[ProjectAssignment]] = relationship("ProjectAssignment", back_populates="project", cascade="all, delete-orphan")
 
+    __table_args__ = (
+        Index("ix_projects_org_status", "organization_id", "status"),
+        # Sorted date indexes for time-window (interval overlap) queries
+        Index("ix_projects_org_start_end", "organization_id", "start_date", "end_date"),
+        Index("ix_projects_org_end", "organization_id", "end_date"),
+    )
+
 
 class ProjectAssignment(db.Model):
     __tablename__ = "project_assignments"
 
     id: Mapped[int] = mapped_column(primary_key=True, autoincrement=True)
-    project_id: Mapped[int] = mapped_column(ForeignKey("projects.id", ondelete="CASCADE"), nullable=False)
-    person_id: Mapped[int] = mapped_column(ForeignKey("people.id", ondelete="CASCADE"), nullable=False)
+    project_id: Mapped[int] = mapped_column(ForeignKey("projects.id", ondelete="CASCADE"), nullable=False, index=True)
+    person_id: Mapped[int] = mapped_column(ForeignKey("people.id", ondelete="CASCADE"), nullable=False, index=True)
 
     role: Mapped[Optional[str]] = mapped_column(String(100))  # e.g., PM, Maintenance Lead
 
     project: Mapped[Project] = relationship("Project", back_populates="assignments")
     person: Mapped[Person] = relationship("Person", back_populates="project_assignments")
+
+
+class OrganizationVersion(db.Model):
+    """Monotonic per-org counter bumped whenever the org's people/departments/projects change."""
+
+    __tablename__ = "organization_versions"
+
+    organization_id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=False)
+    version: Mapped[int] = mapped_column(Integer, nullable=False, default=1)
+
+
+class BackgroundJob(db.Model):
+    __tablename__ = "background_jobs"
+
+    id: Mapped[int] = mapped_column(primary_key=True, autoincrement=True)
+    kind: Mapped[str] = mapped_column(String(50), nullable=False)  # e.g., org_purge
+    # Plain column (no FK) so the job outlives the organization it purges
+    organization_id: Mapped[Optional[int]] = mapped_column(Integer, index=True)
+    status: Mapped[str] = mapped_column(String(20), nullable=False, default="queued")  # queued, running, complete, failed
+
+    total: Mapped[int] = mapped_column(Integer, default=0)
+    completed: Mapped[int] = mapped_column(Integer, default=0)
+    detail: Mapped[Optional[dict]] = mapped_column(JSON)  # step/checkpoint info, job-kind specific
+    error: Mapped[Optional[str]] = mapped_column(Text)
+
+    created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
+    updated_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+
+class EnrichmentResult(db.Model):
+    """Raw provider answer for one person within a bulk enrichment job."""
+
+    __tablename__ = "enrichment_results"
+
+    id: Mapped[int] = mapped_column(primary_key=True, autoincrement=True)
+    job_id: Mapped[int] = mapped_column(ForeignKey("background_jobs.id", ondelete="CASCADE"), nullable=False, index=True)
+    person_id: Mapped[int] = mapped_column(ForeignKey("people.id", ondelete="CASCADE"), nullable=False, index=True)
+    provider: Mapped[str] = mapped_column(String(50), nullable=False)  # e.g., pdl
+    status: Mapped[int] = mapped_column(Integer, nullable=False)  # provider status: 200 match, 404 no match
+    likelihood: Mapped[Optional[int]] = mapped_column(Integer)
+    data: Mapped[Optional[dict]] = mapped_column(JSON)
+    fetched_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
+
+    __table_args__ = (
+        UniqueConstraint("job_id", "person_id", name="uq_enrichment_result_job_person"),
+        # Freshness checks: which people a provider answered for recently (writeback.fresh_person_ids_query)
+        Index("ix_enrichment_results_provider_fetched", "provider", "fetched_at"),
+    )
+
+
+class PersonFieldSource(db.Model):
+    """Where each field of a person last came from and when it was fetched."""
+
+    __tablename__ = "person_field_sources"
+
+    id: Mapped[int] = mapped_column(primary_key=True, autoincrement=True)
+    person_id: Mapped[int] = mapped_column(ForeignKey("people.id", ondelete="CASCADE"), nullable=False, index=True)
+    # A Person column name, or "_record" for "the whole record was checked against this source"
+    field: Mapped[str] = mapped_column(String(50), nullable=False)
+    source: Mapped[str] = mapped_column(String(100), nullable=False)  # e.g., manual, csv, pdl
+    source_url: Mapped[Optional[str]] = mapped_column(String(1000))
+    fetched_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
+
+    __table_args__ = (
+        UniqueConstraint("person_id", "field", name="uq_person_field_source"),
+        Index("ix_person_field_sources_field_source_fetched", "field", "source", "fetched_at"),
+    )
+
+
+class CrawlUrl(db.Model):
+    """One URL in a crawl job's frontier; rows are never re-fetched once done."""
+
+    __tablename__ = "crawl_frontier"
+
+    id: Mapped[int] = mapped_column(primary_key=True, autoincrement=True)
+    job_id: Mapped[int] = mapped_column(ForeignKey("background_jobs.id", ondelete="CASCADE"), nullable=False)
+    url: Mapped[str] = mapped_column(Text, nullable=False)
+    url_hash: Mapped[str] = mapped_column(String(40), nullable=False)  # sha1 of the normalized URL, for dedupe
+    depth: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    source: Mapped[str] = mapped_column(String(20), nullable=False, default="link")  # start, sitemap, link
+    status: Mapped[str] = mapped_column(String(20), nullable=False, default="pending")  # pending, fetching, done, failed, skipped
+    http_status: Mapped[Optional[int]] = mapped_column(Integer)
+    error: Mapped[Optional[str]] = mapped_column(String(500))
+    contacts: Mapped[Optional[list]] = mapped_column(JSON)
+    fetched_at: Mapped[Optional[datetime]] = mapped_column(DateTime)
+
+    __table_args__ = (
+        UniqueConstraint("job_id", "url_hash", name="uq_crawl_frontier_job_url"),
+        Index("ix_crawl_frontier_job_status_depth", "job_id", "status", "depth", "id"),
+    )
+
+
+class ProviderUsage(db.Model):
+    """Hourly rollup of outbound provider calls, one row per provider/endpoint/user/status class."""
+
+    __tablename__ = "provider_usage"
+
+    id: Mapped[int] = mapped_column(primary_key=True, autoincrement=True)
+    bucket: Mapped[datetime] = mapped_column(DateTime, nullable=False)  # start of the hour (UTC)
+    provider: Mapped[str] = mapped_column(String(50), nullable=False)
+    endpoint: Mapped[str] = mapped_column(String(100), nullable=False)
+    user: Mapped[str] = mapped_column(String(100), nullable=False)  # X-User header, or "system" for jobs
+    status_class: Mapped[str] = mapped_column(String(10), nullable=False)  # 2xx, 404, 429, 4xx, 5xx, error
+
+    calls: Mapped[int] = mapped_column(Integer, default=0)
+    cache_hits: Mapped[int] = mapped_column(Integer, default=0)
+    credits: Mapped[int] = mapped_column(Integer, default=0)
+    results: Mapped[int] = mapped_column(Integer, default=0)
+    latency_ms_total: Mapped[int] = mapped_column(Integer, default=0)
+    latency_ms_max: Mapped[int] = mapped_column(Integer, default=0)
+    # Latency histogram: count of calls at or under each bound (ms), non-cumulative
+    le_50: Mapped[int] = mapped_column(Integer, default=0)
+    le_100: Mapped[int] = mapped_column(Integer, default=0)
+    le_250: Mapped[int] = mapped_column(Integer, default=0)
+    le_500: Mapped[int] = mapped_column(Integer, default=0)
+    le_1000: Mapped[int] = mapped_column(Integer, default=0)
+    le_2500: Mapped[int] = mapped_column(Integer, default=0)
+    le_5000: Mapped[int] = mapped_column(Integer, default=0)
+    le_10000: Mapped[int] = mapped_column(Integer, default=0)
+    le_inf: Mapped[int] = mapped_column(Integer, default=0)
+    last_call_at: Mapped[Optional[datetime]] = mapped_column(DateTime)
+
+    __table_args__ = (
+        UniqueConstraint("bucket", "provider", "endpoint", "user", "status_class", name="uq_provider_usage_key"),
+        Index("ix_provider_usage_provider_bucket", "provider", "bucket"),
+    )
+
+
+class SchemaMeta(db.Model):
+    """Key/value facts about the database itself, e.g. the fingerprint of the schema it was last synced to."""
+
+    __tablename__ = "schema_meta"
+
+    key: Mapped[str] = mapped_column(String(100), primary_key=True)
+    value: Mapped[str] = mapped_column(String(255), nullable=False)
+    updated_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
@@ -0,0 +1,29 @@
+"""Shared plumbing for outbound enrichment provider calls (People Data Labs, Clearbit, Crunchbase)."""
+from .aio import ProviderRuntime, get_runtime, run_call, run_many
+from .cache import ResponseCache, get_response_cache
+from .gateway import ProviderResponse, call_provider, call_provider_many
+from .http import ProviderClient, get_client
+from .resilience import CircuitBreaker, ProviderUnavailable, SingleFlight, get_breaker, resilience_stats
+from .usage import UsageRecorder, get_usage_recorder, usage_summary
+
+__all__ = [
+    "CircuitBreaker",
+    "ProviderClient",
+    "ProviderRuntime",
+    "ProviderUnavailable",
+    "ProviderResponse",
+    "ResponseCache",
+    "SingleFlight",
+    "UsageRecorder",
+    "call_provider",
+    "call_provider_many",
+    "get_breaker",
+    "get_client",
+    "get_response_cache",
+    "get_runtime",
+    "get_usage_recorder",
+    "resilience_stats",
+    "run_call",
+    "run_many",
+    "usage_summary",
+]
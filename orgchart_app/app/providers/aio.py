@@ -0,0 +1,212 @@
+from __future__ import annotations
+import asyncio
+import concurrent.futures
+import os
+import threading
+import time
+from typing import Any, Callable, Optional, TypeVar
+import requests
+from flask import current_app
+from .http import RetryPolicy
+
+
+T = TypeVar("T")
+
+
+class TokenBucket:
+    """Refills ``rate`` tokens per second up to ``burst``; ``acquire`` waits without blocking the loop."""
+
+    def __init__(self, rate: float, burst: int) -> None:
+        self.rate = rate
+        self.capacity = max(1, burst)
+        self.tokens = float(self.capacity)
+        self.updated = time.monotonic()
+        self._lock = asyncio.Lock()
+        self.waits = 0
+
+    async def acquire(self) -> None:
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                self.waits += 1
+                await asyncio.sleep((1 - self.tokens) / self.rate)
+
+
+class ProviderLimits:
+    def __init__(self, rate: float, burst: int, max_concurrency: int) -> None:
+        self.bucket = TokenBucket(rate, burst)
+        self.semaphore = asyncio.Semaphore(max_concurrency)
+        self.max_concurrency = max_concurrency
+        self.in_flight = 0
+        self.waiting = 0
+        self.completed = 0
+        self.abandoned = 0
+        self.retries = 0
+
+    def stats(self) -> dict:
+        return {
+            "rate_per_sec": self.bucket.rate,
+            "burst": self.bucket.capacity,
+            "max_concurrency": self.max_concurrency,
+            "in_flight": self.in_flight,
+            "waiting": self.waiting,
+            "completed": self.completed,
+            "abandoned": self.abandoned,
+            "retries": self.retries,
+            "throttled_waits": self.bucket.waits,
+        }
+
+
+class ProviderRuntime:
+    """One asyncio event loop per process that admits provider calls under per-provider limits.
+
+    Admitted calls run the blocking pooled HTTP client on a small shared I/O executor, so the
+    number of threads talking to providers stays fixed no matter how many requests are waiting.
+    """
+
+    def __init__(self, io_threads: int = 16) -> None:
+        self.loop = asyncio.new_event_loop()
+        self.executor = concurrent.futures.ThreadPoolExecutor(max_workers=io_threads, thread_name_prefix="provider-io")
+        self.limits: dict[str, ProviderLimits] = {}
+        self._limits_lock = threading.Lock()
+        self.thread = threading.Thread(target=self._run_loop, name="provider-loop", daemon=True)
+        self.thread.start()
+
+    def _run_loop(self) -> None:
+        asyncio.set_event_loop(self.loop)
+        self.loop.run_forever()
+
+    def limits_for(self, provider: str, cfg) -> ProviderLimits:
+        limits = self.limits.get(provider)
+        if limits is None:
+            with self._limits_lock:
+                limits = self.limits.get(provider)
+                if limits is None:
+                    prefix = provider.upper()
+                    limits = ProviderLimits(
+                        rate=float(cfg.get(f"{prefix}_RATE_LIMIT") or cfg["PROVIDER_RATE_LIMIT"]),
+                        burst=int(cfg.get(f"{prefix}_RATE_BURST") or cfg["PROVIDER_RATE_BURST"]),
+                        max_concurrency=int(cfg.get(f"{prefix}_MAX_CONCURRENCY") or cfg["PROVIDER_MAX_CONCURRENCY"]),
+                    )
+                    self.limits[provider] = limits
+        return limits
+
+    async def acall(self, limits: ProviderLimits, fn: Callable[[], T], retry: Optional[RetryPolicy] = None) -> T:
+        """Run ``fn`` under ``limits``, retrying per ``retry``; each attempt is admitted like a new call.
+
+        The backoff is slept on the loop without holding a concurrency slot, and a cancelled
+        caller stops any further attempts.
+        """
+        attempt = 0
+        while True:
+            try:
+                result = await self._attempt(limits, fn)
+            except requests.exceptions.RequestException as exc:
+                delay = retry.delay(attempt, exc) if retry else None
+                if delay is None:
+                    raise
+            else:
+                delay = retry.delay(attempt, result) if retry else None
+                if delay is None:
+                    return result
+                result.close()
+            attempt += 1
+            limits.retries += 1
+            await asyncio.sleep(delay)
+
+    async def _attempt(self, limits: ProviderLimits, fn: Callable[[], T]) -> T:
+        limits.waiting += 1
+        admitted = False
+        try:
+            async with limits.semaphore:
+                await limits.bucket.acquire()
+                limits.waiting -= 1
+                admitted = True
+                limits.in_flight += 1
+                call = self.loop.run_in_executor(self.executor, fn)
+                try:
+                    return await asyncio.shield(call)
+                except asyncio.CancelledError:
+                    # The caller hit its deadline, but the blocking HTTP call can't be interrupted.
+                    # Keep its concurrency slot until it really returns so abandoned calls never
+                    # push the provider (or the I/O pool) past the cap.
+                    limits.abandoned += 1
+                    await asyncio.wait([call])
+                    call.exception()  # retrieved so a failure isn't logged as unhandled
+                    raise
+                finally:
+                    limits.in_flight -= 1
+                    limits.completed += 1
+        finally:
+            if not admitted:
+                limits.waiting -= 1
+
+    def submit(self, provider: str, fn: Callable[[], T], cfg, retry: Optional[RetryPolicy] = None) -> concurrent.futures.Future:
+        limits = self.limits_for(provider, cfg)
+        return asyncio.run_coroutine_threadsafe(self.acall(limits, fn, retry), self.loop)
+
+    def stats(self) -> dict:
+        return {name: limits.stats() for name, limits in self.limits.items()}
+
+
+_runtimes: dict[int, ProviderRuntime] = {}
+_runtimes_lock = threading.Lock()
+
+
+def get_runtime(config: Optional[dict] = None) -> ProviderRuntime:
+    pid = os.getpid()
+    runtime = _runtimes.get(pid)
+    if runtime is None:
+        cfg = config if config is not None else current_app.config
+        with _runtimes_lock:
+            runtime = _runtimes.get(pid)
+            if runtime is None:
+                runtime = ProviderRuntime(io_threads=cfg["PROVIDER_IO_THREADS"])
+                _runtimes[pid] = runtime
+    return runtime
+
+
+def run_call(provider: str, fn: Callable[[], T], timeout: Optional[float] = None, retry: Optional[RetryPolicy] = None) -> T:
+    """Run ``fn`` through the provider's rate limit and concurrency cap; raise Timeout past ``timeout``.
+
+    ``fn`` returns a ``requests.Response`` when ``retry`` is given; retries take rate-limit
+    tokens like any other call. The default deadline is ``PROVIDER_CALL_DEADLINE``, covering
+    retries too; keep it above the client's connect + read timeout so one attempt normally
+    ends (and frees its slot) before the caller gives up.
+
+    This blocks the calling thread, e.g. a Flask worker, for the whole call: the runtime
+    bounds load on the provider, not how long a request is held. Work that can run long
+    (many calls, or a provider backing off) belongs in a background job, as org enrichment does.
+    """
+    cfg = current_app.config
+    future = get_runtime(cfg).submit(provider, fn, cfg, retry)
+    try:
+        return future.result(timeout=timeout if timeout is not None else cfg["PROVIDER_CALL_DEADLINE"])
+    except concurrent.futures.TimeoutError:
+        future.cancel()
+        raise requests.exceptions.Timeout(f"{provider} call exceeded deadline")
+
+
+def run_many(
+    provider: str, fns: list[Callable[[], Any]], timeout: Optional[float] = None, retry: Optional[RetryPolicy] = None,
+) -> list[Any]:
+    """Fan out many calls under the same limits; results (or raised exceptions) in input order."""
+    cfg = current_app.config
+    runtime = get_runtime(cfg)
+    futures = [runtime.submit(provider, fn, cfg, retry) for fn in fns]
+    done, _ = concurrent.futures.wait(futures, timeout=timeout)
+    results: list[Any] = []
+    for future in futures:
+        if future not in done:
+            future.cancel()
+            results.append(requests.exceptions.Timeout(f"{provider} call exceeded deadline"))
+        elif future.exception() is not None:
+            results.append(future.exception())
+        else:
+            results.append(future.result())
+    return results
@@ -0,0 +1,178 @@
+from __future__ import annotations
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Any, Optional
+from flask import current_app
+
+
+# Params that never change the provider's answer and must not leak into cache keys
+IGNORED_PARAMS = {"api_key", "pretty"}
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS provider_responses (
+    key TEXT PRIMARY KEY,
+    provider TEXT NOT NULL,
+    endpoint TEXT NOT NULL,
+    status INTEGER NOT NULL,
+    body BLOB NOT NULL,
+    created_at REAL NOT NULL,
+    expires_at REAL NOT NULL,
+    last_access REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS ix_provider_responses_last_access ON provider_responses (last_access);
+"""
+
+
+def _canonical(value: Any) -> Any:
+    if isinstance(value, str):
+        return " ".join(value.strip().lower().split())
+    if isinstance(value, dict):
+        return {str(k): _canonical(v) for k, v in value.items() if k not in IGNORED_PARAMS and v not in (None, "")}
+    if isinstance(value, (list, tuple)):
+        return [_canonical(v) for v in value]
+    return value
+
+
+def cache_key(provider: str, endpoint: str, params: Optional[dict]) -> str:
+    canonical = json.dumps(
+        {"provider": provider, "endpoint": endpoint.strip("/"), "params": _canonical(params or {})},
+        sort_keys=True,
+        separators=(",", ":"),
+        default=str,
+    )
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+class ResponseCache:
+    """SQLite-backed provider response cache with per-endpoint TTLs and LRU eviction.
+
+    Expired rows are kept (until evicted) so callers can still serve them as stale.
+    """
+
+    EVICT_EVERY = 50  # check the size cap every N writes
+
+    def __init__(self, path: str, max_entries: int = 10000, default_ttl: int = 86400, ttls: Optional[dict[str, int]] = None) -> None:
+        self.path = path
+        self.max_entries = max_entries
+        self.default_ttl = default_ttl
+        self.ttls = ttls or {}
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._writes = 0
+        self.hits = 0
+        self.misses = 0
+        self.stale_hits = 0
+        self.stores = 0
+        self.evictions = 0
+        conn = self._conn()
+        conn.executescript(_SCHEMA)
+        conn.commit()
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=10, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def ttl_for(self, endpoint: str) -> int:
+        name = endpoint.strip("/").split("/")[-1]
+        return self.ttls.get(name, self.default_ttl)
+
+    def get(self, key: str, allow_stale: bool = False) -> Optional[tuple[int, bytes, bool]]:
+        """Return ``(status, body, is_stale)`` or None; stale rows only when ``allow_stale``."""
+        now = time.time()
+        row = self._conn().execute(
+            "SELECT status, body, expires_at FROM provider_responses WHERE key = ?", (key,)
+        ).fetchone()
+        if row is None or (row[2] < now and not allow_stale):
+            with self._lock:
+                self.misses += 1
+            return None
+        stale = row[2] < now
+        self._conn().execute("UPDATE provider_responses SET last_access = ? WHERE key = ?", (now, key))
+        with self._lock:
+            if stale:
+                self.stale_hits += 1
+            else:
+                self.hits += 1
+        return row[0], row[1], stale
+
+    def set(self, key: str, provider: str, endpoint: str, status: int, body: bytes) -> None:
+        now = time.time()
+        self._conn().execute(
+            "INSERT OR REPLACE INTO provider_responses (key, provider, endpoint, status, body, created_at, expires_at, last_access) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+            (key, provider, endpoint, status, body, now, now + self.ttl_for(endpoint), now),
+        )
+        with self._lock:
+            self.stores += 1
+            self._writes += 1
+            check = self._writes % self.EVICT_EVERY == 0
+        if check:
+            self.evict()
+
+    def evict(self) -> int:
+        conn = self._conn()
+        count = conn.execute("SELECT COUNT(*) FROM provider_responses").fetchone()[0]
+        excess = count - self.max_entries
+        if excess <= 0:
+            return 0
+        conn.execute(
+            "DELETE FROM provider_responses WHERE key IN "
+            "(SELECT key FROM provider_responses ORDER BY last_access LIMIT ?)",
+            (excess,),
+        )
+        with self._lock:
+            self.evictions += excess
+        return excess
+
+    def clear(self) -> None:
+        self._conn().execute("DELETE FROM provider_responses")
+
+    def stats(self) -> dict:
+        entries, size = self._conn().execute(
+            "SELECT COUNT(*), COALESCE(SUM(LENGTH(body)), 0) FROM provider_responses"
+        ).fetchone()
+        lookups = self.hits + self.misses + self.stale_hits
+        return {
+            "entries": entries,
+            "bytes": size,
+            "max_entries": self.max_entries,
+            "hits": self.hits,
+            "stale_hits": self.stale_hits,
+            "misses": self.misses,
+            "hit_rate": round((self.hits + self.stale_hits) / lookups, 4) if lookups else 0.0,
+            "stores": self.stores,
+            "evictions": self.evictions,
+        }
+
+
+_caches: dict[int, ResponseCache] = {}
+_caches_lock = threading.Lock()
+
+
+def get_response_cache(config: Optional[dict] = None) -> Optional[ResponseCache]:
+    cfg = config if config is not None else current_app.config
+    if not cfg.get("ENRICH_CACHE_ENABLED"):
+        return None
+    pid = os.getpid()
+    cache = _caches.get(pid)
+    if cache is None:
+        with _caches_lock:
+            cache = _caches.get(pid)
+            if cache is None:
+                cache = ResponseCache(
+                    str(cfg["ENRICH_CACHE_PATH"]),
+                    max_entries=cfg["ENRICH_CACHE_MAX_ENTRIES"],
+                    default_ttl=cfg["ENRICH_CACHE_DEFAULT_TTL"],
+                    ttls=cfg["ENRICH_CACHE_TTLS"],
+                )
+                _caches[pid] = cache
+    return cache
@@ -0,0 +1,199 @@
+from __future__ import annotations
+import json
+import time
+from dataclasses import dataclass
+from typing import Any, Optional
+import requests
+from .aio import run_call, run_many
+from .cache import cache_key, get_response_cache
+from .http import get_client
+from .resilience import ProviderUnavailable, get_breaker, get_single_flight, is_failure
+from .usage import current_user, record_call
+
+
+@dataclass
+class ProviderResponse:
+    """The parts of a provider HTTP response the API layer uses, whether fresh or cached."""
+
+    status_code: int
+    content: bytes
+    from_cache: bool = False
+    stale: bool = False
+
+    @property
+    def text(self) -> str:
+        return self.content.decode("utf-8", errors="replace")
+
+    def json(self) -> Any:
+        return json.loads(self.content)
+
+
+def call_provider(
+    provider: str,
+    endpoint: str,
+    params: Optional[dict] = None,
+    headers: Optional[dict] = None,
+    method: str = "GET",
+    json_body: Optional[Any] = None,
+    use_cache: bool = True,
+) -> ProviderResponse:
+    """Single entry point for outbound provider calls.
+
+    Order: fresh cache hit; circuit breaker (serving a stale entry while open); single-flight
+    so identical concurrent calls share one upstream request; then the provider's rate
+    limit/concurrency cap on the shared event loop and the pooled HTTP client. Every call,
+    cached or not, is accounted in the provider usage rollup.
+    """
+    started = time.perf_counter()
+    try:
+        response = _call_provider(provider, endpoint, params, headers, method, json_body, use_cache)
+    except requests.exceptions.RequestException:
+        record_call(provider, endpoint, _elapsed_ms(started), None)
+        raise
+    record_call(provider, endpoint, _elapsed_ms(started), response.status_code, response.content, cache_hit=response.from_cache)
+    return response
+
+
+def _call_provider(
+    provider: str,
+    endpoint: str,
+    params: Optional[dict],
+    headers: Optional[dict],
+    method: str,
+    json_body: Optional[Any],
+    use_cache: bool,
+) -> ProviderResponse:
+    cache = get_response_cache() if use_cache else None
+    key = cache_key(provider, endpoint, {**(params or {}), "__body__": json_body})
+    if cache:
+        hit = cache.get(key)
+        if hit:
+            status, body, stale = hit
+            return ProviderResponse(status, body, from_cache=True, stale=stale)
+
+    breaker = get_breaker(provider)
+    if not breaker.allow():
+        return _stale_or_raise(cache, key, provider)
+
+    client = get_client(provider)
+
+    def fetch() -> ProviderResponse:
+        try:
+            resp = run_call(
+                provider,
+                lambda: client.request(method, endpoint, params=params, headers=headers, json=json_body),
+                retry=client.retry,
+            )
+        except requests.exceptions.RequestException:
+            breaker.record_failure()
+            raise
+        if is_failure(resp.status_code):
+            breaker.record_failure()
+        else:
+            breaker.record_success()
+        if cache and resp.status_code == 200:
+            cache.set(key, provider, endpoint, resp.status_code, resp.content)
+        return ProviderResponse(resp.status_code, resp.content)
+
+    try:
+        # Only idempotent, cacheable reads are coalesced
+        result = get_single_flight().do(key, fetch)[0] if use_cache else fetch()
+    except requests.exceptions.RequestException:
+        stale = _stale(cache, key)
+        if stale is None:
+            raise
+        return stale
+    if is_failure(result.status_code):
+        return _stale(cache, key) or result
+    return result
+
+
+def _stale(cache, key: str) -> Optional[ProviderResponse]:
+    hit = cache.get(key, allow_stale=True) if cache else None
+    if hit:
+        status, body, stale = hit
+        return ProviderResponse(status, body, from_cache=True, stale=stale)
+    return None
+
+
+def _stale_or_raise(cache, key: str, provider: str) -> ProviderResponse:
+    stale = _stale(cache, key)
+    if stale is None:
+        raise ProviderUnavailable(f"{provider} circuit open")
+    return stale
+
+
+def call_provider_many(
+    provider: str,
+    endpoint: str,
+    params_list: list[dict],
+    headers: Optional[dict] = None,
+    use_cache: bool = True,
+) -> list[ProviderResponse | Exception]:
+    """GET ``endpoint`` once per params dict: cache hits inline, misses fanned out under the provider limits."""
+    started = time.perf_counter()
+    latencies: list[Optional[float]] = [None] * len(params_list)
+    results = _call_provider_many(provider, endpoint, params_list, headers, use_cache, latencies)
+    batch_ms = _elapsed_ms(started)
+    user = current_user()
+    for result, latency_ms in zip(results, latencies):
+        # Upstream calls are timed individually; cache hits and short-circuits cost ~nothing
+        latency_ms = latency_ms if latency_ms is not None else (batch_ms if isinstance(result, Exception) else 0.0)
+        if isinstance(result, ProviderResponse):
+            record_call(provider, endpoint, latency_ms, result.status_code, result.content, cache_hit=result.from_cache, user=user)
+        else:
+            record_call(provider, endpoint, latency_ms, None, user=user)
+    return results
+
+
+def _elapsed_ms(started: float) -> float:
+    return (time.perf_counter() - started) * 1000
+
+
+def _call_provider_many(
+    provider: str,
+    endpoint: str,
+    params_list: list[dict],
+    headers: Optional[dict],
+    use_cache: bool,
+    latencies: list[Optional[float]],
+) -> list[ProviderResponse | Exception]:
+    cache = get_response_cache() if use_cache else None
+    results: list[ProviderResponse | Exception | None] = [None] * len(params_list)
+    misses: list[int] = []
+    keys: list[Optional[str]] = []
+    for i, params in enumerate(params_list):
+        key = cache_key(provider, endpoint, {**params, "__body__": None}) if cache else None
+        keys.append(key)
+        hit = cache.get(key) if cache else None
+        if hit:
+            results[i] = ProviderResponse(hit[0], hit[1], from_cache=True, stale=hit[2])
+        else:
+            misses.append(i)
+
+    breaker = get_breaker(provider)
+    if misses and not breaker.allow():
+        for i in misses:
+            results[i] = _stale(cache, keys[i]) or ProviderUnavailable(f"{provider} circuit open")
+        return results
+
+    client = get_client(provider)
+
+    def timed(i: int):
+        started = time.perf_counter()
+        try:
+            return client.request("GET", endpoint, params=params_list[i], headers=headers)
+        finally:
+            latencies[i] = _elapsed_ms(started)
+
+    calls = [(lambda i=i: timed(i)) for i in misses]
+    for i, resp in zip(misses, run_many(provider, calls, retry=client.retry)):
+        if isinstance(resp, Exception) or is_failure(resp.status_code):
+            breaker.record_failure()
+            results[i] = _stale(cache, keys[i]) or (resp if isinstance(resp, Exception) else ProviderResponse(resp.status_code, resp.content))
+            continue
+        breaker.record_success()
+        results[i] = ProviderResponse(resp.status_code, resp.content)
+        if cache and resp.status_code == 200:
+            cache.set(keys[i], provider, endpoint, resp.status_code, resp.content)
+    return results
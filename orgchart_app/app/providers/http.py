@@ -0,0 +1,148 @@
+from __future__ import annotations
+import os
+import random
+import threading
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import Optional, Union
+import requests
+from flask import current_app
+from requests.adapters import HTTPAdapter
+
+
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+
+
+def _retry_after(value: Optional[str]) -> Optional[float]:
+    """Seconds from a Retry-After header (delta-seconds or HTTP date); None when absent or unparseable."""
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, (parsedate_to_datetime(value) - datetime.now(timezone.utc)).total_seconds())
+    except (TypeError, ValueError):
+        return None
+
+
+@dataclass(frozen=True)
+class RetryPolicy:
+    """When to retry a provider call and how long to wait first.
+
+    Applied by the provider runtime (``aio.run_call``) rather than the HTTP adapter, so every
+    attempt takes its own rate-limit token and concurrency slot. Connection failures and
+    429/5xx responses are retried with jittered exponential backoff; read timeouts are not
+    (the provider may have done billed work), and a ``Retry-After`` longer than ``backoff_max``
+    is returned to the caller rather than waited out.
+    """
+
+    max_retries: int = 3
+    backoff_factor: float = 0.5
+    backoff_jitter: float = 0.5
+    backoff_max: float = 10.0
+
+    def delay(self, attempt: int, outcome: Union[requests.Response, BaseException]) -> Optional[float]:
+        """Seconds to wait before retrying after ``attempt`` (0-based) ended in ``outcome``; None to stop."""
+        if attempt >= self.max_retries:
+            return None
+        if isinstance(outcome, BaseException):
+            if not isinstance(outcome, requests.exceptions.ConnectionError):
+                return None
+            retry_after = None
+        else:
+            if outcome.status_code not in RETRY_STATUSES:
+                return None
+            retry_after = _retry_after(outcome.headers.get("Retry-After"))
+        if retry_after is not None:
+            return None if retry_after > self.backoff_max else retry_after
+        return min(self.backoff_max, self.backoff_factor * 2 ** attempt + random.uniform(0, self.backoff_jitter))
+
+
+class ProviderClient:
+    """Keep-alive ``requests.Session`` for one provider, plus the ``retry`` policy for its calls.
+
+    One instance is shared by all threads of a worker process; ``pool_size`` bounds the
+    number of open connections it keeps to the provider. The session itself makes one
+    attempt per request: retries are run by the provider runtime under the rate limit (see
+    ``RetryPolicy``), so one attempt is bounded by roughly ``connect_timeout + read_timeout``.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        base_url: str,
+        pool_size: int = 10,
+        connect_timeout: float = 5.0,
+        read_timeout: float = 20.0,
+        max_retries: int = 3,
+        backoff_factor: float = 0.5,
+        backoff_jitter: float = 0.5,
+        backoff_max: float = 10.0,
+    ) -> None:
+        self.name = name
+        self.base_url = base_url.rstrip("/")
+        self.timeout = (connect_timeout, read_timeout)
+        self.retry = RetryPolicy(
+            max_retries=max_retries,
+            backoff_factor=backoff_factor,
+            backoff_jitter=backoff_jitter,
+            backoff_max=backoff_max,
+        )
+        # No adapter-level retries: they would bypass the provider's token bucket
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size, max_retries=0)
+        self.session = requests.Session()
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+
+    def url(self, path: str) -> str:
+        return path if path.startswith(("http://", "https://")) else f"{self.base_url}/{path.lstrip('/')}"
+
+    def request(self, method: str, path: str, timeout=None, **kwargs) -> requests.Response:
+        return self.session.request(method, self.url(path), timeout=timeout or self.timeout, **kwargs)
+
+    def get(self, path: str, **kwargs) -> requests.Response:
+        return self.request("GET", path, **kwargs)
+
+    def post(self, path: str, **kwargs) -> requests.Response:
+        return self.request("POST", path, **kwargs)
+
+    def close(self) -> None:
+        self.session.close()
+
+
+_clients: dict[tuple[int, str], ProviderClient] = {}
+_clients_lock = threading.Lock()
+
+
+def get_client(name: str, config: Optional[dict] = None) -> ProviderClient:
+    """Return this process's client for ``name``; keyed by pid so forked workers never share sockets."""
+    key = (os.getpid(), name)
+    client = _clients.get(key)
+    if client is not None:
+        return client
+    cfg = config if config is not None else current_app.config
+    with _clients_lock:
+        client = _clients.get(key)
+        if client is None:
+            client = ProviderClient(
+                name,
+                base_url=cfg[f"{name.upper()}_BASE_URL"],
+                pool_size=cfg["PROVIDER_POOL_SIZE"],
+                connect_timeout=cfg["PROVIDER_CONNECT_TIMEOUT"],
+                read_timeout=cfg["PROVIDER_READ_TIMEOUT"],
+                max_retries=cfg["PROVIDER_MAX_RETRIES"],
+                backoff_factor=cfg["PROVIDER_BACKOFF_FACTOR"],
+                backoff_jitter=cfg["PROVIDER_BACKOFF_JITTER"],
+            )
+            _clients[key] = client
+    return client
+
+
+def reset_clients() -> None:
+    with _clients_lock:
+        for client in _clients.values():
+            client.close()
+        _clients.clear()
@@ -0,0 +1,152 @@
+from __future__ import annotations
+import os
+import threading
+import time
+from typing import Any, Callable, Optional, TypeVar
+import requests
+from flask import current_app
+
+
+T = TypeVar("T")
+
+
+class ProviderUnavailable(requests.exceptions.RequestException):
+    """Raised without calling upstream while a provider's circuit is open and nothing stale is cached."""
+
+
+class SingleFlight:
+    """Concurrent calls with the same key share one execution of ``fn``."""
+
+    class _Call:
+        def __init__(self) -> None:
+            self.done = threading.Event()
+            self.result: Any = None
+            self.error: Optional[BaseException] = None
+
+    def __init__(self) -> None:
+        self._calls: dict[str, SingleFlight._Call] = {}
+        self._lock = threading.Lock()
+        self.executions = 0
+        self.coalesced = 0
+
+    def do(self, key: str, fn: Callable[[], T]) -> tuple[T, bool]:
+        """Return ``(result, shared)``; ``shared`` is True when another caller did the work."""
+        with self._lock:
+            call = self._calls.get(key)
+            if call is not None:
+                self.coalesced += 1
+                leader = False
+            else:
+                call = self._calls[key] = SingleFlight._Call()
+                self.executions += 1
+                leader = True
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result, True
+        try:
+            call.result = fn()
+            return call.result, False
+        except BaseException as exc:
+            call.error = exc
+            raise
+        finally:
+            with self._lock:
+                self._calls.pop(key, None)
+            call.done.set()
+
+    def stats(self) -> dict:
+        return {"executions": self.executions, "coalesced": self.coalesced, "in_flight": len(self._calls)}
+
+
+class CircuitBreaker:
+    """Opens after ``failure_threshold`` consecutive failures; one trial call is let through after ``reset_timeout``."""
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 30.0) -> None:
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = "closed"
+        self.failures = 0
+        self.opened_at = 0.0
+        self._lock = threading.Lock()
+        self.times_opened = 0
+        self.short_circuited = 0
+        self.total_failures = 0
+
+    def allow(self) -> bool:
+        with self._lock:
+            if self.state == "closed":
+                return True
+            if self.state == "open" and time.monotonic() - self.opened_at >= self.reset_timeout:
+                self.state = "half_open"
+                return True
+            self.short_circuited += 1
+            return False
+
+    def record_success(self) -> None:
+        with self._lock:
+            self.state = "closed"
+            self.failures = 0
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self.failures += 1
+            self.total_failures += 1
+            if self.state == "half_open" or self.failures >= self.failure_threshold:
+                if self.state != "open":
+                    self.times_opened += 1
+                self.state = "open"
+                self.opened_at = time.monotonic()
+
+    def stats(self) -> dict:
+        return {
+            "state": self.state,
+            "consecutive_failures": self.failures,
+            "total_failures": self.total_failures,
+            "times_opened": self.times_opened,
+            "short_circuited": self.short_circuited,
+        }
+
+
+def is_failure(status_code: int) -> bool:
+    """Statuses that say the provider is unhealthy (not that our query was bad)."""
+    return status_code >= 500 or status_code == 429
+
+
+_state: dict[int, dict] = {}
+_state_lock = threading.Lock()
+
+
+def _process_state() -> dict:
+    pid = os.getpid()
+    state = _state.get(pid)
+    if state is None:
+        with _state_lock:
+            state = _state.setdefault(pid, {"single_flight": SingleFlight(), "breakers": {}})
+    return state
+
+
+def get_single_flight() -> SingleFlight:
+    return _process_state()["single_flight"]
+
+
+def get_breaker(provider: str, config: Optional[dict] = None) -> CircuitBreaker:
+    breakers = _process_state()["breakers"]
+    breaker = breakers.get(provider)
+    if breaker is None:
+        cfg = config if config is not None else current_app.config
+        with _state_lock:
+            breaker = breakers.setdefault(provider, CircuitBreaker(
+                failure_threshold=cfg["PROVIDER_BREAKER_FAILURES"],
+                reset_timeout=cfg["PROVIDER_BREAKER_RESET"],
+            ))
+    return breaker
+
+
+def resilience_stats() -> dict:
+    state = _process_state()
+    return {
+        "single_flight": state["single_flight"].stats(),
+        "breakers": {name: b.stats() for name, b in state["breakers"].items()},
+    }
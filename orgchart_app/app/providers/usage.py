@@ -0,0 +1,356 @@
+from __future__ import annotations
+import json
+import logging
+import os
+import threading
+import time
+from bisect import bisect_left
+from datetime import datetime, timedelta
+from typing import Optional
+from flask import Flask, current_app, has_app_context, has_request_context, request
+from sqlalchemy import case, func, insert, select, update
+from sqlalchemy.exc import IntegrityError
+from ..database import db, use_primary
+from ..models import ProviderUsage
+
+
+logger = logging.getLogger(__name__)
+
+# Upper bounds (ms) of the latency histogram; the last column counts everything slower
+HISTOGRAM_BOUNDS_MS = (50, 100, 250, 500, 1000, 2500, 5000, 10000)
+HISTOGRAM_COLUMNS = tuple(f"le_{b}" for b in HISTOGRAM_BOUNDS_MS) + ("le_inf",)
+SUM_COLUMNS = ("calls", "cache_hits", "credits", "results", "latency_ms_total") + HISTOGRAM_COLUMNS
+
+
+def status_class(status_code: Optional[int]) -> str:
+    if status_code is None:
+        return "error"  # transport error / timeout / circuit open
+    if status_code in (404, 429):
+        return str(status_code)
+    return f"{status_code // 100}xx"
+
+
+def endpoint_name(endpoint: str) -> str:
+    return endpoint.strip("/") or "/"
+
+
+def count_credits(endpoint: str, status_code: Optional[int], content: Optional[bytes]) -> tuple[int, int]:
+    """``(credits, results)`` for one upstream response, following PDL's billing rules.
+
+    Search bills per record returned, bulk per matched person, enrich per match and
+    identify once when anything matched. Other providers bill per successful call.
+    """
+    if status_code != 200 or not content:
+        return 0, 0
+    name = endpoint.rstrip("/").rsplit("/", 1)[-1]
+    if name not in ("search", "bulk", "identify"):
+        return 1, 1
+    try:
+        body = json.loads(content)
+    except ValueError:
+        return 0, 0
+    if name == "search":
+        n = len(body.get("data") or []) if isinstance(body, dict) else 0
+        return n, n
+    if name == "bulk":
+        n = sum(1 for item in body if isinstance(item, dict) and item.get("status") == 200) if isinstance(body, list) else 0
+        return n, n
+    n = len(body.get("matches") or []) if isinstance(body, dict) else 0
+    return (1 if n else 0), n
+
+
+def current_user() -> str:
+    if not has_request_context():
+        return "system"
+    return (request.headers.get("X-User") or "anonymous")[:100]
+
+
+class _Counter:
+    __slots__ = ("sums", "latency_ms_max", "last_call_at")
+
+    def __init__(self) -> None:
+        self.sums = [0] * len(SUM_COLUMNS)
+        self.latency_ms_max = 0
+        self.last_call_at: Optional[datetime] = None
+
+
+class UsageRecorder:
+    """Accumulates provider call counters in memory and periodically adds them onto ``provider_usage``.
+
+    ``record`` only takes a lock and bumps a few integers; the database sees one
+    UPDATE (or INSERT) per distinct hour/provider/endpoint/user/status per flush.
+    Flushes run on a background thread (``start``), never on the provider call path.
+    """
+
+    def __init__(self, flush_seconds: float = 30.0) -> None:
+        self.flush_seconds = flush_seconds
+        self._counters: dict[tuple, _Counter] = {}
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self.flushes = 0
+        self.flush_errors = 0
+        self._thread: Optional[threading.Thread] = None
+
+    def record(
+        self,
+        provider: str,
+        endpoint: str,
+        user: str,
+        status_code: Optional[int],
+        latency_ms: float,
+        cache_hit: bool = False,
+        credits: int = 0,
+        results: int = 0,
+    ) -> None:
+        now = datetime.utcnow()
+        key = (now.replace(minute=0, second=0, microsecond=0), provider, endpoint_name(endpoint), user, status_class(status_code))
+        ms = int(latency_ms)
+        hist = len(SUM_COLUMNS) - len(HISTOGRAM_COLUMNS) + bisect_left(HISTOGRAM_BOUNDS_MS, ms)
+        with self._lock:
+            counter = self._counters.get(key)
+            if counter is None:
+                counter = self._counters[key] = _Counter()
+            sums = counter.sums
+            sums[0] += 1
+            sums[1] += 1 if cache_hit else 0
+            sums[2] += credits
+            sums[3] += results
+            sums[4] += ms
+            sums[hist] += 1
+            if ms > counter.latency_ms_max:
+                counter.latency_ms_max = ms
+            counter.last_call_at = now
+
+    def start(self, app: Flask) -> None:
+        """Flush every ``flush_seconds`` on a daemon thread for the life of this process."""
+        if self._thread is not None:
+            return
+
+        def run() -> None:
+            while True:
+                time.sleep(self.flush_seconds)
+                with app.app_context():
+                    try:
+                        self.flush()
+                    except Exception:
+                        logger.exception("Failed to flush provider usage; will retry")
+
+        self._thread = threading.Thread(target=run, name="provider-usage-flush", daemon=True)
+        self._thread.start()
+
+    def flush(self) -> int:
+        """Write pending counters; returns the number of rollup rows touched. Re-queues them on failure."""
+        if not self._flush_lock.acquire(blocking=False):
+            return 0  # another thread is already flushing
+        try:
+            with self._lock:
+                pending, self._counters = self._counters, {}
+            if not pending:
+                return 0
+            try:
+                with db.engine.begin() as conn:
+                    for key, counter in pending.items():
+                        _upsert(conn, key, counter)
+            except Exception:
+                self.flush_errors += 1
+                self._requeue(pending)
+                raise
+            self.flushes += 1
+            return len(pending)
+        finally:
+            self._flush_lock.release()
+
+    def _requeue(self, pending: dict[tuple, _Counter]) -> None:
+        with self._lock:
+            for key, old in pending.items():
+                counter = self._counters.get(key)
+                if counter is None:
+                    self._counters[key] = old
+                    continue
+                counter.sums = [a + b for a, b in zip(counter.sums, old.sums)]
+                counter.latency_ms_max = max(counter.latency_ms_max, old.latency_ms_max)
+
+    def stats(self) -> dict:
+        return {"pending_rows": len(self._counters), "flushes": self.flushes, "flush_errors": self.flush_errors}
+
+
+def _upsert(conn, key: tuple, counter: _Counter) -> None:
+    bucket, provider, endpoint, user, klass = key
+    where = (
+        ProviderUsage.bucket == bucket,
+        ProviderUsage.provider == provider,
+        ProviderUsage.endpoint == endpoint,
+        ProviderUsage.user == user,
+        ProviderUsage.status_class == klass,
+    )
+    increments = {
+        name: getattr(ProviderUsage, name) + value
+        for name, value in zip(SUM_COLUMNS, counter.sums)
+        if value
+    }
+    stmt = update(ProviderUsage).where(*where).values(
+        **increments,
+        latency_ms_max=case(
+            (ProviderUsage.latency_ms_max < counter.latency_ms_max, counter.latency_ms_max),
+            else_=ProviderUsage.latency_ms_max,
+        ),
+        last_call_at=counter.last_call_at,
+    )
+    if conn.execute(stmt).rowcount:
+        return
+    try:
+        with conn.begin_nested():
+            conn.execute(insert(ProviderUsage).values(
+                bucket=bucket, provider=provider, endpoint=endpoint, user=user, status_class=klass,
+                latency_ms_max=counter.latency_ms_max, last_call_at=counter.last_call_at,
+                **dict(zip(SUM_COLUMNS, counter.sums)),
+            ))
+    except IntegrityError:
+        conn.execute(stmt)  # another process inserted the row first
+
+
+_recorders: dict[int, UsageRecorder] = {}
+_recorders_lock = threading.Lock()
+
+
+def get_usage_recorder(config: Optional[dict] = None) -> Optional[UsageRecorder]:
+    cfg = config if config is not None else current_app.config
+    if not cfg.get("PROVIDER_USAGE_ENABLED", True):
+        return None
+    pid = os.getpid()
+    recorder = _recorders.get(pid)
+    if recorder is None:
+        with _recorders_lock:
+            recorder = _recorders.get(pid)
+            if recorder is None:
+                recorder = _recorders[pid] = UsageRecorder(flush_seconds=cfg["PROVIDER_USAGE_FLUSH_SECONDS"])
+                if has_app_context():
+                    recorder.start(current_app._get_current_object())
+    return recorder
+
+
+def record_call(
+    provider: str,
+    endpoint: str,
+    latency_ms: float,
+    status_code: Optional[int],
+    content: Optional[bytes] = None,
+    cache_hit: bool = False,
+    user: Optional[str] = None,
+) -> None:
+    """Account one provider call; ``status_code`` is None when no response came back."""
+    recorder = get_usage_recorder()
+    if recorder is None:
+        return
+    credits, results = count_credits(endpoint, status_code, content)
+    if cache_hit:
+        credits = 0  # served locally, nothing billed
+    recorder.record(
+        provider, endpoint, user or current_user(), status_code, latency_ms,
+        cache_hit=cache_hit, credits=credits, results=results,
+    )
+
+
+def _percentile(histogram: list[int], q: float) -> Optional[int]:
+    """Upper bound (ms) of the histogram bucket holding the ``q`` quantile; None past the last bound."""
+    total = sum(histogram)
+    if not total:
+        return None
+    rank = q * total
+    seen = 0
+    for bound, count in zip(HISTOGRAM_BOUNDS_MS + (None,), histogram):
+        seen += count
+        if seen >= rank:
+            return bound
+    return None
+
+
+def usage_summary(provider: Optional[str] = None, days: int = 30, user: Optional[str] = None) -> dict:
+    """Per-endpoint, per-user and daily totals over the last ``days`` days, including unflushed counters.
+
+    If the flush fails (e.g. a locked SQLite file) the counters stay queued and the
+    totals already stored are served. Reads the primary so the rows just flushed are
+    counted even when a lagging replica is configured.
+    """
+    use_primary()
+    recorder = get_usage_recorder()
+    if recorder is not None:
+        try:
+            recorder.flush()
+        except Exception:
+            logger.exception("Failed to flush provider usage before summary; serving stored totals")
+
+    since = datetime.utcnow().replace(minute=0, second=0, microsecond=0) - timedelta(days=days)
+    filters = [ProviderUsage.bucket >= since]
+    if provider:
+        filters.append(ProviderUsage.provider == provider)
+    if user:
+        filters.append(ProviderUsage.user == user)
+    sums = [func.coalesce(func.sum(getattr(ProviderUsage, name)), 0) for name in SUM_COLUMNS]
+    successful = func.coalesce(func.sum(case((ProviderUsage.status_class == "2xx", ProviderUsage.calls), else_=0)), 0)
+
+    endpoints = []
+    for row in db.session.execute(
+        select(
+            ProviderUsage.provider, ProviderUsage.endpoint, successful,
+            func.max(ProviderUsage.latency_ms_max), func.max(ProviderUsage.last_call_at), *sums,
+        ).where(*filters).group_by(ProviderUsage.provider, ProviderUsage.endpoint)
+    ):
+        provider_name, endpoint, ok, latency_max, last_call_at, *values = row
+        totals = dict(zip(SUM_COLUMNS, values))
+        histogram = [totals[c] for c in HISTOGRAM_COLUMNS]
+        calls = totals["calls"]
+        endpoints.append({
+            "provider": provider_name,
+            "endpoint": endpoint,
+            "total_requests": calls,
+            "successful_requests": ok,
+            "failed_requests": calls - ok,
+            "cache_hits": totals["cache_hits"],
+            "credits": totals["credits"],
+            "total_results": totals["results"],
+            "avg_response_time": round(totals["latency_ms_total"] / calls, 1) if calls else None,
+            "max_response_time": latency_max,
+            "p50_ms": _percentile(histogram, 0.5),
+            "p95_ms": _percentile(histogram, 0.95),
+            "p99_ms": _percentile(histogram, 0.99),
+            "histogram": dict(zip(HISTOGRAM_COLUMNS, histogram)),
+            "last_request": last_call_at.isoformat() if last_call_at else None,
+        })
+    endpoints.sort(key=lambda e: e["last_request"] or "", reverse=True)
+
+    status_counts: dict[str, dict[str, int]] = {}
+    for provider_name, endpoint, klass, calls in db.session.execute(
+        select(ProviderUsage.provider, ProviderUsage.endpoint, ProviderUsage.status_class, func.sum(ProviderUsage.calls))
+        .where(*filters).group_by(ProviderUsage.provider, ProviderUsage.endpoint, ProviderUsage.status_class)
+    ):
+        status_counts.setdefault(f"{provider_name}:{endpoint}", {})[klass] = calls
+    for e in endpoints:
+        e["status_counts"] = status_counts.get(f"{e['provider']}:{e['endpoint']}", {})
+
+    by_user = [
+        {"user": u, "requests": calls, "credits": credits}
+        for u, calls, credits in db.session.execute(
+            select(ProviderUsage.user, func.sum(ProviderUsage.calls), func.sum(ProviderUsage.credits))
+            .where(*filters).group_by(ProviderUsage.user).order_by(func.sum(ProviderUsage.credits).desc())
+        )
+    ]
+
+    daily: dict[str, dict] = {}
+    for bucket, calls, results, credits in db.session.execute(
+        select(ProviderUsage.bucket, func.sum(ProviderUsage.calls), func.sum(ProviderUsage.results), func.sum(ProviderUsage.credits))
+        .where(*filters, ProviderUsage.bucket >= since + timedelta(days=days) - timedelta(days=7))
+        .group_by(ProviderUsage.bucket)
+    ):
+        day = daily.setdefault(bucket.date().isoformat(), {"date": bucket.date().isoformat(), "requests": 0, "results": 0, "credits": 0})
+        day["requests"] += calls
+        day["results"] += results
+        day["credits"] += credits
+
+    return {
+        "period_days": days,
+        "summary": endpoints,
+        "by_user": by_user,
+        "daily_usage": sorted(daily.values(), key=lambda d: d["date"], reverse=True),
+        "recorder": recorder.stats() if recorder else None,
+    }
@@ -0,0 +1,114 @@
+from __future__ import annotations
+from typing import Any
+from flask import current_app
+from sqlalchemy import delete, func, or_, select, update
+from .database import db
+from .jobs import update_job
+from .models import BackgroundJob, EnrichmentResult, Organization, OrganizationVersion, Department, Person, PersonFieldSource, Project, ProjectAssignment
+from .versions import bump_org_version
+
+
+def _org_person_ids(org_id: int):
+    return select(Person.id).where(Person.organization_id == org_id)
+
+
+def _org_project_ids(org_id: int):
+    return select(Project.id).where(Project.organization_id == org_id)
+
+
+def _steps(org_id: int) -> list[tuple[str, Any, Any]]:
+    """(name, model, filter) in bottom-up dependency order."""
+    return [
+        (
+            "project_assignments",
+            ProjectAssignment,
+            or_(
+                ProjectAssignment.project_id.in_(_org_project_ids(org_id)),
+                ProjectAssignment.person_id.in_(_org_person_ids(org_id)),
+            ),
+        ),
+        ("projects", Project, Project.organization_id == org_id),
+        ("enrichment_results", EnrichmentResult, EnrichmentResult.person_id.in_(_org_person_ids(org_id))),
+        ("person_field_sources", PersonFieldSource, PersonFieldSource.person_id.in_(_org_person_ids(org_id))),
+        ("people", Person, Person.organization_id == org_id),
+        ("departments", Department, Department.organization_id == org_id),
+    ]
+
+
+def count_purge_rows(org_id: int) -> int:
+    total = 1  # the organization row itself
+    for _, model, where in _steps(org_id):
+        total += db.session.scalar(select(func.count()).select_from(model).where(where)) or 0
+    return total
+
+
+def purge_organization(job_id: int) -> None:
+    """Delete an organization and everything under it in short, primary-key ordered chunks.
+
+    Each chunk is a bulk DELETE committed on its own, so the database lock is released
+    between chunks and readers are never blocked for the whole purge.
+    """
+    chunk_size = current_app.config["PURGE_CHUNK_SIZE"]
+    org_id = db.session.get(BackgroundJob, job_id).organization_id
+    completed = 0
+    update_job(job_id, total=count_purge_rows(org_id), detail={"step": "counting"})
+
+    # Clear references into this org's people first so the bulk deletes below never
+    # depend on ON DELETE SET NULL (not enforced by SQLite without the FK pragma).
+    people_ids = _org_person_ids(org_id)
+    referencing_orgs = set(db.session.scalars(
+        select(Project.organization_id).where(Project.epc_contact_person_id.in_(people_ids)).distinct()
+    ))
+    referencing_orgs.update(db.session.scalars(
+        select(Person.organization_id).where(Person.reports_to_id.in_(people_ids)).distinct()
+    ))
+    db.session.execute(
+        update(Project)
+        .where(Project.epc_contact_person_id.in_(people_ids))
+        .values(epc_contact_person_id=None)
+        .execution_options(synchronize_session=False)
+    )
+    bump_org_version(o for o in referencing_orgs if o != org_id)
+    db.session.commit()
+    # Managers may be referenced from other orgs too; clear every reports_to_id into the purged people
+    _chunked_update(
+        Person,
+        Person.reports_to_id.in_(people_ids),
+        {"reports_to_id": None},
+        chunk_size,
+    )
+    update_job(job_id, detail={"step": "references_cleared"})
+
+    for step, model, where in _steps(org_id):
+        last_id = 0
+        while True:
+            ids = db.session.scalars(
+                select(model.id).where(where, model.id > last_id).order_by(model.id).limit(chunk_size)
+            ).all()
+            if not ids:
+                break
+            db.session.execute(
+                delete(model).where(model.id.in_(ids)).execution_options(synchronize_session=False)
+            )
+            last_id = ids[-1]
+            completed += len(ids)
+            update_job(job_id, completed=completed, detail={"step": step, "last_id": last_id})
+
+    db.session.execute(delete(OrganizationVersion).where(OrganizationVersion.organization_id == org_id))
+    db.session.execute(delete(Organization).where(Organization.id == org_id))
+    update_job(job_id, status="complete", completed=completed + 1, detail={"step": "organization", "last_id": org_id})
+
+
+def _chunked_update(model, where, values: dict, chunk_size: int) -> None:
+    last_id = 0
+    while True:
+        ids = db.session.scalars(
+            select(model.id).where(where, model.id > last_id).order_by(model.id).limit(chunk_size)
+        ).all()
+        if not ids:
+            return
+        db.session.execute(
+            update(model).where(model.id.in_(ids)).values(**values).execution_options(synchronize_session=False)
+        )
+        db.session.commit()
+        last_id = ids[-1]
@@ -0,0 +1,95 @@
+from __future__ import annotations
+import sqlite3
+import threading
+import time
+
+
+# Forget a domain's last fetch once it is this far in the past
+SLOT_RETENTION_SECONDS = 300
+
+
+class LocalSlotStore:
+    """Per-domain last-fetch times held in this process only."""
+
+    def __init__(self) -> None:
+        self._last: dict[str, float] = {}
+        self._lock = threading.Lock()
+        self.reservations = 0
+
+    def claim(self, domain: str, delay: float) -> float:
+        """Start a fetch of ``domain`` now if its last one began ``delay`` or more seconds ago.
+
+        Returns 0.0 when the fetch may start (and records it), else the seconds left to wait.
+        """
+        with self._lock:
+            now = time.time()
+            wait = self._last.get(domain, 0.0) + delay - now
+            if wait > 0:
+                return wait
+            self._last[domain] = now
+            self.reservations += 1
+            if len(self._last) > 1000:
+                cutoff = now - SLOT_RETENTION_SECONDS
+                for d in [d for d, last in self._last.items() if last < cutoff]:
+                    del self._last[d]
+            return 0.0
+
+    def stats(self) -> dict:
+        return {"backend": "local", "domains": len(self._last), "reservations": self.reservations}
+
+
+class SQLiteSlotStore:
+    """Per-domain last-fetch times in a SQLite file shared by every worker process.
+
+    ``claim`` checks and records a domain's last fetch inside one ``BEGIN IMMEDIATE``
+    transaction, so two processes can never both start a fetch inside the delay.
+    """
+
+    PRUNE_EVERY = 500  # reservations between deletes of long-past fetches
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        self._local = threading.local()
+        self.reservations = 0
+        conn = self._conn()
+        conn.execute("CREATE TABLE IF NOT EXISTS domain_fetches (domain TEXT PRIMARY KEY, last_fetch REAL NOT NULL)")
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=10, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def claim(self, domain: str, delay: float) -> float:
+        """Start a fetch of ``domain`` now if its last one began ``delay`` or more seconds ago.
+
+        Returns 0.0 when the fetch may start (and records it), else the seconds left to wait.
+        """
+        conn = self._conn()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            now = time.time()
+            row = conn.execute("SELECT last_fetch FROM domain_fetches WHERE domain = ?", (domain,)).fetchone()
+            wait = row[0] + delay - now if row else 0.0
+            if wait <= 0:
+                wait = 0.0
+                conn.execute(
+                    "INSERT INTO domain_fetches (domain, last_fetch) VALUES (?, ?) "
+                    "ON CONFLICT(domain) DO UPDATE SET last_fetch = excluded.last_fetch",
+                    (domain, now),
+                )
+                self.reservations += 1
+                if self.reservations % self.PRUNE_EVERY == 0:
+                    conn.execute("DELETE FROM domain_fetches WHERE last_fetch < ?", (now - SLOT_RETENTION_SECONDS,))
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        return wait
+
+    def stats(self) -> dict:
+        domains = self._conn().execute("SELECT COUNT(*) FROM domain_fetches").fetchone()[0]
+        return {"backend": "sqlite", "path": self.path, "domains": domains, "reservations": self.reservations}
@@ -0,0 +1,117 @@
+from __future__ import annotations
+import os
+import threading
+import time
+from dataclasses import dataclass
+from typing import Optional
+from urllib.parse import urlparse
+from urllib.robotparser import RobotFileParser
+import requests
+from flask import current_app
+from .cache import LRUCache
+from .providers.resilience import SingleFlight
+
+
+# Longest Crawl-delay we will honor; beyond this a crawl would pin requests for minutes
+MAX_CRAWL_DELAY = 60.0
+
+
+@dataclass
+class RobotsEntry:
+    parser: Optional[RobotFileParser]  # None: no usable robots.txt, everything allowed
+    crawl_delay: Optional[float]
+    expires_at: float
+    status: str  # ok, missing, forbidden, error
+
+    def can_fetch(self, user_agent: str, url: str) -> bool:
+        if self.status == "forbidden":
+            return False
+        return self.parser is None or self.parser.can_fetch(user_agent, url)
+
+
+class RobotsCache:
+    """robots.txt rules per scheme+host, fetched once and kept for ``ttl`` seconds.
+
+    Missing files and fetch failures are cached too (for ``negative_ttl``) so a site without
+    robots.txt, or one that times out, doesn't cost an extra round trip on every crawl.
+    """
+
+    def __init__(self, ttl: float = 86400, negative_ttl: float = 3600, max_entries: int = 1024, timeout: float = 5.0) -> None:
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self.timeout = timeout
+        self._entries = LRUCache(max_entries)
+        self._single_flight = SingleFlight()
+        self._http = requests.Session()
+        self.fetches = 0
+        self.expired = 0
+
+    @staticmethod
+    def key_for(url: str) -> str:
+        parsed = urlparse(url)
+        return f"{parsed.scheme.lower()}://{parsed.netloc.lower()}"
+
+    def entry(self, url: str, user_agent: str) -> RobotsEntry:
+        key = self.key_for(url)
+        entry = self._entries.get(key)
+        if entry is not None and entry.expires_at > time.monotonic():
+            return entry
+        if entry is not None:
+            self.expired += 1
+        # Concurrent crawls of a new site share one robots.txt download
+        return self._single_flight.do(key, lambda: self._load(key, user_agent))[0]
+
+    def _load(self, key: str, user_agent: str) -> RobotsEntry:
+        self.fetches += 1
+        now = time.monotonic()
+        try:
+            resp = self._http.get(f"{key}/robots.txt", timeout=self.timeout, headers={"User-Agent": user_agent})
+        except requests.exceptions.RequestException:
+            # Same as before the cache: if robots.txt can't be read, allow
+            entry = RobotsEntry(None, None, now + self.negative_ttl, "error")
+        else:
+            if resp.status_code in (401, 403):
+                entry = RobotsEntry(None, None, now + self.ttl, "forbidden")
+            elif resp.status_code >= 400:
+                entry = RobotsEntry(None, None, now + self.negative_ttl, "missing" if resp.status_code < 500 else "error")
+            else:
+                parser = RobotFileParser(f"{key}/robots.txt")
+                parser.parse(resp.text.splitlines())
+                entry = RobotsEntry(parser, _crawl_delay(parser, user_agent), now + self.ttl, "ok")
+        self._entries.set(key, entry)
+        return entry
+
+    def stats(self) -> dict:
+        return {**self._entries.stats(), "fetches": self.fetches, "expired": self.expired}
+
+
+def _crawl_delay(parser: RobotFileParser, user_agent: str) -> Optional[float]:
+    delay = parser.crawl_delay(user_agent)
+    if delay is None:
+        rate = parser.request_rate(user_agent)
+        if rate and rate.requests:
+            delay = rate.seconds / rate.requests
+    if delay is None:
+        return None
+    return min(float(delay), MAX_CRAWL_DELAY)
+
+
+_caches: dict[int, RobotsCache] = {}
+_caches_lock = threading.Lock()
+
+
+def get_robots_cache(config: Optional[dict] = None) -> RobotsCache:
+    pid = os.getpid()
+    cache = _caches.get(pid)
+    if cache is None:
+        cfg = config if config is not None else current_app.config
+        with _caches_lock:
+            cache = _caches.get(pid)
+            if cache is None:
+                cache = RobotsCache(
+                    ttl=cfg["ROBOTS_CACHE_TTL"],
+                    negative_ttl=cfg["ROBOTS_CACHE_NEGATIVE_TTL"],
+                    max_entries=cfg["ROBOTS_CACHE_MAX_ENTRIES"],
+                )
+                _caches[pid] = cache
+    return cache
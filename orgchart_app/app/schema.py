@@ -0,0 +1,56 @@
+from __future__ import annotations
+import hashlib
+from datetime import datetime
+from sqlalchemy import insert, select, update
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.schema import CreateIndex, CreateTable
+from .database import db, ensure_columns, ensure_indexes
+from .models import SchemaMeta
+
+
+FINGERPRINT_KEY = "schema_fingerprint"
+
+
+def schema_fingerprint() -> str:
+    """Hash of the DDL for every model table and index, as compiled for the current database."""
+    dialect = db.engine.dialect
+    digest = hashlib.sha1()
+    for table in db.metadata.sorted_tables:
+        digest.update(str(CreateTable(table).compile(dialect=dialect)).encode())
+        for index in sorted(table.indexes, key=lambda i: i.name or ""):
+            digest.update(str(CreateIndex(index).compile(dialect=dialect)).encode())
+    return digest.hexdigest()
+
+
+def stored_fingerprint() -> str | None:
+    try:
+        with db.engine.connect() as conn:
+            return conn.scalar(select(SchemaMeta.value).where(SchemaMeta.key == FINGERPRINT_KEY))
+    except SQLAlchemyError:  # no schema_meta table yet
+        return None
+
+
+def sync_schema(mode: str = "auto") -> bool:
+    """Bring the database up to the models; returns whether the sync actually ran.
+
+    ``create_all`` plus the column/index catch-up reflect every table, which is most of a
+    cold start. In ``auto`` mode that is skipped when the database records the same schema
+    fingerprint as the code; ``always`` syncs on every start and ``never`` leaves it to
+    migrations.
+    """
+    if mode == "never":
+        return False
+    fingerprint = schema_fingerprint()
+    if mode == "auto" and stored_fingerprint() == fingerprint:
+        return False
+    db.create_all()
+    ensure_columns()
+    ensure_indexes()
+    with db.engine.begin() as conn:
+        now = datetime.utcnow()
+        updated = conn.execute(
+            update(SchemaMeta).where(SchemaMeta.key == FINGERPRINT_KEY).values(value=fingerprint, updated_at=now)
+        ).rowcount
+        if not updated:
+            conn.execute(insert(SchemaMeta).values(key=FINGERPRINT_KEY, value=fingerprint, updated_at=now))
+    return True
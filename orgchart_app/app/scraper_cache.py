@@ -0,0 +1,153 @@
+from __future__ import annotations
+import os
+import threading
+import zlib
+from typing import TYPE_CHECKING, Optional
+import requests
+from flask import current_app
+
+if TYPE_CHECKING:
+    from requests_cache import CachedSession
+
+
+def compressed_serializer():
+    """Cached responses are pickled as usual, then zlib-compressed; HTML shrinks ~5-10x"""
+    from requests_cache import SerializerPipeline, Stage, pickle_serializer
+    return SerializerPipeline(
+        [*pickle_serializer.stages, Stage(dumps=lambda data: zlib.compress(data, 6), loads=zlib.decompress)],
+        name="pickle+zlib",
+        is_binary=True,
+    )
+
+
+class ScraperCache:
+    """The scraper's HTTP cache: a requests-cache session plus size cap and hit/byte counters.
+
+    Expired entries are kept rather than deleted, so a page with an ETag or Last-Modified
+    is revalidated with a conditional request and an unchanged page costs a 304, not a
+    full download. When the SQLite store grows past ``max_bytes`` the entries closest to
+    expiry (i.e. the oldest) are evicted.
+    """
+
+    EVICT_EVERY = 50  # check the size cap every N stored responses
+
+    def __init__(self, session: CachedSession, max_bytes: int = 0) -> None:
+        self.session = session
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._stores = 0
+        self.hits = 0
+        self.revalidated = 0
+        self.misses = 0
+        self.bytes_saved = 0
+        self.bytes_downloaded = 0
+        self.evictions = 0
+
+    def is_fresh(self, url: str) -> bool:
+        """True if a non-expired copy is cached, so fetching it sends nothing to the site."""
+        cache = self.session.cache
+        cached = cache.get_response(cache.create_key(requests.Request("GET", url).prepare()))
+        return cached is not None and not cached.is_expired
+
+    def get(self, url: str, **kwargs) -> requests.Response:
+        resp = self.session.get(url, **kwargs)
+        size = len(resp.content or b"")
+        check_size = False
+        with self._lock:
+            if getattr(resp, "revalidated", False):
+                # 304 Not Modified: only headers crossed the wire
+                self.revalidated += 1
+                self.bytes_saved += size
+            elif getattr(resp, "from_cache", False):
+                self.hits += 1
+                self.bytes_saved += size
+            else:
+                self.misses += 1
+                self.bytes_downloaded += size
+                self._stores += 1
+                check_size = self.max_bytes and self._stores % self.EVICT_EVERY == 0
+        if check_size:
+            self.evict()
+        return resp
+
+    def _sqlite_responses(self):
+        responses = getattr(self.session.cache, "responses", None)
+        return responses if hasattr(responses, "connection") and hasattr(responses, "table_name") else None
+
+    def stored_bytes(self) -> Optional[int]:
+        responses = self._sqlite_responses()
+        if responses is None:
+            return None
+        with responses.connection() as con:
+            return con.execute(f"SELECT COALESCE(SUM(LENGTH(value)), 0) FROM {responses.table_name}").fetchone()[0]
+
+    def evict(self) -> int:
+        """Delete the oldest entries until the store is under ``max_bytes``; SQLite backend only."""
+        responses = self._sqlite_responses()
+        if responses is None or not self.max_bytes:
+            return 0
+        with responses.connection(commit=True) as con:
+            table = responses.table_name
+            total = con.execute(f"SELECT COALESCE(SUM(LENGTH(value)), 0) FROM {table}").fetchone()[0]
+            if total <= self.max_bytes:
+                return 0
+            # Evict down to 90% of the cap so we don't evict again on the next check
+            target = total - int(self.max_bytes * 0.9)
+            doomed, freed = [], 0
+            for key, size in con.execute(f"SELECT key, LENGTH(value) FROM {table} ORDER BY expires ASC"):
+                doomed.append(key)
+                freed += size
+                if freed >= target:
+                    break
+            con.executemany(f"DELETE FROM {table} WHERE key = ?", [(k,) for k in doomed])
+        with self._lock:
+            self.evictions += len(doomed)
+        return len(doomed)
+
+    def stats(self) -> dict:
+        requests_seen = self.hits + self.revalidated + self.misses
+        return {
+            "backend": type(self.session.cache).__name__,
+            "requests": requests_seen,
+            "hits": self.hits,
+            "revalidated": self.revalidated,
+            "misses": self.misses,
+            "hit_rate": round((self.hits + self.revalidated) / requests_seen, 4) if requests_seen else None,
+            "bytes_saved": self.bytes_saved,
+            "bytes_downloaded": self.bytes_downloaded,
+            "stored_bytes": self.stored_bytes(),
+            "max_bytes": self.max_bytes or None,
+            "evictions": self.evictions,
+        }
+
+
+def build_scraper_cache(cfg) -> ScraperCache:
+    # requests-cache is only imported once the scraper first fetches a page
+    from requests_cache import CachedSession
+    backend = cfg["SCRAPER_CACHE_BACKEND"]
+    options = {}
+    if backend in ("sqlite", "filesystem"):
+        options["serializer"] = compressed_serializer()
+    session = CachedSession(
+        cfg["SCRAPER_CACHE_PATH"],
+        backend=backend,
+        expire_after=cfg["SCRAPER_CACHE_EXPIRE"],
+        **options,
+    )
+    return ScraperCache(session, max_bytes=cfg["SCRAPER_CACHE_MAX_BYTES"])
+
+
+_caches: dict[int, ScraperCache] = {}
+_caches_lock = threading.Lock()
+
+
+def get_scraper_cache(config: Optional[dict] = None) -> ScraperCache:
+    pid = os.getpid()
+    cache = _caches.get(pid)
+    if cache is None:
+        cfg = config if config is not None else current_app.config
+        with _caches_lock:
+            cache = _caches.get(pid)
+            if cache is None:
+                cache = _caches[pid] = build_scraper_cache(cfg)
+    return cache
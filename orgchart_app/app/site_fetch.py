@@ -0,0 +1,45 @@
+from __future__ import annotations
+from concurrent.futures import Future
+from urllib.parse import urlparse
+from .crawler import get_crawler
+from .robots import get_robots_cache
+from .scraper_cache import get_scraper_cache
+
+
+# Prohibited domains (LinkedIn and similar)
+PROHIBITED_DOMAINS = [
+    "linkedin.com",
+    "facebook.com",
+    "twitter.com",
+    "instagram.com",
+    "tiktok.com",
+]
+
+# Product token matched against robots.txt User-agent lines
+ROBOTS_USER_AGENT = "Industrial-OrgChart-Bot/1.0"
+CONTACT_USER_AGENT = "Industrial-OrgChart-Bot/1.0 (Contact Discovery)"
+FETCH_TIMEOUT = 10
+
+
+def is_allowed_domain(url: str) -> bool:
+    """Check if domain is allowed to be scraped"""
+    domain = urlparse(url).netloc.lower()
+    return not any(prohibited in domain for prohibited in PROHIBITED_DOMAINS)
+
+
+def check_robots_txt(url: str) -> bool:
+    """Check if robots.txt allows scraping this URL (rules cached per site)"""
+    entry = get_robots_cache().entry(url, ROBOTS_USER_AGENT)
+    # Honor the site's Crawl-delay when it asks for more spacing than our default delay
+    get_crawler().set_delay(get_crawler().domain_of(url), entry.crawl_delay)
+    return entry.can_fetch(ROBOTS_USER_AGENT, url)
+
+
+def fetch_page(url: str, headers: dict) -> Future:
+    """Schedule a GET on the crawler; the site's rate limit is applied unless the page is cached"""
+    cache = get_scraper_cache()
+    return get_crawler().submit(
+        url,
+        lambda: cache.get(url, timeout=FETCH_TIMEOUT, headers=headers),
+        polite=not cache.is_fresh(url),
+    )
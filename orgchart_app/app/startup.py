@@ -0,0 +1,38 @@
+from __future__ import annotations
+import logging
+import time
+from contextlib import contextmanager
+
+
+logger = logging.getLogger(__name__)
+
+
+class StartupTimer:
+    """Wall time of each named phase of ``create_app``, for finding what dominates a cold start."""
+
+    def __init__(self) -> None:
+        self.started = time.perf_counter()
+        self.phases: dict[str, float] = {}
+
+    def record(self, name: str, seconds: float) -> None:
+        self.phases[name] = self.phases.get(name, 0.0) + seconds
+
+    @contextmanager
+    def phase(self, name: str):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(name, time.perf_counter() - started)
+
+    def summary(self, **extra) -> dict:
+        total = time.perf_counter() - self.started + self.phases.get("import", 0.0)
+        return {
+            "total_ms": round(total * 1000, 1),
+            "phases_ms": {name: round(seconds * 1000, 1) for name, seconds in self.phases.items()},
+            **extra,
+        }
+
+    def log(self, summary: dict) -> None:
+        phases = ", ".join(f"{name} {ms}ms" for name, ms in summary["phases_ms"].items())
+        logger.info("startup took %sms: %s", summary["total_ms"], phases)
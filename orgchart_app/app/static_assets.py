@@ -0,0 +1,168 @@
+"""
+In-memory manifest of the React build, served without per-request filesystem probes.
+
+The build directory is scanned once at startup. Each file's precompressed siblings
+(``main.1a2b3c4d.js.br``, ``.gz``) are recorded as variants, picked by the request's
+Accept-Encoding. Files whose names carry a content hash are cached as immutable;
+``index.html`` gets a content ETag and must be revalidated. Create the variants at
+build time with ``python precompress_frontend.py <build dir>``.
+"""
+from __future__ import annotations
+import gzip
+import hashlib
+import mimetypes
+import os
+import re
+from dataclasses import dataclass, field
+from typing import Optional
+from flask import Response, request, send_file
+
+
+INDEX = "index.html"
+# Encodings in server preference order, with the file suffix each variant uses
+ENCODINGS = (("br", ".br"), ("gzip", ".gz"))
+COMPRESSIBLE_SUFFIXES = (".js", ".css", ".html", ".json", ".map", ".svg", ".txt", ".xml", ".ico", ".webmanifest")
+# CRA/webpack output: main.1a2b3c4d.js, 787.1a2b3c4d.chunk.css, media/logo.6ce24c58023cc2f8fd88.svg
+HASHED_NAME_RE = re.compile(r"\.[0-9a-f]{8,}\.(?:chunk\.)?[A-Za-z0-9]+$")
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+
+
+@dataclass(slots=True)
+class Variant:
+    path: str
+    size: int
+    etag: str
+
+
+@dataclass(slots=True)
+class StaticAsset:
+    path: str  # absolute path of the uncompressed file
+    mimetype: str
+    size: int
+    etag: str
+    mtime: float
+    immutable: bool
+    revalidate: bool  # index.html: always revalidated so a new deploy is picked up
+    variants: dict[str, Variant] = field(default_factory=dict)
+
+
+class FrontendManifest:
+    """Relative URL path -> StaticAsset for every file in a frontend build directory."""
+
+    def __init__(self, root: str, assets: dict[str, StaticAsset]) -> None:
+        self.root = root
+        self.assets = assets
+        self.index = assets.get(INDEX)
+
+    @classmethod
+    def scan(cls, root: str) -> Optional["FrontendManifest"]:
+        """Walk ``root`` once; returns None when there is no build (no ``index.html``)."""
+        if not os.path.isfile(os.path.join(root, INDEX)):
+            return None
+        files: dict[str, os.stat_result] = {}
+        for dirpath, _dirnames, filenames in os.walk(root):
+            for name in filenames:
+                full = os.path.join(dirpath, name)
+                files[os.path.relpath(full, root).replace(os.sep, "/")] = os.stat(full)
+
+        variant_suffixes = tuple(suffix for _encoding, suffix in ENCODINGS)
+        assets = {}
+        for rel, st in files.items():
+            # A .gz/.br whose uncompressed original exists is a variant, not an asset of its own
+            if rel.endswith(variant_suffixes) and rel.rsplit(".", 1)[0] in files:
+                continue
+            full = os.path.join(root, rel)
+            if rel == INDEX:
+                # Content hash: identical across instances and deploys of the same build
+                with open(full, "rb") as fh:
+                    etag = hashlib.sha1(fh.read()).hexdigest()
+            else:
+                etag = f"{st.st_mtime_ns:x}-{st.st_size:x}"
+            asset = StaticAsset(
+                path=full,
+                mimetype=mimetypes.guess_type(rel)[0] or "application/octet-stream",
+                size=st.st_size,
+                etag=etag,
+                mtime=st.st_mtime,
+                immutable=bool(HASHED_NAME_RE.search(rel.rsplit("/", 1)[-1])),
+                revalidate=rel == INDEX,
+            )
+            for encoding, suffix in ENCODINGS:
+                compressed = files.get(rel + suffix)
+                # Skip variants that are stale or no smaller than the original
+                if compressed and compressed.st_mtime >= st.st_mtime and compressed.st_size < st.st_size:
+                    asset.variants[encoding] = Variant(full + suffix, compressed.st_size, f"{etag}-{encoding}")
+            assets[rel] = asset
+        return cls(root, assets)
+
+    def get(self, path: str) -> Optional[StaticAsset]:
+        return self.assets.get(path)
+
+
+def _pick_variant(asset: StaticAsset) -> tuple[Optional[str], Optional[Variant]]:
+    if not asset.variants:
+        return None, None
+    for encoding, _suffix in ENCODINGS:
+        variant = asset.variants.get(encoding)
+        if variant is not None and request.accept_encodings[encoding]:
+            return encoding, variant
+    return None, None
+
+
+def send_asset(asset: StaticAsset, max_age: int) -> Response:
+    """Send ``asset`` (or its best precompressed variant) with conditional-request support.
+
+    Hashed files are cached for a year as immutable; ``index.html`` must be revalidated
+    (ETag, 304); anything else is cached for ``max_age`` seconds.
+    """
+    encoding, variant = _pick_variant(asset)
+    response = send_file(
+        variant.path if variant else asset.path,
+        mimetype=asset.mimetype,
+        etag=variant.etag if variant else asset.etag,
+        last_modified=asset.mtime,
+        conditional=True,
+    )
+    if encoding:
+        response.headers["Content-Encoding"] = encoding
+    if asset.variants:
+        response.vary.add("Accept-Encoding")
+    if asset.immutable:
+        response.headers["Cache-Control"] = IMMUTABLE_CACHE_CONTROL
+    elif asset.revalidate:
+        response.headers["Cache-Control"] = "no-cache"
+    else:
+        response.headers["Cache-Control"] = f"public, max-age={max_age}"
+    return response
+
+
+def precompress(root: str, min_size: int = 1024) -> dict[str, int]:
+    """Write ``.gz`` (and ``.br`` when the ``brotli`` package is installed) next to each text asset.
+
+    Files smaller than ``min_size`` are left alone; variants that would not be smaller
+    are not written. Returns counts of files written per encoding.
+    """
+    try:
+        import brotli
+    except ImportError:
+        brotli = None
+    written = {"gzip": 0, "br": 0}
+    for dirpath, _dirnames, filenames in os.walk(root):
+        for name in filenames:
+            if not name.endswith(COMPRESSIBLE_SUFFIXES):
+                continue
+            full = os.path.join(dirpath, name)
+            with open(full, "rb") as fh:
+                data = fh.read()
+            if len(data) < min_size:
+                continue
+            outputs = [("gzip", ".gz", gzip.compress(data, compresslevel=9, mtime=0))]
+            if brotli is not None:
+                outputs.append(("br", ".br", brotli.compress(data, quality=11)))
+            for encoding, suffix, payload in outputs:
+                if len(payload) < len(data):
+                    with open(full + suffix, "wb") as fh:
+                        fh.write(payload)
+                    written[encoding] += 1
+    return written
+
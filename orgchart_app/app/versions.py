@@ -0,0 +1,70 @@
+from __future__ import annotations
+from typing import Iterable
+from sqlalchemy import event, insert, select, update
+from sqlalchemy.dialects.postgresql import insert as postgresql_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.orm import Session
+from .database import db
+from .models import Department, OrganizationVersion, Person, Project, ProjectAssignment
+
+
+def get_org_version(org_id: int) -> int:
+    return db.session.scalar(
+        select(OrganizationVersion.version).where(OrganizationVersion.organization_id == org_id)
+    ) or 0
+
+
+def bump_org_version(org_ids: Iterable[int], session: Session | None = None) -> None:
+    """Increment the version of each org inside the caller's transaction.
+
+    Needed after bulk UPDATE/DELETE statements, which bypass the flush listener below.
+    The first bump of an org is an upsert, so two concurrent first writes both succeed.
+    """
+    session = session or db.session
+    conn = session.connection()
+    dialect = conn.dialect.name
+    for org_id in set(org_ids):
+        if dialect in ("postgresql", "sqlite"):
+            dialect_insert = postgresql_insert if dialect == "postgresql" else sqlite_insert
+            stmt = dialect_insert(OrganizationVersion).values(organization_id=org_id, version=1)
+            conn.execute(stmt.on_conflict_do_update(
+                index_elements=[OrganizationVersion.organization_id],
+                set_={"version": OrganizationVersion.version + 1},
+            ))
+            continue
+        result = conn.execute(
+            update(OrganizationVersion)
+            .where(OrganizationVersion.organization_id == org_id)
+            .values(version=OrganizationVersion.version + 1)
+        )
+        if not result.rowcount:
+            conn.execute(insert(OrganizationVersion).values(organization_id=org_id, version=1))
+
+
+def _touched_org_ids(session: Session) -> set[int]:
+    org_ids: set[int] = set()
+    dirty = [obj for obj in session.dirty if session.is_modified(obj)]
+    for obj in (*session.new, *dirty, *session.deleted):
+        if isinstance(obj, (Person, Department, Project)):
+            if obj.organization_id:
+                org_ids.add(obj.organization_id)
+        elif isinstance(obj, ProjectAssignment):
+            project = obj.project or (session.get(Project, obj.project_id) if obj.project_id else None)
+            if project and project.organization_id:
+                org_ids.add(project.organization_id)
+    return org_ids
+
+
+@event.listens_for(Session, "before_flush")
+def _collect_touched_orgs(session: Session, flush_context, instances) -> None:
+    with session.no_autoflush:
+        touched = _touched_org_ids(session)
+    if touched:
+        session.info.setdefault("touched_org_ids", set()).update(touched)
+
+
+@event.listens_for(Session, "after_flush")
+def _bump_touched_orgs(session: Session, flush_context) -> None:
+    touched = session.info.pop("touched_org_ids", None)
+    if touched:
+        bump_org_version(touched, session=session)
@@ -0,0 +1,250 @@
+from __future__ import annotations
+import re
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from typing import Iterable, Optional
+from sqlalchemy import func, insert, select, update
+from .database import db
+from .models import EnrichmentResult, Person, PersonFieldSource
+from .versions import bump_org_version
+
+
+# Person columns an enrichment provider may fill in
+WRITABLE_FIELDS = ("title", "email", "phone", "location", "linkedin_url")
+RECORD_FIELD = "_record"
+IN_CHUNK = 500
+
+_LINKEDIN_PREFIX = re.compile(r"^(https?://)?(www\.)?", re.I)
+
+
+def normalize_linkedin(url: Optional[str]) -> Optional[str]:
+    if not url:
+        return None
+    return _LINKEDIN_PREFIX.sub("", url.strip()).rstrip("/").lower() or None
+
+
+def extract_fields(record: dict) -> dict:
+    """Person fields from either a raw PDL person or our transformed search result."""
+    emails = record.get("emails") or []
+    email = record.get("work_email") or record.get("email") or (emails[0].get("address") if emails and isinstance(emails[0], dict) else None)
+    phones = record.get("phone_numbers") or []
+    fields = {
+        "full_name": record.get("full_name"),
+        "title": record.get("job_title") or record.get("title"),
+        "email": email,
+        "phone": record.get("mobile_phone") or record.get("phone") or (phones[0] if phones else None),
+        "location": record.get("location_name") or record.get("location"),
+        "linkedin_url": normalize_linkedin(record.get("linkedin_url")),
+    }
+    return {k: v for k, v in fields.items() if isinstance(v, str) and v.strip()}
+
+
+@dataclass
+class WritebackResult:
+    matched: int = 0
+    updated_people: int = 0
+    fields_updated: int = 0
+    unmatched: list[int] = field(default_factory=list)
+
+    def to_dict(self) -> dict:
+        return {
+            "matched": self.matched,
+            "updated_people": self.updated_people,
+            "fields_updated": self.fields_updated,
+            "unmatched": self.unmatched,
+        }
+
+
+def _chunks(values: list, size: int = IN_CHUNK):
+    for i in range(0, len(values), size):
+        yield values[i:i + size]
+
+
+def people_by_name(org_id: int, names: Iterable[str]) -> dict[str, list[int]]:
+    """Ids of the org's people for each of ``names``, keyed by lowercased full name."""
+    by_name: dict[str, list[int]] = {}
+    for chunk in _chunks(sorted({n.strip().lower() for n in names if n})):
+        for pid, name in db.session.execute(
+            select(Person.id, func.lower(Person.full_name)).where(Person.organization_id == org_id, func.lower(Person.full_name).in_(chunk))
+        ):
+            by_name.setdefault(name, []).append(pid)
+    return by_name
+
+
+def match_people(org_id: int, records: list[dict]) -> list[Optional[int]]:
+    """Match extracted records to people by email, then LinkedIn URL, then unique full name within the org."""
+    emails = sorted({r["email"].lower() for r in records if r.get("email")})
+    linkedins = sorted({r["linkedin_url"] for r in records if r.get("linkedin_url")})
+
+    by_email: dict[str, int] = {}
+    by_linkedin: dict[str, int] = {}
+    for chunk in _chunks(emails):
+        for pid, email in db.session.execute(
+            select(Person.id, func.lower(Person.email)).where(Person.organization_id == org_id, func.lower(Person.email).in_(chunk))
+        ):
+            by_email.setdefault(email, pid)
+    for chunk in _chunks(linkedins):
+        for pid, url in db.session.execute(
+            select(Person.id, Person.linkedin_url).where(Person.organization_id == org_id, Person.linkedin_url.in_(chunk))
+        ):
+            by_linkedin.setdefault(url, pid)
+    by_name = people_by_name(org_id, (r["full_name"] for r in records if r.get("full_name")))
+
+    matches: list[Optional[int]] = []
+    for r in records:
+        pid = by_email.get((r.get("email") or "").lower()) or by_linkedin.get(r.get("linkedin_url") or "")
+        if pid is None:
+            candidates = by_name.get((r.get("full_name") or "").strip().lower(), [])
+            pid = candidates[0] if len(candidates) == 1 else None
+        matches.append(pid)
+    return matches
+
+
+def apply_records(
+    org_id: int,
+    items: Iterable[tuple[Optional[int], dict]],
+    source: str,
+    overwrite: bool = False,
+    source_url: Optional[str] = None,
+    commit: bool = True,
+) -> WritebackResult:
+    """Write provider data back onto people with bulk UPDATEs and record per-field provenance.
+
+    ``items`` are ``(person_id or None, provider record)``; records without a person id are
+    matched first. Empty fields are always filled; with ``overwrite`` a non-empty field is
+    replaced only if it was last written by this same source (never a manual edit).
+    ``commit=False`` leaves the writes in the caller's transaction.
+    """
+    items = list(items)
+    extracted = [extract_fields(record) for _, record in items]
+    unresolved = [i for i, (pid, _) in enumerate(items) if pid is None]
+    matched_ids = dict(zip(unresolved, match_people(org_id, [extracted[i] for i in unresolved]))) if unresolved else {}
+
+    result = WritebackResult()
+    pending: dict[int, dict] = {}
+    for i, (pid, _) in enumerate(items):
+        pid = pid if pid is not None else matched_ids.get(i)
+        if pid is None:
+            result.unmatched.append(i)
+            continue
+        result.matched += 1
+        merged = pending.setdefault(pid, {})
+        for k, v in extracted[i].items():
+            merged.setdefault(k, v)
+    if not pending:
+        return result
+
+    person_ids = sorted(pending)
+    current: dict[int, dict] = {}
+    provenance: dict[tuple[int, str], PersonFieldSource] = {}
+    for chunk in _chunks(person_ids):
+        for row in db.session.execute(
+            select(Person.id, *(getattr(Person, f) for f in WRITABLE_FIELDS))
+            .where(Person.organization_id == org_id, Person.id.in_(chunk))
+        ):
+            current[row[0]] = dict(zip(WRITABLE_FIELDS, row[1:]))
+        for src in db.session.scalars(select(PersonFieldSource).where(PersonFieldSource.person_id.in_(chunk))):
+            provenance[(src.person_id, src.field)] = src
+
+    # Emails already used in the org can't be copied onto another person (uq_person_org_email)
+    wanted_emails = sorted({pending[pid]["email"].lower() for pid in person_ids if pending[pid].get("email")})
+    taken_emails: set[str] = set()
+    for chunk in _chunks(wanted_emails):
+        taken_emails.update(db.session.scalars(
+            select(func.lower(Person.email)).where(Person.organization_id == org_id, func.lower(Person.email).in_(chunk))
+        ))
+
+    now = datetime.utcnow()
+    person_updates: list[dict] = []
+    source_inserts: list[dict] = []
+    source_updates: list[dict] = []
+    for pid in person_ids:
+        if pid not in current:  # not in this org
+            continue
+        changes: dict = {}
+        touched_fields = [RECORD_FIELD]
+        for f in WRITABLE_FIELDS:
+            value = pending[pid].get(f)
+            if value is None:
+                continue
+            existing = current[pid][f]
+            prior = provenance.get((pid, f))
+            if f == "email" and value.lower() in taken_emails and (existing or "").lower() != value.lower():
+                continue
+            if existing in (None, "") or (overwrite and existing != value and prior is not None and prior.source == source):
+                changes[f] = value
+                touched_fields.append(f)
+        if "email" in changes:
+            # Claimed for this person: later people in the same batch must not get it too
+            taken_emails.add(changes["email"].lower())
+        if changes:
+            person_updates.append({"id": pid, **changes})
+            result.updated_people += 1
+            result.fields_updated += len(changes)
+        for f in touched_fields:
+            prior = provenance.get((pid, f))
+            row = {"source": source, "source_url": source_url, "fetched_at": now}
+            if prior is not None:
+                source_updates.append({"id": prior.id, **row})
+            else:
+                source_inserts.append({"person_id": pid, "field": f, **row})
+
+    if person_updates:
+        db.session.execute(update(Person), person_updates)
+    if source_updates:
+        db.session.execute(update(PersonFieldSource), source_updates)
+    if source_inserts:
+        db.session.execute(insert(PersonFieldSource), source_inserts)
+    if person_updates:
+        bump_org_version([org_id])
+    if commit:
+        db.session.commit()
+    return result
+
+
+def fresh_person_ids_query(source: str, max_age: timedelta):
+    """Ids of people checked against ``source`` within ``max_age``.
+
+    A person counts as checked when a record from ``source`` was applied to them, or when an
+    enrichment job got a definitive answer for them (match or no match), applied or not.
+    Provider errors don't count, so those people are tried again.
+    """
+    cutoff = datetime.utcnow() - max_age
+    return select(PersonFieldSource.person_id).where(
+        PersonFieldSource.field == RECORD_FIELD,
+        PersonFieldSource.source == source,
+        PersonFieldSource.fetched_at >= cutoff,
+    ).union(select(EnrichmentResult.person_id).where(
+        EnrichmentResult.provider == source,
+        EnrichmentResult.status.in_((200, 404)),
+        EnrichmentResult.fetched_at >= cutoff,
+    ))
+
+
+def record_manual_edit(person_id: int, fields: Iterable[str], source: str = "manual") -> None:
+    """Mark fields as hand-edited so later enrichment runs never overwrite them."""
+    fields = [f for f in fields if f in WRITABLE_FIELDS]
+    if not fields:
+        return
+    existing = {
+        src.field: src
+        for src in db.session.scalars(
+            select(PersonFieldSource).where(PersonFieldSource.person_id == person_id, PersonFieldSource.field.in_(fields))
+        )
+    }
+    now = datetime.utcnow()
+    for f in fields:
+        src = existing.get(f)
+        if src:
+            src.source, src.source_url, src.fetched_at = source, None, now
+        else:
+            db.session.add(PersonFieldSource(person_id=person_id, field=f, source=source, fetched_at=now))
+
+
+def serialize_field_source(s: PersonFieldSource) -> dict:
+    return {
+        "field": s.field,
+        "source": s.source,
+        "source_url": s.source_url,
+        "fetched_at": s.fetched_at.isoformat() if s.fetched_at else None,
+    }
@@ -0,0 +1,196 @@
+"""
+Mixed read/import concurrency benchmark.
+
+Reader threads request the org chart and people list of a synthetic org while one
+writer thread runs CSV imports into it back to back, all through the Flask test
+client against one shared app. Each SQLite journal mode is run in its own
+subprocess against a fresh scratch database so the engine profile is applied
+from a clean start. Run from orgchart_app/:
+
+    python benchmarks/bench_concurrency.py --size 10k --readers 8 --duration 20
+    python benchmarks/bench_concurrency.py --modes WAL --database-url postgresql://...
+
+Reports read p50/p95/max latency, reads per second, imports completed and errors
+(HTTP >= 500 or exceptions, e.g. "database is locked") per mode.
+"""
+import argparse
+import io
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from bench_endpoints import parse_size  # noqa: E402
+
+
+def percentile(samples, pct):
+    if not samples:
+        return None
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))]
+
+
+def run_mode(args):
+    """One mode in this process; prints a JSON summary as the last stdout line"""
+    from app import create_app
+    from app.database import db
+    from app.models import Person
+    from sqlalchemy import select, text
+    from synthetic import generate_org, import_csv
+
+    app = create_app()
+    with app.app_context():
+        org = generate_org(db.session, args.size, seed=args.seed)
+        manager_emails = db.session.scalars(
+            select(Person.email).where(Person.organization_id == org['organization_id']).order_by(Person.id).limit(1000)
+        ).all()
+        journal_mode = db.session.execute(text('PRAGMA journal_mode')).scalar() if db.engine.dialect.name == 'sqlite' else None
+    org_id = org['organization_id']
+    org_name = f'Benchmark Org {args.size}'
+    urls = [f'/api/orgchart/{org_id}', f'/api/people?organization_id={org_id}']
+
+    stop = threading.Event()
+    lock = threading.Lock()
+    read_ms, errors, imports, import_ms = [], [], [], []
+
+    def reader(index):
+        client = app.test_client()
+        i = index
+        while not stop.is_set():
+            url = urls[i % len(urls)]
+            i += 1
+            started = time.perf_counter()
+            try:
+                status = client.get(url).status_code
+            except Exception as exc:
+                with lock:
+                    errors.append(f'read: {exc}')
+                continue
+            elapsed = (time.perf_counter() - started) * 1000
+            with lock:
+                if status >= 500:
+                    errors.append(f'read: HTTP {status}')
+                else:
+                    read_ms.append(elapsed)
+
+    def writer():
+        client = app.test_client()
+        batch = 0
+        while not stop.is_set():
+            # Distinct seed per batch so every import inserts new people
+            csv_text = import_csv(org_name, manager_emails, args.import_rows, seed=args.seed + batch)
+            batch += 1
+            started = time.perf_counter()
+            try:
+                status = client.post(
+                    '/api/imports/people-csv',
+                    data={'file': (io.BytesIO(csv_text.encode()), 'people.csv')},
+                    content_type='multipart/form-data',
+                ).status_code
+            except Exception as exc:
+                with lock:
+                    errors.append(f'import: {exc}')
+                continue
+            with lock:
+                if status >= 400:
+                    errors.append(f'import: HTTP {status}')
+                else:
+                    imports.append(batch)
+                    import_ms.append((time.perf_counter() - started) * 1000)
+
+    threads = [threading.Thread(target=reader, args=(i,), daemon=True) for i in range(args.readers)]
+    threads.append(threading.Thread(target=writer, daemon=True))
+    started = time.perf_counter()
+    for t in threads:
+        t.start()
+    time.sleep(args.duration)
+    stop.set()
+    for t in threads:
+        t.join()
+    wall = time.perf_counter() - started
+
+    print(json.dumps({
+        'mode': args.mode,
+        'journal_mode': journal_mode,
+        'size': args.size,
+        'readers': args.readers,
+        'seconds': round(wall, 2),
+        'reads': len(read_ms),
+        'reads_per_s': round(len(read_ms) / wall, 1),
+        'read_p50_ms': round(statistics.median(read_ms), 2) if read_ms else None,
+        'read_p95_ms': round(percentile(read_ms, 95), 2) if read_ms else None,
+        'read_max_ms': round(max(read_ms), 2) if read_ms else None,
+        'imports': len(imports),
+        'import_median_ms': round(statistics.median(import_ms), 2) if import_ms else None,
+        'errors': len(errors),
+        'first_errors': errors[:5],
+    }))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--size', default='10k', help='people in the synthetic org, e.g. 10k')
+    parser.add_argument('--readers', type=int, default=8, help='concurrent reader threads')
+    parser.add_argument('--duration', type=float, default=20, help='seconds per mode')
+    parser.add_argument('--import-rows', type=int, default=500, help='rows per CSV import')
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--modes', default='DELETE,WAL', help='comma-separated SQLITE_JOURNAL_MODE values to compare')
+    parser.add_argument('--database-url', help='run once against this database instead of scratch SQLite files')
+    parser.add_argument('--output', help='write results as JSON to this file')
+    parser.add_argument('--mode', help=argparse.SUPPRESS)  # set on the per-mode subprocess
+    args = parser.parse_args()
+    args.size = parse_size(args.size) if isinstance(args.size, str) else args.size
+
+    if args.mode:
+        run_mode(args)
+        return
+
+    modes = ['server'] if args.database_url else [m.strip().upper() for m in args.modes.split(',') if m.strip()]
+    results = []
+    for mode in modes:
+        env = dict(os.environ, PROVIDER_USAGE_ENABLED='0', METRICS_ENABLED='0')
+        scratch = None
+        if args.database_url:
+            env['DATABASE_URL'] = args.database_url
+        else:
+            scratch = tempfile.mkdtemp(prefix='orgchart-concurrency-')
+            env['DATABASE_URL'] = f"sqlite:///{os.path.join(scratch, 'bench.db')}"
+            env['SQLITE_JOURNAL_MODE'] = mode
+        print(f'[{mode}] {args.readers} readers + 1 importer for {args.duration:g}s on {args.size} people', file=sys.stderr)
+        try:
+            proc = subprocess.run(
+                [sys.executable, __file__, '--mode', mode, '--size', str(args.size), '--readers', str(args.readers),
+                 '--duration', str(args.duration), '--import-rows', str(args.import_rows), '--seed', str(args.seed)],
+                env=env, capture_output=True, text=True,
+            )
+        finally:
+            if scratch:
+                for name in os.listdir(scratch):
+                    os.remove(os.path.join(scratch, name))
+                os.rmdir(scratch)
+        if proc.returncode != 0:
+            print(proc.stderr, file=sys.stderr)
+            sys.exit(proc.returncode)
+        results.append(json.loads(proc.stdout.strip().splitlines()[-1]))
+
+    if args.output:
+        Path(args.output).write_text(json.dumps(results, indent=2))
+    print(f"{'mode':<8}{'reads/s':>9}{'p50 ms':>10}{'p95 ms':>10}{'max ms':>10}{'imports':>9}{'import ms':>11}{'errors':>8}")
+    for r in results:
+        print(f"{r['mode']:<8}{r['reads_per_s']:>9}{r['read_p50_ms'] or '':>10}{r['read_p95_ms'] or '':>10}"
+              f"{r['read_max_ms'] or '':>10}{r['imports']:>9}{r['import_median_ms'] or '':>11}{r['errors']:>8}")
+        for error in r['first_errors']:
+            print(f'    {error}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,215 @@
+"""
+Endpoint benchmarks on synthetic organizations of increasing size.
+
+For each size a deterministic org (see benchmarks/synthetic.py) is generated in a
+scratch database, then the hot endpoints are timed through the Flask test client:
+org chart (full and project-scoped), flat export, list endpoints, department
+rollup, staffing window, CSV import and finally the cascade delete of the org.
+Run from orgchart_app/:
+
+    python benchmarks/bench_endpoints.py --sizes 1k,10k,100k --output before.json
+    python benchmarks/bench_endpoints.py --sizes 1k,10k,100k --compare before.json
+
+``--compare`` prints each case's median against a previous ``--output`` file and
+exits non-zero if any case got slower than ``--threshold``. Sizes up to 1m work
+but the full org chart at 1M people needs several GB of memory.
+"""
+import argparse
+import io
+import json
+import os
+import platform
+import sqlite3
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+
+def parse_size(value):
+    value = value.strip().lower()
+    multiplier = {'k': 1_000, 'm': 1_000_000}.get(value[-1:], 1)
+    return int(float(value.rstrip('km')) * multiplier)
+
+
+def git_revision():
+    try:
+        rev = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=ROOT, capture_output=True, text=True, check=True).stdout.strip()
+        dirty = subprocess.run(['git', 'status', '--porcelain', '--untracked-files=no'], cwd=ROOT, capture_output=True, text=True).stdout.strip()
+        return rev + ('-dirty' if dirty else '')
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def timed(fn, repeat):
+    """Run ``fn`` ``repeat`` times; returns (last response, samples in ms)"""
+    samples = []
+    response = None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        response = fn()
+        samples.append((time.perf_counter() - started) * 1000)
+    return response, samples
+
+
+def summarize(size, case, response, samples):
+    return {
+        'size': size,
+        'case': case,
+        'status': response.status_code if response is not None else None,
+        'bytes': len(response.get_data()) if response is not None else None,
+        'runs': len(samples),
+        'first_ms': round(samples[0], 2),
+        'median_ms': round(statistics.median(samples), 2),
+        'min_ms': round(min(samples), 2),
+        'max_ms': round(max(samples), 2),
+    }
+
+
+def run_size(app, client, n, args):
+    from app.database import db
+    from app.models import Person
+    from sqlalchemy import select
+    from synthetic import generate_org, import_csv
+
+    results = []
+    with app.app_context():
+        started = time.perf_counter()
+        org = generate_org(db.session, n, seed=args.seed)
+        generate_ms = (time.perf_counter() - started) * 1000
+        org_name = f'Benchmark Org {n}'
+        manager_emails = db.session.scalars(
+            select(Person.email).where(Person.organization_id == org['organization_id']).order_by(Person.id).limit(1000)
+        ).all()
+    results.append({'size': n, 'case': 'generate', 'runs': 1, 'first_ms': round(generate_ms, 2), 'median_ms': round(generate_ms, 2),
+                    'min_ms': round(generate_ms, 2), 'max_ms': round(generate_ms, 2), 'status': None, 'bytes': None, 'org': org})
+    print(f"[{n}] generated org {org['organization_id']}: {org['departments']} departments, {org['projects']} projects, "
+          f"{org['assignments']} assignments, depth {org['max_depth']} in {generate_ms / 1000:.1f}s", file=sys.stderr)
+
+    org_id = org['organization_id']
+    reads = [
+        ('orgchart_full', f'/api/orgchart/{org_id}'),
+        ('orgchart_project', f"/api/orgchart/{org_id}?project_id={org['project_id']}"),
+        ('orgchart_flat', f'/api/orgchart/{org_id}/flat'),
+        ('people_list', f'/api/people?organization_id={org_id}'),
+        ('projects_list', f'/api/projects?organization_id={org_id}'),
+        ('departments_list', f'/api/departments?organization_id={org_id}'),
+        ('departments_rollup', f'/api/departments/rollup?organization_id={org_id}'),
+        ('projects_staffing', f'/api/projects/staffing?organization_id={org_id}&start=2024-06-01&end=2024-12-31'),
+    ]
+    for case, url in reads:
+        if args.only and case not in args.only:
+            continue
+        response, samples = timed(lambda: client.get(url), args.repeat)
+        results.append(summarize(n, case, response, samples))
+
+    # Writes run once: each changes the data the next run would see
+    if not args.only or 'csv_import' in args.only:
+        csv_text = import_csv(org_name, manager_emails, args.import_rows, seed=args.seed)
+        response, samples = timed(lambda: client.post(
+            '/api/imports/people-csv',
+            data={'file': (io.BytesIO(csv_text.encode()), 'people.csv')},
+            content_type='multipart/form-data',
+        ), 1)
+        results.append({**summarize(n, 'csv_import', response, samples), 'rows': args.import_rows})
+    response, samples = timed(lambda: client.delete(f'/api/organizations/{org_id}'), 1)
+    results.append(summarize(n, 'cascade_delete', response, samples))
+
+    for r in results:
+        if r['status'] is not None and r['status'] >= 400:
+            print(f"[{n}] {r['case']} returned HTTP {r['status']}", file=sys.stderr)
+    return results
+
+
+def compare(results, baseline_path, threshold):
+    baseline = {(r['size'], r['case']): r for r in json.loads(Path(baseline_path).read_text())['results']}
+    regressions = 0
+    print(f"\n{'size':>9}  {'case':<20}{'base ms':>12}{'now ms':>12}{'ratio':>8}")
+    for r in results:
+        base = baseline.get((r['size'], r['case']))
+        if not base or r['case'] == 'generate':
+            continue
+        ratio = r['median_ms'] / base['median_ms'] if base['median_ms'] else float('inf')
+        flag = ''
+        if ratio > threshold:
+            regressions += 1
+            flag = '  REGRESSION'
+        print(f"{r['size']:>9}  {r['case']:<20}{base['median_ms']:>12}{r['median_ms']:>12}{ratio:>7.2f}x{flag}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--sizes', default='1k,10k,100k', help='comma-separated people counts, e.g. 1k,10k,100k,1m')
+    parser.add_argument('--repeat', type=int, default=3, help='runs per read endpoint')
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--import-rows', type=int, default=1000, help='rows in the timed CSV import')
+    parser.add_argument('--only', help='comma-separated case names to time (generate and cascade_delete always run)')
+    parser.add_argument('--database-url', help='database to benchmark against (default: a scratch SQLite file)')
+    parser.add_argument('--output', help='write results as JSON to this file')
+    parser.add_argument('--compare', help='a previous --output file to compare medians against')
+    parser.add_argument('--threshold', type=float, default=1.25, help='slowdown ratio that counts as a regression')
+    args = parser.parse_args()
+    args.only = set(args.only.split(',')) if args.only else None
+    sizes = [parse_size(s) for s in args.sizes.split(',') if s.strip()]
+
+    scratch = None
+    if args.database_url:
+        os.environ['DATABASE_URL'] = args.database_url
+    else:
+        scratch = tempfile.mkdtemp(prefix='orgchart-bench-')
+        os.environ['DATABASE_URL'] = f"sqlite:///{os.path.join(scratch, 'bench.db')}"
+    os.environ.setdefault('PROVIDER_USAGE_ENABLED', '0')
+    sys.path.insert(0, str(Path(__file__).resolve().parent))
+    from app import create_app
+    import sqlalchemy
+
+    app = create_app()
+    client = app.test_client()
+    results = []
+    try:
+        for n in sizes:
+            results.extend(run_size(app, client, n, args))
+    finally:
+        if scratch:
+            for name in os.listdir(scratch):
+                os.remove(os.path.join(scratch, name))
+            os.rmdir(scratch)
+
+    report = {
+        'meta': {
+            'timestamp': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+            'git_revision': git_revision(),
+            'python': platform.python_version(),
+            'sqlalchemy': sqlalchemy.__version__,
+            'sqlite': sqlite3.sqlite_version,
+            'database': 'scratch sqlite' if scratch else sqlalchemy.engine.make_url(args.database_url).render_as_string(hide_password=True),
+            'platform': platform.platform(),
+            'seed': args.seed,
+            'repeat': args.repeat,
+            'import_rows': args.import_rows,
+        },
+        'results': results,
+    }
+    if args.output:
+        Path(args.output).write_text(json.dumps(report, indent=2))
+
+    print(f"{'size':>9}  {'case':<20}{'status':>7}{'bytes':>12}{'first ms':>11}{'median ms':>11}{'min ms':>10}")
+    for r in results:
+        print(f"{r['size']:>9}  {r['case']:<20}{r['status'] or '':>7}{r['bytes'] or '':>12}{r['first_ms']:>11}{r['median_ms']:>11}{r['min_ms']:>10}")
+
+    if args.compare:
+        regressions = compare(results, args.compare, args.threshold)
+        if regressions:
+            print(f'\n{regressions} case(s) slower than {args.threshold}x the baseline', file=sys.stderr)
+            sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,174 @@
+"""
+Contact extraction benchmark on the saved pages in benchmarks/fixtures.
+
+Compares the single-pass lxml engine (app.extraction) against the previous
+BeautifulSoup implementation. Run from orgchart_app/:
+
+    python benchmarks/bench_extraction.py [--repeat 20] [--scale 1,4,16]
+
+``--scale N`` also times each fixture with its body repeated N times, to show
+how both implementations grow on large staff directory pages.
+"""
+import argparse
+import json
+import re
+import statistics
+import sys
+import time
+from pathlib import Path
+from bs4 import BeautifulSoup
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from app.extraction import extract_contacts_from_html  # noqa: E402
+
+FIXTURES = Path(__file__).parent / 'fixtures'
+
+
+def legacy_extract(html, base_url):
+    """The pre-engine implementation (get_text + per-heading parent re-scans), kept as the baseline"""
+    soup = BeautifulSoup(html, 'lxml')
+    contacts = []
+    
+    # Find all text that might contain contact information
+    text_content = soup.get_text()
+    
+    # Email regex
+    email_pattern = r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b'
+    emails = re.findall(email_pattern, text_content)
+    
+    # Phone regex (various formats)
+    phone_pattern = r'(\+?\d{1,3}[-.\s]?)?\(?\d{3}\)?[-.\s]?\d{3}[-.\s]?\d{4}'
+    phones = re.findall(phone_pattern, text_content)
+    
+    # Look for common contact page patterns
+    contact_sections = soup.find_all(['div', 'section', 'article'], class_=re.compile(r'contact|team|people|staff|leadership|executive', re.I))
+    
+    # Extract structured contact info
+    for section in contact_sections:
+        # Look for name + title + email patterns
+        potential_names = section.find_all(['h2', 'h3', 'h4', 'strong', 'b'])
+        for name_elem in potential_names:
+            name_text = name_elem.get_text(strip=True)
+            
+            # Look for associated email and title nearby
+            parent = name_elem.find_parent(['div', 'li', 'article'])
+            if parent:
+                parent_text = parent.get_text()
+                
+                # Find emails in this context
+                context_emails = re.findall(email_pattern, parent_text)
+                context_phones = re.findall(phone_pattern, parent_text)
+                
+                # Try to find title
+                title = None
+                title_patterns = ['CEO', 'CTO', 'VP', 'President', 'Director', 'Manager', 'Engineer', 'Lead']
+                for pattern in title_patterns:
+                    if pattern.lower() in parent_text.lower():
+                        # Extract sentence containing the title
+                        sentences = parent_text.split('.')
+                        for sent in sentences:
+                            if pattern.lower() in sent.lower():
+                                title = sent.strip()[:100]
+                                break
+                        if title:
+                            break
+                
+                if context_emails:
+                    contacts.append({
+                        'name': name_text[:100],
+                        'email': context_emails[0] if context_emails else None,
+                        'phone': context_phones[0] if context_phones else None,
+                        'title': title,
+                        'source_url': base_url
+                    })
+    
+    # If no structured contacts found, return raw emails/phones
+    if not contacts and emails:
+        for email in set(emails[:10]):  # Limit to 10
+            contacts.append({
+                'name': None,
+                'email': email,
+                'phone': None,
+                'title': None,
+                'source_url': base_url
+            })
+    
+    return contacts
+
+
+def find_contact_pages(base_url, soup):
+    """Find links to potential contact/team pages"""
+    contact_keywords = ['contact', 'about', 'team', 'people', 'staff', 'leadership', 'management', 'executive']
+    contact_urls = []
+    
+    links = soup.find_all('a', href=True)
+    for link in links:
+        href = link['href']
+        text = link.get_text().lower()
+        
+        # Check if link text or URL contains contact keywords
+        if any(keyword in text or keyword in href.lower() for keyword in contact_keywords):
+            full_url = urljoin(base_url, href)
+            if urlparse(full_url).netloc == urlparse(base_url).netloc:  # Same domain only
+                contact_urls.append(full_url)
+    
+    return list(set(contact_urls))[:5]  # Limit to 5 pages
+
+
+def scaled(html, factor):
+    """The page with its <body> content repeated ``factor`` times"""
+    if factor == 1:
+        return html
+    start = html.index('<body>') + len('<body>')
+    end = html.index('</body>')
+    return html[:start] + html[start:end] * factor + html[end:]
+
+
+def time_it(fn, html, repeat):
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn(html, 'https://example.com/')
+        samples.append((time.perf_counter() - started) * 1000)
+    return statistics.median(samples)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--repeat', type=int, default=20)
+    parser.add_argument('--scale', default='1,4,16', help='comma-separated body repeat factors')
+    parser.add_argument('--json', action='store_true', help='print results as JSON')
+    args = parser.parse_args()
+
+    results = []
+    for path in sorted(FIXTURES.glob('*.html')):
+        html = path.read_text()
+        for factor in (int(f) for f in args.scale.split(',')):
+            page = scaled(html, factor)
+            new_contacts = extract_contacts_from_html(page.encode(), 'https://example.com/')
+            old_contacts = legacy_extract(page.encode(), 'https://example.com/')
+            # Legacy repeats the loop per nested matched section; compare unique emails
+            same_emails = {c['email'] for c in new_contacts} == {c['email'] for c in old_contacts}
+            legacy_ms = time_it(legacy_extract, page.encode(), args.repeat)
+            engine_ms = time_it(extract_contacts_from_html, page.encode(), args.repeat)
+            results.append({
+                'fixture': path.name,
+                'scale': factor,
+                'bytes': len(page),
+                'contacts': len(new_contacts),
+                'legacy_ms': round(legacy_ms, 2),
+                'engine_ms': round(engine_ms, 2),
+                'speedup': round(legacy_ms / engine_ms, 1) if engine_ms else None,
+                'same_emails': same_emails,
+            })
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+    print(f"{'fixture':<16}{'scale':>6}{'bytes':>10}{'contacts':>10}{'legacy ms':>12}{'engine ms':>12}{'speedup':>9}  same emails")
+    for r in results:
+        print(f"{r['fixture']:<16}{r['scale']:>6}{r['bytes']:>10}{r['contacts']:>10}{r['legacy_ms']:>12}{r['engine_ms']:>12}{r['speedup']:>8}x  {r['same_emails']}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,173 @@
+"""
+Deterministic synthetic organizations for the endpoint benchmarks.
+
+``generate_org(session, n, seed)`` bulk-inserts one organization of ``n`` people
+with a realistic reporting tree (each manager has 3-10 direct reports, so depth
+grows with log n), departments inherited down each VP's branch, locations,
+projects and project assignments. The same ``n`` and ``seed`` always produce the
+same rows, so timings from different commits are comparable.
+"""
+import random
+from collections import deque
+from datetime import date, timedelta
+from sqlalchemy import func, insert, select, text
+from app.models import Department, Organization, Person, Project, ProjectAssignment
+
+FIRST_NAMES = [
+    'James', 'Maria', 'Robert', 'Linda', 'Michael', 'Patricia', 'David', 'Jennifer', 'Carlos', 'Elizabeth',
+    'Ahmed', 'Priya', 'Wei', 'Olga', 'Thomas', 'Fatima', 'Daniel', 'Sarah', 'Kenji', 'Grace',
+]
+LAST_NAMES = [
+    'Smith', 'Garcia', 'Chen', 'Johnson', 'Nguyen', 'Patel', 'Williams', 'Rodriguez', 'Kim', 'Brown',
+    'Okafor', 'Miller', 'Hernandez', 'Singh', 'Davis', 'Ivanova', 'Lopez', 'Wilson', 'Tanaka', 'Moore',
+]
+DEPARTMENT_NAMES = [
+    'Operations', 'Maintenance', 'Engineering', 'HSE', 'Procurement', 'Finance', 'Reliability',
+    'Projects', 'Turnarounds', 'Commercial', 'IT', 'Human Resources', 'Legal', 'Logistics',
+]
+LOCATIONS = ['Houston', 'Baytown', 'Corpus Christi', 'Lake Charles', 'Port Arthur', 'Midland', 'Calgary', 'Aberdeen']
+# Title by depth in the tree; deeper levels reuse the last entry
+TITLES_BY_DEPTH = ['Chief Executive Officer', 'Vice President', 'Director', 'Senior Manager', 'Manager', 'Lead', 'Engineer']
+PROJECT_STATUSES = ['active', 'planned', 'complete']
+ROLES = ['PM', 'Maintenance Lead', 'Engineer', 'Planner', 'Inspector', 'Superintendent']
+CHUNK = 10_000
+BASE_DATE = date(2024, 1, 1)
+
+
+def _chunks(rows):
+    for i in range(0, len(rows), CHUNK):
+        yield rows[i:i + CHUNK]
+
+
+def build_tree(n, rng):
+    """(manager index or None, depth) for people 0..n-1 in breadth-first order"""
+    managers = [None] * n
+    depths = [0] * n
+    open_managers = deque([(0, rng.randint(3, 10))])
+    for i in range(1, n):
+        manager, remaining = open_managers[0]
+        managers[i] = manager
+        depths[i] = depths[manager] + 1
+        if remaining == 1:
+            open_managers.popleft()
+        else:
+            open_managers[0] = (manager, remaining - 1)
+        open_managers.append((i, rng.randint(3, 10)))
+    return managers, depths
+
+
+def generate_org(session, n, seed=42, name=None):
+    """Insert a synthetic org of ``n`` people and return a summary dict (ids and row counts)"""
+    rng = random.Random(f'{seed}:{n}')
+    org_id = session.scalar(insert(Organization).values(
+        name=name or f'Benchmark Org {n}',
+        sector='Oil & Gas',
+        subsector='Downstream',
+        domain=f'bench{n}.example.com',
+    ).returning(Organization.id))
+
+    n_departments = max(5, min(n // 200, 500))
+    dept_names = [
+        DEPARTMENT_NAMES[i % len(DEPARTMENT_NAMES)] + ('' if i < len(DEPARTMENT_NAMES) else f' {i // len(DEPARTMENT_NAMES) + 1}')
+        for i in range(n_departments)
+    ]
+    dept_ids = session.scalars(
+        insert(Department).returning(Department.id, sort_by_parameter_order=True),
+        [{'organization_id': org_id, 'name': d} for d in dept_names],
+    ).all()
+
+    # Explicit ids so reports_to_id can be set in the same bulk insert
+    first_id = (session.scalar(select(func.max(Person.id))) or 0) + 1
+    managers, depths = build_tree(n, rng)
+    departments = [None] * n
+    people = []
+    for i in range(n):
+        manager = managers[i]
+        if manager is None:
+            department = None
+        elif departments[manager] is None or rng.random() < 0.05:
+            # Top-level branches (and the odd matrix hire) get their own department
+            department = rng.choice(dept_ids)
+        else:
+            department = departments[manager]
+        departments[i] = department
+        first, last = rng.choice(FIRST_NAMES), rng.choice(LAST_NAMES)
+        people.append({
+            'id': first_id + i,
+            'organization_id': org_id,
+            'department_id': department,
+            'full_name': f'{first} {last}',
+            'title': TITLES_BY_DEPTH[min(depths[i], len(TITLES_BY_DEPTH) - 1)],
+            'email': f'{first}.{last}.{i}@bench{n}.example.com'.lower(),
+            'phone': f'+1-713-{rng.randint(200, 999)}-{rng.randint(1000, 9999)}',
+            'location': rng.choice(LOCATIONS),
+            'is_epc_contact': rng.random() < 0.02,
+            'source': 'synthetic',
+            'reports_to_id': first_id + manager if manager is not None else None,
+        })
+    for chunk in _chunks(people):
+        session.execute(insert(Person), chunk)
+    if session.get_bind().dialect.name == 'postgresql':
+        session.execute(text("SELECT setval(pg_get_serial_sequence('people', 'id'), (SELECT MAX(id) FROM people))"))
+
+    n_projects = max(3, min(n // 100, 5000))
+    projects = []
+    for i in range(n_projects):
+        start = BASE_DATE + timedelta(days=rng.randint(0, 720))
+        projects.append({
+            'organization_id': org_id,
+            'name': f'Project {i:05d}',
+            'project_type': rng.choice(['maintenance', 'project']),
+            'status': rng.choice(PROJECT_STATUSES),
+            'site': rng.choice(LOCATIONS),
+            'start_date': start,
+            'end_date': start + timedelta(days=rng.randint(14, 365)),
+            'epc_contact_person_id': first_id + rng.randrange(n),
+        })
+    project_ids = session.scalars(
+        insert(Project).returning(Project.id, sort_by_parameter_order=True), projects
+    ).all()
+
+    assignments = []
+    busiest, busiest_size = project_ids[0], 0
+    for project_id in project_ids:
+        team = rng.sample(range(n), min(n, rng.randint(5, 50)))
+        if len(team) > busiest_size:
+            busiest, busiest_size = project_id, len(team)
+        for person in team:
+            assignments.append({'project_id': project_id, 'person_id': first_id + person, 'role': rng.choice(ROLES)})
+    for chunk in _chunks(assignments):
+        session.execute(insert(ProjectAssignment), chunk)
+    session.commit()
+
+    return {
+        'organization_id': org_id,
+        'people': n,
+        'departments': len(dept_ids),
+        'projects': len(project_ids),
+        'assignments': len(assignments),
+        'max_depth': max(depths),
+        'first_person_id': first_id,
+        # The most-staffed project, for the project-scoped chart
+        'project_id': busiest,
+    }
+
+
+def import_csv(org_name, manager_emails, n_rows, seed=42):
+    """CSV text in the import format: ``n_rows`` new hires reporting to the given existing people"""
+    rng = random.Random(f'{seed}:csv:{n_rows}')
+    lines = ['organization,name,title,email,phone,location,department,manager_email,is_epc_contact']
+    for i in range(n_rows):
+        first, last = rng.choice(FIRST_NAMES), rng.choice(LAST_NAMES)
+        lines.append(','.join([
+            org_name,
+            f'{first} {last}',
+            'Engineer',
+            f'new.{first}.{last}.{i}@import.example.com'.lower(),
+            '',
+            rng.choice(LOCATIONS),
+            rng.choice(DEPARTMENT_NAMES),
+            rng.choice(manager_emails),
+            'false',
+        ]))
+    return '\n'.join(lines) + '\n'
@@ -0,0 +1,16 @@
+import sys
+from pathlib import Path
+from app.static_assets import precompress
+
+
+def main():
+    build_dir = Path(sys.argv[1]) if len(sys.argv) > 1 else Path(__file__).parent / 'frontend'
+    if not (build_dir / 'index.html').exists():
+        print(f'No React build found in {build_dir}', file=sys.stderr)
+        sys.exit(1)
+    counts = precompress(str(build_dir))
+    print(f"Precompressed {counts['gzip']} gzip and {counts['br']} brotli variants in {build_dir}")
+
+
+if __name__ == '__main__':
+    main()
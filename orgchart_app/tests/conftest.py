@@ -0,0 +1,121 @@
+import json
+import os
+import sys
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from urllib.parse import parse_qsl, urlparse
+
+import pytest
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+# Config reads the environment at import time, so point it at scratch files before any app import
+_scratch = tempfile.mkdtemp(prefix="orgchart-tests-")
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(_scratch, 'test.db')}"
+os.environ["ENRICH_CACHE_PATH"] = os.path.join(_scratch, "enrich_cache.sqlite")
+os.environ["PROVIDER_USAGE_ENABLED"] = "0"
+os.environ["CRAWL_JOB_AUTO_RESUME"] = "0"
+
+
+@pytest.fixture(scope="session")
+def app():
+    from app import create_app
+
+    return create_app()
+
+
+@pytest.fixture
+def db_session(app):
+    from app.database import db
+
+    with app.app_context():
+        yield db.session
+        db.session.rollback()
+
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
+
+
+@pytest.fixture
+def runtime():
+    from app.providers.aio import ProviderRuntime
+
+    runtime = ProviderRuntime(io_threads=4)
+    yield runtime
+    runtime.loop.call_soon_threadsafe(runtime.loop.stop)
+    runtime.executor.shutdown(wait=True)
+
+
+class StubPDL:
+    """Local stand-in for the PDL API.
+
+    Replies with a scripted sequence of (status, headers, delay), then 200s. Set ``responder``
+    to ``(method, path, query, body) -> (status, payload)`` to answer by request instead;
+    every request is kept in ``requests`` as ``(method, path, query, body)``.
+    """
+
+    def __init__(self):
+        self.script = []
+        self.responder = None
+        self.requests = []
+        self.hits = 0
+        self.client_ports = set()
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"  # keep-alive, so connection reuse is observable
+
+            def do_GET(self):
+                self._reply("GET")
+
+            def do_POST(self):
+                self._reply("POST")
+
+            def _reply(self, method):
+                stub.hits += 1
+                stub.client_ports.add(self.client_address[1])
+                length = int(self.headers.get("Content-Length") or 0)
+                body = json.loads(self.rfile.read(length)) if length else None
+                parsed = urlparse(self.path)
+                request = (method, parsed.path, dict(parse_qsl(parsed.query)), body)
+                stub.requests.append(request)
+                headers, delay = {}, 0
+                if stub.responder is not None:
+                    status, payload = stub.responder(*request)
+                else:
+                    status, headers, delay = stub.script.pop(0) if stub.script else (200, {}, 0)
+                    payload = {"status": status}
+                if delay:
+                    time.sleep(delay)
+                content = json.dumps(payload).encode()
+                self.send_response(status)
+                for name, value in headers.items():
+                    self.send_header(name, value)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(content)))
+                self.end_headers()
+                self.wfile.write(content)
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.url = f"http://127.0.0.1:{self.server.server_address[1]}/v5"
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+    def close(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+@pytest.fixture
+def stub():
+    server = StubPDL()
+    yield server
+    server.close()
@@ -0,0 +1,72 @@
+import pytest
+from sqlalchemy import select
+
+import app.contact_ingest as contact_ingest
+from app.contact_ingest import ingest_contacts
+from app.models import Organization, Person, PersonFieldSource
+
+
+def make_org(session, name, people):
+    org = Organization(name=name)
+    session.add(org)
+    session.flush()
+    session.add_all(Person(organization_id=org.id, **p) for p in people)
+    session.commit()
+    return org
+
+
+def people_of(session, org):
+    session.expire_all()
+    return session.scalars(select(Person).where(Person.organization_id == org.id).order_by(Person.id)).all()
+
+
+def test_matches_fill_empty_fields_and_new_contacts_are_inserted(db_session):
+    org = make_org(db_session, "Ingest Basic", [{"full_name": "Ann Lee", "email": "ann@acme.test"}])
+
+    result = ingest_contacts(org.id, [
+        {"name": "Ann Lee", "email": "ANN@acme.test", "title": "Planner", "source_url": "https://acme.test/team"},
+        {"name": "Bob Ray", "title": "Engineer", "source_url": "https://acme.test/team"},
+        {"name": "Bob Ray", "email": "bob@acme.test", "source_url": "https://acme.test/contact"},
+        {"email": "nobody@acme.test"},
+    ])
+
+    assert (result.received, result.skipped, result.duplicates) == (4, 1, 1)
+    assert (result.matched, result.updated_people, result.inserted) == (1, 1, 1)
+    ann, bob = people_of(db_session, org)
+    assert ann.title == "Planner"
+    assert (bob.email, bob.title, bob.source) == ("bob@acme.test", "Engineer", "scraper")
+    assert db_session.scalar(
+        select(PersonFieldSource.source_url).where(PersonFieldSource.person_id == bob.id, PersonFieldSource.field == "_record")
+    ) == "https://acme.test/contact"
+
+
+def test_name_shared_by_several_people_is_flagged_not_inserted(db_session):
+    org = make_org(db_session, "Ingest Ambiguous", [{"full_name": "Sam Lee"}, {"full_name": "sam lee", "title": "Buyer"}])
+    existing = [p.id for p in people_of(db_session, org)]
+
+    result = ingest_contacts(org.id, [{"name": "Sam Lee", "title": "Engineer", "source_url": "https://acme.test/team"}])
+
+    assert result.inserted == 0 and result.matched == 0
+    assert result.ambiguous == [{
+        "full_name": "Sam Lee", "email": None, "source_url": "https://acme.test/team", "candidate_ids": sorted(existing),
+    }]
+    assert [p.id for p in people_of(db_session, org)] == existing
+
+
+def test_failure_part_way_leaves_the_org_untouched(db_session, monkeypatch):
+    org = make_org(db_session, "Ingest Rollback", [{"full_name": "Ann Lee", "email": "ann@roll.test"}])
+
+    def fail(org_ids):
+        raise RuntimeError("boom")
+
+    # Fails after existing people were updated and new ones inserted
+    monkeypatch.setattr(contact_ingest, "bump_org_version", fail)
+    with pytest.raises(RuntimeError):
+        ingest_contacts(org.id, [
+            {"name": "Ann Lee", "email": "ann@roll.test", "title": "Planner"},
+            {"name": "Cat Poe", "email": "cat@roll.test"},
+        ])
+
+    people = people_of(db_session, org)
+    assert [(p.full_name, p.title) for p in people] == [("Ann Lee", None)]
+    assert db_session.scalars(select(PersonFieldSource).where(PersonFieldSource.person_id == people[0].id)).all() == []
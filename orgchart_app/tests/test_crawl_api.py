@@ -0,0 +1,36 @@
+from datetime import datetime, timedelta
+
+import app.crawl_jobs as crawl_jobs
+from app.crawl_jobs import JOB_KIND, STALE_JOB_SECONDS
+from app.jobs import create_job
+from app.models import BackgroundJob
+
+
+def test_create_rejects_non_integer_limits(client):
+    for body in ({"max_depth": "abc"}, {"max_pages": None}):
+        response = client.post("/api/scraper/crawl-jobs", json={"url": "https://example.com", **body})
+        assert response.status_code == 400
+        assert response.get_json()["error"] == "invalid_" + next(iter(body))
+
+
+def test_pages_of_unknown_or_other_job_is_404(client, db_session):
+    other = create_job("org_purge")
+    assert client.get("/api/scraper/crawl-jobs/999999/pages").status_code == 404
+    assert client.get(f"/api/scraper/crawl-jobs/{other.id}/pages").status_code == 404
+
+
+def test_stale_crawl_jobs_are_requeued_once(db_session, monkeypatch):
+    started = []
+    monkeypatch.setattr(crawl_jobs, "start_job", lambda job, target: started.append(job.id))
+    long_ago = datetime.utcnow() - timedelta(seconds=STALE_JOB_SECONDS + 60)
+    stale = BackgroundJob(kind=JOB_KIND, status="running", detail={}, updated_at=long_ago)
+    alive = BackgroundJob(kind=JOB_KIND, status="running", detail={}, updated_at=datetime.utcnow())
+    failed = BackgroundJob(kind=JOB_KIND, status="failed", detail={}, updated_at=long_ago)
+    db_session.add_all([stale, alive, failed])
+    db_session.commit()
+
+    assert crawl_jobs.requeue_stale_jobs() == [stale.id]
+    assert started == [stale.id]
+    assert db_session.get(BackgroundJob, stale.id).status == "queued"
+    # The claim refreshed its heartbeat, so another sweep (e.g. from a second worker) leaves it alone
+    assert crawl_jobs.requeue_stale_jobs() == []
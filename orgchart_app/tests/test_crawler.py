@@ -0,0 +1,38 @@
+import time
+
+from app.crawler import Crawler
+
+
+def test_same_domain_fetches_stay_spaced_when_queued_behind_a_busy_worker():
+    crawler = Crawler(max_workers=1, default_delay=0.2)
+    starts = []
+
+    def fetch(duration):
+        starts.append(time.monotonic())
+        time.sleep(duration)
+
+    # The slow first fetch holds the only worker past the slots of the next ones
+    futures = [
+        crawler.submit(f"https://example.com/page{i}", lambda d=duration: fetch(d))
+        for i, duration in enumerate([0.5, 0.01, 0.01, 0.01])
+    ]
+    for future in futures:
+        future.result(timeout=5)
+
+    gaps = [b - a for a, b in zip(starts, starts[1:])]
+    assert all(gap >= 0.19 for gap in gaps), gaps
+
+
+def test_a_busy_domain_does_not_hold_up_other_domains():
+    crawler = Crawler(max_workers=1, default_delay=1.0)
+    done = []
+    futures = [
+        crawler.submit(url, lambda u=url: done.append((u, time.monotonic())))
+        for url in ("https://a.example/1", "https://a.example/2", "https://b.example/1")
+    ]
+    started = time.monotonic()
+    futures[2].result(timeout=5)
+    # b.example went out while a.example/2 waited for its delay
+    assert time.monotonic() - started < 0.5
+    futures[1].result(timeout=5)
+    assert [u for u, _ in done] == ["https://a.example/1", "https://b.example/1", "https://a.example/2"]
@@ -0,0 +1,37 @@
+from sqlalchemy import create_engine, select, text, update
+
+from app.database import REPLICA_BIND, db, use_primary
+from app.models import Person
+
+
+def test_only_explicit_selects_on_get_requests_use_the_replica(app, monkeypatch):
+    replica = create_engine("sqlite://")
+    with app.test_request_context("/api/people", method="GET"):
+        monkeypatch.setitem(db.engines, REPLICA_BIND, replica)
+        primary = db.engines[None]
+        session = db.session
+        assert session.get_bind(clause=select(Person)) is replica
+        # No statement (session.connection(), connection-level work) and non-SELECTs stay on the primary
+        assert session.get_bind() is primary
+        assert session.get_bind(clause=text("SELECT 1")) is primary
+        assert session.get_bind(clause=update(Person).values(title="x")) is primary
+        use_primary()
+        assert session.get_bind(clause=select(Person)) is primary
+        db.session.remove()
+
+    with app.test_request_context("/api/people", method="POST"):
+        monkeypatch.setitem(db.engines, REPLICA_BIND, replica)
+        assert db.session.get_bind(clause=select(Person)) is db.engines[None]
+        db.session.remove()
+
+
+def test_usage_summary_reads_the_primary_after_flushing(app, monkeypatch):
+    from app.providers import usage_summary
+
+    replica = create_engine("sqlite://")
+    with app.test_request_context("/api/enrich/usage", method="GET"):
+        monkeypatch.setitem(db.engines, REPLICA_BIND, replica)
+        # The replica has no tables, so any read routed there would fail
+        summary = usage_summary(days=1)
+        assert summary["period_days"] == 1
+        db.session.remove()
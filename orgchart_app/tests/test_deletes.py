@@ -0,0 +1,46 @@
+from sqlalchemy import func, select
+
+from app.models import BackgroundJob, EnrichmentResult, Organization, Person, PersonFieldSource
+
+
+def add_person_with_provenance(session, org_name):
+    org = Organization(name=org_name)
+    session.add(org)
+    session.flush()
+    person = Person(organization_id=org.id, full_name="Eve Tan")
+    job = BackgroundJob(kind="enrichment", organization_id=org.id, status="complete")
+    session.add_all([person, job])
+    session.flush()
+    session.add_all([
+        EnrichmentResult(job_id=job.id, person_id=person.id, provider="pdl", status=200, data={"full_name": "Eve Tan"}),
+        PersonFieldSource(person_id=person.id, field="_record", source="pdl"),
+        PersonFieldSource(person_id=person.id, field="title", source="pdl"),
+    ])
+    session.commit()
+    ids = org.id, person.id
+    # Start from a clean identity map, as a request would
+    session.expunge_all()
+    return ids
+
+
+def count_for(session, model, person_id):
+    return session.scalar(select(func.count()).select_from(model).where(model.person_id == person_id))
+
+
+def test_deleting_a_person_removes_their_enrichment_rows(client, db_session):
+    _org_id, person_id = add_person_with_provenance(db_session, "Delete Person Provenance")
+
+    assert client.delete(f"/api/people/{person_id}").status_code == 204
+
+    assert count_for(db_session, EnrichmentResult, person_id) == 0
+    assert count_for(db_session, PersonFieldSource, person_id) == 0
+
+
+def test_deleting_an_organization_removes_its_peoples_enrichment_rows(client, db_session):
+    org_id, person_id = add_person_with_provenance(db_session, "Delete Org Provenance")
+
+    assert client.delete(f"/api/organizations/{org_id}").status_code == 204
+
+    assert db_session.get(Person, person_id) is None
+    assert count_for(db_session, EnrichmentResult, person_id) == 0
+    assert count_for(db_session, PersonFieldSource, person_id) == 0
@@ -0,0 +1,165 @@
+import pytest
+from sqlalchemy import select
+
+from app.enrichment import JOB_KIND, run_enrichment_job
+from app.jobs import create_job, update_job
+from app.models import BackgroundJob, EnrichmentResult, Organization, Person
+from app.providers.http import reset_clients
+
+
+@pytest.fixture
+def pdl(app, stub, monkeypatch):
+    monkeypatch.setitem(app.config, "PDL_API_KEY", "test-key")
+    monkeypatch.setitem(app.config, "PDL_BASE_URL", stub.url)
+    reset_clients()
+    yield stub
+    reset_clients()
+
+
+def pdl_answers(titles, bulk=True, fail_bulk=None):
+    """Responder: emails in ``titles`` match with that title, anything else is 404.
+
+    ``titles[email] = 500`` answers that person with a per-record error; ``fail_bulk`` is a
+    set of emails whose presence makes the whole bulk request fail with 400.
+    """
+    def answer(email):
+        title = titles.get(email)
+        if title is None:
+            return {"status": 404}
+        if title == 500:
+            return {"status": 500}
+        return {"status": 200, "likelihood": 8, "data": {"job_title": title}}
+
+    def respond(method, path, query, body):
+        if path.endswith("/person/bulk"):
+            if not bulk:
+                return 404, {"error": "not_found"}
+            emails = [r["params"]["email"] for r in body["requests"]]
+            if fail_bulk and fail_bulk.intersection(emails):
+                return 400, {"error": "bad_request"}
+            return 200, [answer(email) for email in emails]
+        item = answer(query["email"])
+        return item["status"], item
+
+    return respond
+
+
+def make_org(session, name, emails):
+    org = Organization(name=name)
+    session.add(org)
+    session.flush()
+    people = [Person(organization_id=org.id, full_name=e.split("@")[0], email=e) for e in emails]
+    session.add_all(people)
+    session.commit()
+    return org, people
+
+
+def run_job(session, org, **detail):
+    job = create_job(JOB_KIND, org.id, detail=detail)
+    run_enrichment_job(job.id)
+    session.expire_all()
+    return session.get(BackgroundJob, job.id)
+
+
+def requested_emails(stub, path_suffix):
+    emails = []
+    for method, path, query, body in stub.requests:
+        if path.endswith(path_suffix):
+            emails += [r["params"]["email"] for r in body["requests"]] if body else [query["email"]]
+    return emails
+
+
+def titles_of(session, org):
+    return {p.email: p.title for p in session.scalars(select(Person).where(Person.organization_id == org.id))}
+
+
+def test_bulk_path_records_results_and_applies_matches(db_session, pdl):
+    emails = ["ann@bulk.test", "bob@bulk.test", "cy@bulk.test"]
+    org, people = make_org(db_session, "Enrich Bulk", emails)
+    pdl.responder = pdl_answers({"ann@bulk.test": "Engineer", "cy@bulk.test": "Planner"})
+
+    job = run_job(db_session, org, apply=True, batch_size=10)
+
+    assert job.status == "complete"
+    assert (job.total, job.completed) == (3, 3)
+    assert job.detail["matched"] == 2 and job.detail["not_found"] == 1
+    assert job.detail["credits_used"] == 2 and job.detail["people_updated"] == 2
+    assert [r[1] for r in pdl.requests] == ["/v5/person/bulk"]
+    statuses = dict(db_session.execute(
+        select(EnrichmentResult.person_id, EnrichmentResult.status).where(EnrichmentResult.job_id == job.id)
+    ).all())
+    assert statuses == {people[0].id: 200, people[1].id: 404, people[2].id: 200}
+    assert titles_of(db_session, org) == {"ann@bulk.test": "Engineer", "bob@bulk.test": None, "cy@bulk.test": "Planner"}
+
+
+def test_falls_back_to_single_enrich_calls_without_bulk(db_session, pdl):
+    emails = ["ann@fallback.test", "bob@fallback.test"]
+    org, _ = make_org(db_session, "Enrich Fallback", emails)
+    pdl.responder = pdl_answers({"ann@fallback.test": "Engineer"}, bulk=False)
+
+    job = run_job(db_session, org, apply=True, batch_size=1)
+
+    assert job.status == "complete"
+    assert job.detail["use_bulk"] is False
+    assert job.detail["matched"] == 1 and job.detail["not_found"] == 1
+    # Bulk is given up on after the first refusal, not tried again for the second batch
+    assert requested_emails(pdl, "/person/bulk") == ["ann@fallback.test"]
+    assert sorted(requested_emails(pdl, "/person/enrich")) == emails
+    assert titles_of(db_session, org)["ann@fallback.test"] == "Engineer"
+
+
+def test_failed_job_resumes_from_its_checkpoint(db_session, pdl):
+    emails = [f"p{i}@resume.test" for i in range(5)]
+    org, people = make_org(db_session, "Enrich Resume", emails)
+    pdl.responder = pdl_answers({e: "Engineer" for e in emails}, fail_bulk={"p2@resume.test"})
+    job = create_job(JOB_KIND, org.id, detail={"batch_size": 2})
+
+    with pytest.raises(RuntimeError):
+        run_enrichment_job(job.id)
+    db_session.rollback()
+    db_session.expire_all()
+    checkpoint = db_session.get(BackgroundJob, job.id)
+    assert checkpoint.completed == 2
+    assert checkpoint.detail["last_person_id"] == people[1].id
+
+    pdl.requests.clear()
+    pdl.responder = pdl_answers({e: "Engineer" for e in emails})
+    update_job(job.id, status="queued", error=None)
+    run_enrichment_job(job.id)
+    db_session.expire_all()
+
+    finished = db_session.get(BackgroundJob, job.id)
+    assert finished.status == "complete"
+    assert (finished.total, finished.completed) == (5, 5)
+    assert finished.detail["matched"] == 5
+    # Only people after the checkpoint were sent again
+    assert requested_emails(pdl, "/person/bulk") == emails[2:]
+
+
+def test_stops_when_the_credit_budget_is_spent(db_session, pdl):
+    emails = [f"p{i}@budget.test" for i in range(4)]
+    org, _ = make_org(db_session, "Enrich Budget", emails)
+    pdl.responder = pdl_answers({e: "Engineer" for e in emails})
+
+    job = run_job(db_session, org, budget=2, batch_size=10)
+
+    assert job.status == "budget_exhausted"
+    assert job.detail["credits_used"] == 2
+    assert requested_emails(pdl, "/person/bulk") == emails[:2]
+
+
+def test_people_answered_recently_are_skipped_even_when_not_applied(db_session, pdl):
+    emails = ["hit@fresh.test", "miss@fresh.test", "err@fresh.test"]
+    org, _ = make_org(db_session, "Enrich Fresh", emails)
+    pdl.responder = pdl_answers({"hit@fresh.test": "Engineer", "err@fresh.test": 500})
+
+    first = run_job(db_session, org, apply=False, skip_fresh_days=30)
+    assert first.detail["errors"] == 1
+
+    pdl.requests.clear()
+    second = run_job(db_session, org, apply=False, skip_fresh_days=30)
+
+    assert second.status == "complete"
+    # The match and the 404 are fresh; only the provider error is tried again
+    assert second.total == 1
+    assert requested_emails(pdl, "/person/bulk") == ["err@fresh.test"]
@@ -0,0 +1,98 @@
+import time
+
+import pytest
+import requests
+
+from app.providers.aio import ProviderLimits, run_call
+from app.providers.http import ProviderClient
+
+
+def make_client(stub, **kwargs):
+    options = {"max_retries": 3, "backoff_factor": 0.01, "backoff_jitter": 0, "read_timeout": 2.0}
+    return ProviderClient("pdl", stub.url, **{**options, **kwargs})
+
+
+@pytest.fixture
+def call(app, runtime, monkeypatch):
+    """GET through the provider runtime with the client's retry policy, as the gateway does."""
+    monkeypatch.setattr("app.providers.aio.get_runtime", lambda config=None: runtime)
+    limits = {"PROVIDER_RATE_LIMIT": 100, "PROVIDER_RATE_BURST": 100, "PROVIDER_MAX_CONCURRENCY": 4}
+    runtime.limits_for("pdl", limits)
+
+    def get(client, path="person/search"):
+        with app.app_context():
+            return run_call("pdl", lambda: client.get(path), retry=client.retry)
+
+    return get
+
+
+def test_client_itself_makes_one_attempt(stub):
+    stub.script = [(503, {}, 0)]
+    assert make_client(stub).get("person/search").status_code == 503
+    assert stub.hits == 1
+
+
+def test_retries_5xx_until_success(stub, call):
+    stub.script = [(503, {}, 0), (502, {}, 0)]
+    response = call(make_client(stub))
+    assert response.status_code == 200
+    assert stub.hits == 3
+
+
+def test_gives_up_after_max_retries(stub, call):
+    stub.script = [(500, {}, 0)] * 10
+    response = call(make_client(stub, max_retries=2))
+    assert response.status_code == 500
+    assert stub.hits == 3
+
+
+def test_429_waits_for_retry_after(stub, call):
+    stub.script = [(429, {"Retry-After": "1"}, 0)]
+    started = time.perf_counter()
+    response = call(make_client(stub))
+    assert response.status_code == 200
+    assert stub.hits == 2
+    assert time.perf_counter() - started >= 1.0
+
+
+def test_long_retry_after_is_not_waited_out(stub, call):
+    stub.script = [(429, {"Retry-After": "120"}, 0)]
+    started = time.perf_counter()
+    response = call(make_client(stub))
+    assert response.status_code == 429
+    assert stub.hits == 1
+    assert time.perf_counter() - started < 1.0
+
+
+def test_connection_failures_are_retried(call, runtime):
+    client = ProviderClient("pdl", "http://127.0.0.1:9/v5", max_retries=2, backoff_factor=0.01, backoff_jitter=0)
+    with pytest.raises(requests.exceptions.ConnectionError):
+        call(client)
+    assert runtime.limits["pdl"].retries == 2
+
+
+def test_retries_take_rate_limit_tokens(stub, call, runtime):
+    runtime.limits["pdl"] = limits = ProviderLimits(rate=4, burst=1, max_concurrency=4)
+    stub.script = [(503, {}, 0), (503, {}, 0)]
+    started = time.perf_counter()
+    response = call(make_client(stub, backoff_factor=0))
+    assert response.status_code == 200
+    assert stub.hits == 3
+    # One token up front, then each retry waits for the bucket to refill (0.25 s at 4/s)
+    assert limits.bucket.waits >= 2
+    assert time.perf_counter() - started >= 0.45
+
+
+def test_read_timeout_is_not_retried(stub, call):
+    stub.script = [(200, {}, 1.0)]
+    with pytest.raises(requests.exceptions.ReadTimeout):
+        call(make_client(stub, read_timeout=0.3))
+    assert stub.hits == 1
+
+
+def test_reuses_one_keep_alive_connection(stub):
+    client = make_client(stub)
+    for _ in range(5):
+        assert client.get("person/enrich").status_code == 200
+    assert stub.hits == 5
+    assert len(stub.client_ports) == 1
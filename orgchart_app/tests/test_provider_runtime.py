@@ -0,0 +1,29 @@
+import threading
+import time
+
+import pytest
+import requests
+
+from app.providers.aio import run_call
+
+
+def test_timed_out_call_keeps_its_slot_until_it_returns(app, runtime, monkeypatch):
+    monkeypatch.setattr("app.providers.aio.get_runtime", lambda config=None: runtime)
+    cfg = {"PROVIDER_RATE_LIMIT": 100, "PROVIDER_RATE_BURST": 100, "PROVIDER_MAX_CONCURRENCY": 1}
+    limits = runtime.limits_for("stub", cfg)
+    release = threading.Event()
+
+    with app.app_context():
+        with pytest.raises(requests.exceptions.Timeout):
+            run_call("stub", lambda: release.wait(5), timeout=0.1)
+        time.sleep(0.05)
+        # The abandoned call is still running on the I/O pool and still holds the only slot
+        assert limits.in_flight == 1
+        assert limits.abandoned == 1
+        second = runtime.submit("stub", lambda: "done", cfg)
+        time.sleep(0.1)
+        assert not second.done()
+
+        release.set()
+        assert second.result(timeout=2) == "done"
+    assert limits.in_flight == 0
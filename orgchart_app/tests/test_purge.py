@@ -0,0 +1,84 @@
+from sqlalchemy import func, select
+
+import app.purge as purge
+from app.jobs import create_job
+from app.models import (
+    BackgroundJob, Department, EnrichmentResult, Organization, OrganizationVersion, Person,
+    PersonFieldSource, Project, ProjectAssignment,
+)
+
+
+def test_purge_clears_cross_org_references_and_dependents_in_chunks(app, db_session, monkeypatch):
+    monkeypatch.setitem(app.config, "PURGE_CHUNK_SIZE", 2)
+    progress = []
+
+    def spy(job_id, commit=True, **fields):
+        progress.append(dict(fields))
+        return update_job(job_id, commit=commit, **fields)
+
+    update_job = purge.update_job
+    monkeypatch.setattr(purge, "update_job", spy)
+
+    doomed = Organization(name="Purge Doomed")
+    other = Organization(name="Purge Other")
+    db_session.add_all([doomed, other])
+    db_session.flush()
+    dept = Department(organization_id=doomed.id, name="Ops")
+    db_session.add(dept)
+    db_session.flush()
+    boss = Person(organization_id=doomed.id, full_name="Boss", department_id=dept.id)
+    db_session.add(boss)
+    db_session.flush()
+    staff = [Person(organization_id=doomed.id, full_name=f"Staff {i}", reports_to_id=boss.id) for i in range(5)]
+    outsider = Person(organization_id=other.id, full_name="Outsider", reports_to_id=boss.id)
+    db_session.add_all([*staff, outsider])
+    db_session.flush()
+    own_project = Project(organization_id=doomed.id, name="Own", project_type="project")
+    other_project = Project(organization_id=other.id, name="Theirs", project_type="project", epc_contact_person_id=boss.id)
+    db_session.add_all([own_project, other_project])
+    db_session.flush()
+    db_session.add_all([
+        ProjectAssignment(project_id=own_project.id, person_id=staff[0].id),
+        ProjectAssignment(project_id=other_project.id, person_id=staff[1].id),
+        ProjectAssignment(project_id=other_project.id, person_id=outsider.id),
+        PersonFieldSource(person_id=boss.id, field="_record", source="pdl"),
+    ])
+    job = BackgroundJob(kind="enrichment", status="complete")
+    db_session.add(job)
+    db_session.flush()
+    db_session.add(EnrichmentResult(job_id=job.id, person_id=staff[2].id, provider="pdl", status=200))
+    db_session.commit()
+    doomed_id, other_id = doomed.id, other.id
+    doomed_people = [boss.id] + [p.id for p in staff]
+    outsider_id, other_project_id = outsider.id, other_project.id
+    other_version = db_session.get(OrganizationVersion, other_id).version
+
+    purge_job = create_job("org_purge", doomed_id)
+    purge.purge_organization(purge_job.id)
+    db_session.expire_all()
+
+    assert db_session.get(Organization, doomed_id) is None
+    assert db_session.get(Person, outsider_id).reports_to_id is None
+    assert db_session.get(Project, other_project_id).epc_contact_person_id is None
+    assert db_session.get(OrganizationVersion, other_id).version > other_version
+    for model, column in (
+        (Person, Person.organization_id), (Department, Department.organization_id), (Project, Project.organization_id),
+    ):
+        assert db_session.scalar(select(func.count()).select_from(model).where(column == doomed_id)) == 0
+    for model in (ProjectAssignment, PersonFieldSource, EnrichmentResult):
+        assert db_session.scalar(
+            select(func.count()).select_from(model).where(model.person_id.in_(doomed_people))
+        ) == 0
+    # The outsider keeps their own assignment on the other org's project
+    assert db_session.scalar(
+        select(func.count()).select_from(ProjectAssignment).where(ProjectAssignment.person_id == outsider_id)
+    ) == 1
+
+    finished = db_session.get(BackgroundJob, purge_job.id)
+    assert finished.status == "complete"
+    assert finished.completed == finished.total
+    # 6 people in chunks of 2 -> three progress updates for the people step, each advancing completed
+    people_steps = [p for p in progress if (p.get("detail") or {}).get("step") == "people"]
+    assert len(people_steps) == 3
+    completed = [p["completed"] for p in progress if "completed" in p]
+    assert completed == sorted(completed)
@@ -0,0 +1,81 @@
+import threading
+import time
+from types import SimpleNamespace
+
+import pytest
+
+import app.providers.gateway as gateway
+from app.providers.gateway import call_provider
+from app.providers.resilience import CircuitBreaker, SingleFlight, get_breaker
+
+
+def test_breaker_opens_then_lets_exactly_one_trial_through():
+    breaker = CircuitBreaker(failure_threshold=2, reset_timeout=0.1)
+    breaker.record_failure()
+    assert breaker.allow()
+    breaker.record_failure()
+    assert breaker.state == "open"
+    assert not breaker.allow()
+
+    time.sleep(0.12)
+    allowed = []
+    threads = [threading.Thread(target=lambda: allowed.append(breaker.allow())) for _ in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert breaker.state == "half_open"
+    assert allowed.count(True) == 1
+
+    # A failed trial reopens the circuit; a successful one closes it
+    breaker.record_failure()
+    assert breaker.state == "open"
+    time.sleep(0.12)
+    assert breaker.allow()
+    breaker.record_success()
+    assert breaker.state == "closed"
+    assert breaker.allow()
+
+
+@pytest.mark.parametrize("status, counted", [(429, True), (500, True), (503, True), (400, False), (404, False), (200, False)])
+def test_only_429_and_5xx_count_against_the_breaker(app, monkeypatch, status, counted):
+    provider = f"stub-{status}"
+    client = SimpleNamespace(request=lambda *args, **kwargs: SimpleNamespace(status_code=status, content=b"{}"), retry=None)
+    monkeypatch.setattr(gateway, "get_client", lambda name: client)
+    monkeypatch.setattr(gateway, "run_call", lambda name, fn, **kwargs: fn())
+
+    with app.app_context():
+        breaker = get_breaker(provider)
+        breaker.record_failure()  # one prior failure: a success resets it, another failure adds to it
+        response = call_provider(provider, "person/enrich", use_cache=False)
+
+    assert response.status_code == status
+    assert breaker.failures == (2 if counted else 0)
+
+
+def test_single_flight_coalesces_concurrent_identical_calls():
+    flight = SingleFlight()
+    release = threading.Event()
+    calls = []
+    results = []
+
+    def fetch():
+        calls.append(1)
+        release.wait(5)
+        return "body"
+
+    threads = [threading.Thread(target=lambda: results.append(flight.do("same-key", fetch))) for _ in range(5)]
+    for t in threads:
+        t.start()
+    deadline = time.monotonic() + 5
+    while flight.coalesced < 4 and time.monotonic() < deadline:
+        time.sleep(0.01)
+    release.set()
+    for t in threads:
+        t.join()
+
+    assert len(calls) == 1
+    assert sorted(results) == [("body", False)] + [("body", True)] * 4
+    assert flight.stats() == {"executions": 1, "coalesced": 4, "in_flight": 0}
+    # Once the call is done, the key runs again
+    assert flight.do("same-key", lambda: "again") == ("again", False)
@@ -0,0 +1,43 @@
+from sqlalchemy import select
+
+from app.models import Organization, Person
+from app.writeback import apply_records
+
+
+def make_org(session, name, people):
+    org = Organization(name=name)
+    session.add(org)
+    session.flush()
+    session.add_all(Person(organization_id=org.id, full_name=n) for n in people)
+    session.commit()
+    return org
+
+
+def test_two_records_with_the_same_new_email_give_it_to_one_person(db_session):
+    org = make_org(db_session, "Writeback Dupes", ["Ann Lee", "Bob Ray"])
+    records = [
+        {"full_name": "Ann Lee", "email": "shared@example.com", "job_title": "Planner"},
+        {"full_name": "Bob Ray", "email": "Shared@Example.com", "job_title": "Engineer"},
+    ]
+
+    result = apply_records(org.id, [(None, r) for r in records], source="pdl")
+
+    assert result.matched == 2
+    people = {p.full_name: p for p in db_session.scalars(select(Person).where(Person.organization_id == org.id))}
+    assert people["Ann Lee"].email == "shared@example.com"
+    assert people["Bob Ray"].email is None
+    # The rest of the second record is still applied
+    assert people["Bob Ray"].title == "Engineer"
+
+
+def test_writeback_endpoint_with_shared_email_does_not_500(client, db_session):
+    org = make_org(db_session, "Writeback Endpoint Dupes", ["Cat Poe", "Dan Orr"])
+    response = client.post("/api/enrich/writeback", json={
+        "organization_id": org.id,
+        "records": [
+            {"full_name": "Cat Poe", "email": "team@example.com"},
+            {"full_name": "Dan Orr", "email": "team@example.com"},
+        ],
+    })
+    assert response.status_code == 200
+    assert response.get_json()["matched"] == 2